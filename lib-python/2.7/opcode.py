@@ -195,5 +195,13 @@ def_op('CALL_METHOD', 202)            # #args not including 'self'
 def_op('BUILD_LIST_FROM_ARG', 203)
 jrel_op('JUMP_IF_NOT_DEBUG', 204)     # jump over assert statements
 def_op('LOAD_REVDB_VAR', 205)         # reverse debugger (syntax example: $5)
+# superinstructions: they replace the first opcode of a pair and keep
+# its argument; the second instruction follows unchanged
+def_op('LOAD_FAST_LOAD_FAST', 206)    # Local variable number
+haslocal.append(206)
+def_op('LOAD_FAST_LOAD_ATTR', 207)    # Local variable number
+haslocal.append(207)
+def_op('COMPARE_OP_POP_JUMP_IF_FALSE', 208)
+hascompare.append(208)
 
 del def_op, name_op, jrel_op, jabs_op
@@ -35,6 +35,8 @@ PyPy options and arguments:
                      a warning if they are not closed explicitly
 -X faulthandler    : attempt to display tracebacks when PyPy crashes
 -X jit-off         : turn the JIT off, equivalent to --jit off
+-X importtime      : show how long each import takes (also see
+                     __pypy__.get_import_profile())
 """
 # Missing vs CPython: PYTHONHOME, PYTHONCASEOK
 USAGE2 = """
@@ -47,6 +49,12 @@ PYPY_IRC_TOPIC: if set to a non-empty value, print a random #pypy IRC
                topic at startup of interactive mode.
 PYPYLOG: If set to a non-empty value, enable logging.
 PYPY_DISABLE_JIT: if set to a non-empty value, disable JIT.
+PYPYSTARTUPSNAPSHOT: file in which to save the compiled code of all
+               modules imported by this process, and from which to load
+               it in later runs instead of from the separate .pyc files.
+PYPYJITPROFILE: file in which to record the loops compiled by the JIT,
+               and from which to load them in later runs to trace them
+               without waiting for them to become hot.
 """
 
 try:
@@ -283,11 +291,37 @@ def set_runtime_options(options, Xparam, *args):
         run_faulthandler()
     elif Xparam == 'jit-off':
         set_jit_option(options, 'off')
+    elif Xparam == 'importtime':
+        options["import_time"] = True
     else:
         print >> sys.stderr, 'usage: %s -X [options]' % (get_sys_executable(),)
-        print >> sys.stderr, '[options] can be: track-resources, faulthandler, jit-off'
+        print >> sys.stderr, ('[options] can be: track-resources, '
+                              'faulthandler, jit-off, importtime')
         raise SystemExit
 
+def enable_import_time():
+    try:
+        from __pypy__ import set_import_profiling
+    except ImportError:
+        return False     # not translated, running on top of CPython
+    set_import_profiling(True)
+    return True
+
+def print_import_times():
+    from __pypy__ import set_import_profiling, get_import_profile
+    set_import_profiling(False)
+    print >> sys.stderr, 'import time: self [us] | cumulative | imported package'
+    def report(nodes, depth):
+        for node in nodes:
+            report(node['children'], depth + 1)
+            cumulative = int(node['total'] * 1e6)
+            self_time = cumulative
+            for child in node['children']:
+                self_time -= int(child['total'] * 1e6)
+            print >> sys.stderr, 'import time: %9d | %10d | %s%s' % (
+                self_time, cumulative, '  ' * depth, node['name'])
+    report(get_import_profile(), 0)
+
 class CommandLineError(Exception):
     pass
 
@@ -413,7 +447,8 @@ default_options = dict.fromkeys(
     "run_module",
     "run_stdin",
     "warnoptions",
-    "unbuffered"), 0)
+    "unbuffered",
+    "import_time"), 0)
 
 def simple_option(options, name, iterargv):
     options[name] += 1
@@ -598,6 +633,73 @@ def parse_command_line(argv):
 
     return options
 
+def load_startup_snapshot(filename):
+    """Load the code objects saved in 'filename' by a previous process,
+    unless the file is missing, broken or was written by another
+    executable, and record the modules that are missing from it or stale.
+    Return True if save_startup_snapshot() must be called before exiting."""
+    import imp, marshal
+    if not hasattr(imp, '_load_startup_snapshot'):
+        return False     # not translated, running on top of CPython
+    try:
+        f = open(filename, 'rb')
+        try:
+            data = f.read()
+        finally:
+            f.close()
+        magic, executable, entries = marshal.loads(data)
+        if magic == imp.get_magic() and executable == sys.executable:
+            imp._load_startup_snapshot(entries)
+    except (IOError, EOFError, ValueError, TypeError):
+        pass    # missing or broken: written again at exit
+    except Exception as e:
+        print >> sys.stderr, "ignoring the startup snapshot %s: %s: %s" % (
+            filename, e.__class__.__name__, e)
+    imp._record_startup_snapshot()
+    return True
+
+def save_startup_snapshot(filename):
+    import imp, marshal, os
+    entries = imp._get_startup_snapshot()
+    if entries is None:
+        return          # the snapshot that was loaded is up to date
+    data = marshal.dumps((imp.get_magic(), sys.executable, entries))
+    tmpname = '%s.%d' % (filename, os.getpid())
+    try:
+        f = open(tmpname, 'wb')
+        try:
+            f.write(data)
+        finally:
+            f.close()
+        os.rename(tmpname, filename)    # atomically
+    except (IOError, OSError):
+        pass
+
+def load_startup_files(getenv):
+    """Load the files named by PYPYJITPROFILE and PYPYSTARTUPSNAPSHOT.
+    Return the names of the startup snapshot and of the warm-up profile to
+    save before exiting, or None for the ones that are not used."""
+    # the warm-up profile comes first: it installs the code callback that
+    # seeds the JIT counters, and the snapshot creates many code objects
+    jit_profile = getenv('PYPYJITPROFILE')
+    if jit_profile and 'pypyjit' in sys.builtin_module_names:
+        import pypyjit
+        pypyjit.load_warmup_profile(jit_profile)
+        pypyjit.record_warmup_profile()
+    else:
+        jit_profile = None
+    startup_snapshot = getenv('PYPYSTARTUPSNAPSHOT')
+    if startup_snapshot and not load_startup_snapshot(startup_snapshot):
+        startup_snapshot = None
+    return startup_snapshot, jit_profile
+
+def save_warmup_profile(filename):
+    import pypyjit
+    try:
+        pypyjit.save_warmup_profile(filename)
+    except (IOError, OSError):
+        pass
+
 @hidden_applevel
 def run_command_line(interactive,
                      inspect,
@@ -609,6 +711,7 @@ def run_command_line(interactive,
                      unbuffered,
                      ignore_environment,
                      verbose,
+                     import_time,
                      **ignored):
     # with PyPy in top of CPython we can only have around 100
     # but we need more in the PyPy level for the compiler package
@@ -628,12 +731,27 @@ def run_command_line(interactive,
     mainmodule = type(sys)('__main__')
     sys.modules['__main__'] = mainmodule
 
+    if import_time:
+        import_time = enable_import_time()
+
+    if ignore_environment:
+        startup_snapshot = jit_profile = None
+    else:
+        startup_snapshot, jit_profile = load_startup_files(getenv)
+
     if not no_site:
         try:
             import site
         except:
             print >> sys.stderr, "'import site' failed"
 
+    if startup_snapshot:
+        import atexit
+        atexit.register(save_startup_snapshot, startup_snapshot)
+    if jit_profile:
+        import atexit
+        atexit.register(save_warmup_profile, jit_profile)
+
     set_stdio_encodings(ignore_environment)
 
     readenv = not ignore_environment
@@ -834,6 +952,8 @@ def run_command_line(interactive,
         else:
             status = not success
 
+    if import_time:
+        print_import_times()
     return status
 
 def print_banner(copyright):
@@ -18,6 +18,20 @@ is_absolute_jump = misc.dict_to_switch(
     default=False)
 
 
+def _superinstruction(first, second):
+    """Return the superinstruction replacing the opcode 'first' when it is
+    directly followed by 'second', or -1."""
+    if first == ops.LOAD_FAST:
+        if second == ops.LOAD_FAST:
+            return ops.LOAD_FAST_LOAD_FAST
+        if second == ops.LOAD_ATTR:
+            return ops.LOAD_FAST_LOAD_ATTR
+    elif first == ops.COMPARE_OP:
+        if second == ops.POP_JUMP_IF_FALSE:
+            return ops.COMPARE_OP_POP_JUMP_IF_FALSE
+    return -1
+
+
 class StackDepthComputationError(Exception):
     pass
 
@@ -76,6 +90,7 @@ class Block(object):
         # unconditional jumps)
         self.cant_add_instructions = False
         self.auto_inserted_return = False
+        self.reachable = False
 
     def _post_order_see(self, stack):
         if self.marked == 0:
@@ -90,6 +105,10 @@ class Block(object):
 
                    A --> B -\           =>     [A, D, B, C]
                      \-> D ---> C
+
+        Blocks that can only be reached by falling through from a block
+        ending in a return, a raise or an unconditional jump are dead
+        code, and are not returned.
         """
         resultblocks = []
         stack = [self]
@@ -114,7 +133,29 @@ class Block(object):
                     resultblocks.append(current)
                     stack.pop()
         resultblocks.reverse()
-        return resultblocks
+        return self._remove_unreachable(resultblocks)
+
+    def _remove_unreachable(self, blocks):
+        # The blocks above are laid out along the chain of next_blocks,
+        # so removing some of them never changes the fall-through
+        # successor of a block that is kept.
+        for block in blocks:
+            block.reachable = False
+        self.reachable = True
+        pending = [self]
+        while pending:
+            block = pending.pop()
+            for instr in block.instructions:
+                target = instr.jump
+                if target is not None and not target.reachable:
+                    target.reachable = True
+                    pending.append(target)
+            nextblock = block.next_block
+            if (nextblock is not None and not nextblock.reachable and
+                    not block.cant_add_instructions):
+                nextblock.reachable = True
+                pending.append(nextblock)
+        return [block for block in blocks if block.reachable]
 
     def code_size(self):
         """Return the encoded size of all the instructions in this
@@ -451,6 +492,28 @@ class PythonCodeMaker(ast.ASTVisitor):
                 offset += instr.size()
         return table.build()
 
+    def _fuse_superinstructions(self, blocks):
+        """Replace the opcode of the first instruction of some frequent
+        pairs with a superinstruction, which executes both.  The second
+        instruction is left in place: offsets, jump targets and the lnotab
+        don't change, and tools that don't know about superinstructions
+        can still decode the bytecode.
+        """
+        for block in blocks:
+            instructions = block.instructions
+            i = 0
+            while i < len(instructions) - 1:
+                first = instructions[i]
+                second = instructions[i + 1]
+                fused = _superinstruction(first.opcode, second.opcode)
+                # don't hide the start of a line from the tracing hooks,
+                # and the second argument must not need an EXTENDED_ARG
+                if fused != -1 and not second.lineno and second.size() == 3:
+                    first.opcode = fused
+                    i += 2
+                else:
+                    i += 1
+
     def _build_code(self, blocks, size):
         bytecode = rstring.StringBuilder(size)
         for block in blocks:
@@ -482,6 +545,7 @@ class PythonCodeMaker(ast.ASTVisitor):
         cell_names = _list_from_dict(self.cell_vars)
         free_names = _list_from_dict(self.free_vars, len(cell_names))
         flags = self._get_code_flags() | self.compile_info.flags
+        self._fuse_superinstructions(blocks)
         bytecode = self._build_code(blocks, size)
         return PyCode(self.space,
                       self.argcount,
@@ -641,6 +705,12 @@ _static_opcode_stack_effects = {
 
     ops.BUILD_LIST_FROM_ARG: 1,
     ops.LOAD_REVDB_VAR: 1,
+
+    # only the first half of the pair: the second instruction is still
+    # there and accounted for separately
+    ops.LOAD_FAST_LOAD_FAST: 1,
+    ops.LOAD_FAST_LOAD_ATTR: 1,
+    ops.COMPARE_OP_POP_JUMP_IF_FALSE: -1,
 }
 
 
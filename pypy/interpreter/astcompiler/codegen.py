@@ -903,6 +903,17 @@ class PythonCodeGenerator(assemble.PythonCodeMaker):
 
     def visit_IfExp(self, ifexp):
         self.update_position(ifexp.lineno)
+        # like visit_If(), only compile the branch that can run.  This is
+        # not done in optimize.py: the dead branch can still make the
+        # function a generator or bind a local variable, and the symbol
+        # table must see it.
+        test_constant = ifexp.test.as_constant_truth(self.space)
+        if test_constant == optimize.CONST_TRUE:
+            ifexp.body.walkabout(self)
+            return
+        elif test_constant == optimize.CONST_FALSE:
+            ifexp.orelse.walkabout(self)
+            return
         end = self.new_block()
         otherwise = self.new_block()
         ifexp.test.accept_jump_if(self, False, otherwise)
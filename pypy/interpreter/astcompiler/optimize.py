@@ -72,6 +72,18 @@ class __extend__(ast.Slice):
         # constants, but we don't have a space here.
         return None
 
+class __extend__(ast.Name):
+
+    def accept_jump_if(self, gen, condition, target):
+        # "if __debug__:" uses the same opcode as "assert", which checks
+        # the current value of sys.flags.debug (see __pypy__.set_debug)
+        # instead of loading the builtin.
+        if self.id == "__debug__" and self.ctx == ast.Load and not condition:
+            gen.emit_jump(ops.JUMP_IF_NOT_DEBUG, target)
+        else:
+            ast.expr.accept_jump_if(self, gen, condition, target)
+
+
 class __extend__(ast.UnaryOp):
 
     def accept_jump_if(self, gen, condition, target):
@@ -122,6 +134,12 @@ def _fold_pow(space, w_left, w_right):
 def _fold_not(space, operand):
     return space.newbool(not space.is_true(operand))
 
+def _fold_in(space, w_left, w_right):
+    return space.contains(w_right, w_left)
+
+def _fold_not_in(space, w_left, w_right):
+    return space.newbool(not space.is_true(space.contains(w_right, w_left)))
+
 
 binary_folders = {
     ast.Add : _binary_fold("add"),
@@ -147,7 +165,30 @@ unary_folders = {
 }
 unrolling_unary_folders = unrolling_iterable(unary_folders.items())
 
-for folder in binary_folders.values() + unary_folders.values():
+compare_folders = {
+    ast.Eq : _binary_fold("eq"),
+    ast.NotEq : _binary_fold("ne"),
+    ast.Lt : _binary_fold("lt"),
+    ast.LtE : _binary_fold("le"),
+    ast.Gt : _binary_fold("gt"),
+    ast.GtE : _binary_fold("ge"),
+    ast.In : _fold_in,
+    ast.NotIn : _fold_not_in,
+}
+unrolling_compare_folders = unrolling_iterable(compare_folders.items())
+
+# Methods of str and unicode that can be called on a literal at compile
+# time: they don't depend on the locale or on the codec registry.
+foldable_string_methods = dict.fromkeys([
+    "capitalize", "center", "count", "endswith", "find", "index",
+    "isalnum", "isalpha", "isdigit", "islower", "isspace", "istitle",
+    "isupper", "join", "ljust", "lower", "lstrip", "replace", "rfind",
+    "rindex", "rjust", "rstrip", "startswith", "strip", "swapcase",
+    "title", "upper", "zfill",
+])
+
+for folder in (binary_folders.values() + unary_folders.values() +
+               compare_folders.values()):
     folder._always_inline_ = 'try'
 del folder
 
@@ -255,6 +296,108 @@ class OptimizingVisitor(ast.ASTVisitor):
             return values[0]
         return bop
 
+    def _is_simple_constant(self, w_const):
+        """Check that comparing w_const is free of side-effects: no user
+        class, no unicode (which can give a UnicodeWarning)."""
+        space = self.space
+        if space.is_w(w_const, space.w_None):
+            return True
+        w_type = space.type(w_const)
+        if (space.is_w(w_type, space.w_int) or
+                space.is_w(w_type, space.w_long) or
+                space.is_w(w_type, space.w_float) or
+                space.is_w(w_type, space.w_bool) or
+                space.is_w(w_type, space.w_bytes)):
+            return True
+        if (space.is_w(w_type, space.w_tuple) or
+                space.is_w(w_type, space.w_frozenset)):
+            for w_item in space.unpackiterable(w_const):
+                if not self._is_simple_constant(w_item):
+                    return False
+            return True
+        return False
+
+    def _comparator_constant(self, op, node):
+        if op == ast.In or op == ast.NotIn:
+            # like codegen._optimize_comparator()
+            if isinstance(node, ast.List) or isinstance(node, ast.Set):
+                elts = node.elts if node.elts is not None else []
+                consts_w = [None] * len(elts)
+                for i in range(len(elts)):
+                    w_const = elts[i].as_constant()
+                    if w_const is None:
+                        return None
+                    consts_w[i] = w_const
+                return self.space.newtuple(consts_w)
+        return node.as_constant()
+
+    def visit_Compare(self, comp):
+        w_left = comp.left.as_constant()
+        if w_left is None or not self._is_simple_constant(w_left):
+            return comp
+        count = len(comp.ops)
+        comparators_w = [None] * count
+        for i in range(count):
+            w_right = self._comparator_constant(comp.ops[i],
+                                                comp.comparators[i])
+            if w_right is None or not self._is_simple_constant(w_right):
+                return comp
+            comparators_w[i] = w_right
+        # like a chained comparison, stop at the first false result
+        w_result = None
+        try:
+            for i in range(count):
+                w_right = comparators_w[i]
+                op = comp.ops[i]
+                if op == ast.Is or op == ast.IsNot:
+                    return comp    # depends on the sharing of constants
+                for op_kind, folder in unrolling_compare_folders:
+                    if op_kind == op:
+                        w_result = folder(self.space, w_left, w_right)
+                        break
+                else:
+                    raise AssertionError("unknown comparison operation")
+                if not self.space.is_true(w_result):
+                    break
+                w_left = w_right
+        except OperationError:
+            return comp
+        return ast.Const(w_result, comp.lineno, comp.col_offset)
+
+    def visit_Call(self, call):
+        """Call string methods on literals, e.g. ",".join(("a", "b"))."""
+        func = call.func
+        if (not isinstance(func, ast.Attribute) or
+                func.attr not in foldable_string_methods or
+                call.keywords or call.starargs is not None or
+                call.kwargs is not None):
+            return call
+        space = self.space
+        w_obj = func.value.as_constant()
+        if w_obj is None or not space.isinstance_w(w_obj, space.w_basestring):
+            return call
+        args = call.args if call.args is not None else []
+        args_w = [None] * len(args)
+        for i in range(len(args)):
+            w_arg = args[i].as_constant()
+            if w_arg is None:
+                return call
+            args_w[i] = w_arg
+        try:
+            w_meth = space.getattr(w_obj, space.newtext(func.attr))
+            w_const = space.call(w_meth, space.newtuple(args_w))
+        except OperationError:
+            # Let all errors be found at runtime.
+            return call
+        if space.isinstance_w(w_const, space.w_basestring):
+            # don't blow up the size of pyc files, e.g. with ljust()
+            if space.len_w(w_const) > max(20, space.len_w(w_obj)):
+                return call
+        elif not (space.isinstance_w(w_const, space.w_int) or
+                  space.isinstance_w(w_const, space.w_bool)):
+            return call
+        return ast.Const(w_const, call.lineno, call.col_offset)
+
     def visit_Repr(self, rep):
         w_const = rep.value.as_constant()
         if w_const is not None:
@@ -294,11 +437,27 @@ class OptimizingVisitor(ast.ASTVisitor):
         w_consts = self.space.newtuple(consts_w)
         return ast.Const(w_consts, tup.lineno, tup.col_offset)
 
+    def _slice_constant(self, slc):
+        """Return a slice object if all the indices are constants."""
+        space = self.space
+        indices_w = [space.w_None] * 3
+        nodes = [slc.lower, slc.upper, slc.step]
+        for i in range(3):
+            if nodes[i] is not None:
+                w_const = nodes[i].as_constant()
+                if w_const is None:
+                    return None
+                indices_w[i] = w_const
+        return space.newslice(indices_w[0], indices_w[1], indices_w[2])
+
     def visit_Subscript(self, subs):
         if subs.ctx == ast.Load:
             w_obj = subs.value.as_constant()
             if w_obj is not None:
-                w_idx = subs.slice.as_constant()
+                if isinstance(subs.slice, ast.Slice):
+                    w_idx = self._slice_constant(subs.slice)
+                else:
+                    w_idx = subs.slice.as_constant()
                 if w_idx is not None:
                     try:
                         w_const = self.space.getitem(w_obj, w_idx)
@@ -81,6 +81,26 @@ class TestCompiler(BaseTestCompiler):
         func = "def f(_=2): return (_ if _ else _) if False else _"
         yield self.st, func, "f()", 2
 
+    def test_ifexp_dead_branch_keeps_scope(self):
+        # the branch that is not compiled still counts for the scopes;
+        # compiled with the optimizer, like all the code run by the space
+        w_res = self.space.appexec([], """():
+            def f():
+                x = 1 if 1 else (yield)
+            i = 5
+            def g():
+                x = 1 if 1 else [i for i in ()]
+                return i
+            try:
+                g()
+            except UnboundLocalError:
+                res = 'unbound'
+            else:
+                res = 'bound'
+            return type(f()).__name__, res
+        """)
+        assert self.space.unwrap(w_res) == ('generator', 'unbound')
+
     def test_long_jump(self):
         func = """def f(x):
     y = 0
@@ -1239,6 +1259,146 @@ class TestOptimizations:
         counts = self.count_instructions(source)
         assert ops.BUILD_TUPLE not in counts
 
+    def test_const_fold_slice(self):
+        source = """def f():
+            return "abcdef"[1:-1:2]
+        """
+        counts = self.count_instructions(source)
+        assert counts == {ops.LOAD_CONST: 1, ops.RETURN_VALUE: 1}
+
+    def test_const_fold_compare(self):
+        for source in (
+            '1 < 2',
+            '1 < 2 < 1',
+            '"b" in ["a", "b"]',
+            '3 not in {1, 2}',
+            '(1, 2) == (1, 2)',
+            ):
+            source = 'def f(): return %s' % source
+            counts = self.count_instructions(source)
+            assert counts == {ops.LOAD_CONST: 1, ops.RETURN_VALUE: 1}
+        for source in (
+            'None is None',       # identity of constants: not folded
+            'u"a" == "a"',        # may warn at runtime
+            '1 < x',
+            ):
+            source = 'def f(): return %s' % source
+            counts = self.count_instructions(source)
+            assert ops.COMPARE_OP in counts
+
+    def test_const_fold_string_methods(self):
+        for source in (
+            '"abc".upper()',
+            '",".join(("a", "b"))',
+            '"a-b".replace("-", "_")',
+            '"abc".startswith("a")',
+            ):
+            source = 'def f(): return %s' % source
+            counts = self.count_instructions(source)
+            assert counts == {ops.LOAD_CONST: 1, ops.RETURN_VALUE: 1}
+        for source in (
+            '"abc".split("b")',     # returns a list
+            '"abc".encode("foo")',  # depends on the codecs
+            '"x".ljust(1000)',      # too big
+            '"abc".upper(x)',
+            '"abc".index("z")',     # raises
+            ):
+            source = 'def f(): return %s' % source
+            counts = self.count_instructions(source)
+            assert ops.CALL_FUNCTION in counts or ops.CALL_METHOD in counts
+
+    def test_const_fold_ifexp(self):
+        source = """def f(x, y):
+            return x if 1 else y
+        """
+        counts = self.count_instructions(source)
+        assert counts == {ops.LOAD_FAST: 1, ops.RETURN_VALUE: 1}
+
+    def test_if_debug(self):
+        source = """def f(x):
+            if __debug__:
+                x = 5
+            return x
+        """
+        counts = self.count_instructions(source)
+        assert ops.LOAD_GLOBAL not in counts
+        assert counts[ops.JUMP_IF_NOT_DEBUG] == 1
+
+    def test_remove_unreachable_blocks(self):
+        source = """def f(x):
+            return x
+            if x:
+                x += 1
+            return 42
+        """
+        counts = self.count_instructions(source)
+        assert counts == {ops.LOAD_FAST: 1, ops.RETURN_VALUE: 1}
+        source = """def f(x):
+            raise ValueError
+            if x:
+                x += 1
+        """
+        counts = self.count_instructions(source)
+        assert counts == {ops.LOAD_GLOBAL: 1, ops.RAISE_VARARGS: 1}
+
+    def function_opcodes(self, source):
+        code = compile_with_astcompiler(source, 'exec', self.space)
+        for w_const in code.co_consts_w:
+            if isinstance(w_const, PyCode):
+                break
+        co_code = w_const.co_code
+        result = []
+        i = 0
+        while i < len(co_code):
+            op = ord(co_code[i])
+            result.append(op)
+            i += 1 if op < ops.HAVE_ARGUMENT else 3
+        return result
+
+    def test_superinstructions(self):
+        source = """def f(a, b):
+            if a < b:
+                return a.x
+            return a + b
+        """
+        # the second instruction of each pair is kept after the
+        # superinstruction
+        assert self.function_opcodes(source) == [
+            ops.LOAD_FAST_LOAD_FAST, ops.LOAD_FAST,
+            ops.COMPARE_OP_POP_JUMP_IF_FALSE, ops.POP_JUMP_IF_FALSE,
+            ops.LOAD_FAST_LOAD_ATTR, ops.LOAD_ATTR, ops.RETURN_VALUE,
+            ops.LOAD_FAST_LOAD_FAST, ops.LOAD_FAST, ops.BINARY_ADD,
+            ops.RETURN_VALUE]
+
+    def test_superinstructions_not_across_lines(self):
+        source = """def f(a, b, c):
+            return (a,
+                    b + c)
+        """
+        # 'b' starts a new line, so it is not fused with 'a'
+        assert self.function_opcodes(source) == [
+            ops.LOAD_FAST, ops.LOAD_FAST_LOAD_FAST, ops.LOAD_FAST,
+            ops.BINARY_ADD, ops.BUILD_TUPLE, ops.RETURN_VALUE]
+
+    def test_superinstructions_run(self):
+        space = self.space
+        source = """if 1:
+            class A(object):
+                x = 42
+            def f(a, b):
+                if a < b:
+                    return a
+                return b
+            def g(a):
+                return a.x
+            res = (f(3, 5), f(5, 3), g(A()))
+        """
+        code = compile_with_astcompiler(source, 'exec', space)
+        w_dict = space.newdict()
+        code.exec_code(space, w_dict, w_dict)
+        w_res = space.getitem(w_dict, space.newtext("res"))
+        assert space.unwrap(w_res) == (3, 3, 42)
+
 
 class TestHugeStackDepths:
     def run_and_check_stacksize(self, source):
@@ -293,15 +293,12 @@ class OperationError(Exception):
     def get_traceback(self):
         """Calling this marks the PyTraceback as escaped, i.e. it becomes
         accessible and inspectable by app-level Python code.  For the JIT.
-        Note that this has no effect if there are already several traceback
-        frames recorded, because in this case they are already marked as
-        escaping by executioncontext.leave() being called with
-        got_exception=True.
+        See PyTraceback.escape().
         """
         from pypy.interpreter.pytraceback import PyTraceback
         tb = self._application_traceback
         if tb is not None and isinstance(tb, PyTraceback):
-            tb.frame.mark_as_escaped()
+            tb.escape()
         return tb
 
     def get_w_traceback(self, space):
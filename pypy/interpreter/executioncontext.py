@@ -81,7 +81,10 @@ class ExecutionContext(object):
         finally:
             frame_vref = self.topframeref
             self.topframeref = frame.f_backref
-            if frame.escaped or got_exception:
+            # a frame left with an exception is not forced here: it is only
+            # reachable via the traceback, which fixes the f_back of its
+            # frames if it escapes (see PyTraceback.escape())
+            if frame.escaped:
                 # if this frame escaped to applevel, we must ensure that also
                 # f_back does
                 f_back = frame.f_backref()
@@ -174,46 +174,65 @@ return next yielded value or raise StopIteration."""
         return space.newtext(code_name)
 
     # Results can be either an RPython list of W_Root, or it can be an
-    # app-level W_ListObject, which also has an append() method, that's why we
-    # generate 2 versions of the function and 2 jit drivers.
+    # app-level W_ListObject, which also has an append() method, or a
+    # SumAccumulator; that's why we generate 3 versions of the function
+    # and 3 jit drivers.
     def _create_unpack_into():
         jitdriver = jit.JitDriver(greens=['pycode'],
-                                  reds=['self', 'frame', 'results'],
+                                  reds=['self', 'results'],
                                   name='unpack_into')
 
         def unpack_into(self, results):
             """This is a hack for performance: runs the generator and collects
             all produced items in a list."""
-            # XXX copied and simplified version of send_ex()
-            space = self.space
-            if self.running:
-                raise oefmt(space.w_ValueError, "generator already executing")
-            frame = self.frame
-            if frame is None:    # already finished
-                return
-            self.running = True
-            try:
-                pycode = self.pycode
-                while True:
-                    jitdriver.jit_merge_point(self=self, frame=frame,
-                                              results=results, pycode=pycode)
-                    try:
-                        w_result = frame.execute_frame(space.w_None)
-                    except OperationError as e:
-                        if not e.match(space, space.w_StopIteration):
-                            raise
-                        break
-                    # if the frame is now marked as finished, it was RETURNed from
-                    if frame.frame_finished_execution:
-                        break
-                    results.append(w_result)     # YIELDed
-            finally:
-                frame.f_backref = jit.vref_None
-                self.running = False
-                self.frame_is_finished()
+            pycode = self.pycode
+            while True:
+                jitdriver.jit_merge_point(self=self, results=results,
+                                          pycode=pycode)
+                w_result = self._next_or_none()
+                if w_result is None:
+                    break
+                results.append(w_result)
         return unpack_into
     unpack_into = _create_unpack_into()
     unpack_into_w = _create_unpack_into()
+    _unpack_into_sum = _create_unpack_into()
+
+    def _next_or_none(self):
+        """Like next(), but returns None instead of raising StopIteration.
+        A copied and simplified version of send_ex(), for the loops above.
+        """
+        space = self.space
+        if self.running:
+            raise oefmt(space.w_ValueError, "generator already executing")
+        frame = self.frame
+        if frame is None:    # already finished
+            return None
+        self.running = True
+        try:
+            try:
+                w_result = frame.execute_frame(space.w_None)
+            except OperationError as e:
+                self.frame_is_finished()
+                if not e.match(space, space.w_StopIteration):
+                    raise
+                return None
+        finally:
+            frame.f_backref = jit.vref_None
+            self.running = False
+        # if the frame is now marked as finished, it was RETURNed from
+        if frame.frame_finished_execution:
+            self.frame_is_finished()
+            return None
+        return w_result     # YIELDed
+
+    def sum(self, w_start):
+        """sum() of the items produced by the generator.  The generator is
+        not marked as running while the additions are done, like with a
+        regular 'for' loop."""
+        accumulator = SumAccumulator(self.space, w_start)
+        self._unpack_into_sum(accumulator)
+        return accumulator.w_total
 
     def _finalize_(self):
         # This is only called if the CO_YIELD_INSIDE_TRY flag is set
@@ -259,6 +278,16 @@ GeneratorIterator.typedef = TypeDef("generator",
 assert not GeneratorIterator.typedef.acceptable_as_base_class  # no __new__
 
 
+class SumAccumulator(object):
+    def __init__(self, space, w_start):
+        self.space = space
+        self.w_total = w_start
+
+    def append(self, w_item):
+        # intentionally not inplace_add(), see app_functional.sum()
+        self.w_total = self.space.add(self.w_total, w_item)
+
+
 
 def get_printable_location_genentry(bytecode):
     return '%s <generator>' % (bytecode.get_repr(),)
@@ -32,7 +32,7 @@ def unpack_text_tuple(space, w_str_tuple):
 # Magic numbers for the bytecode version in code objects.
 # See comments in pypy/module/imp/importing.
 cpython_magic, = struct.unpack("<i", imp.get_magic())   # host magic number
-default_magic = (0xf303 + 7) | 0x0a0d0000               # this PyPy's magic
+default_magic = (0xf303 + 8) | 0x0a0d0000               # this PyPy's magic
                                                         # (from CPython 2.7.0)
 
 def make_signature(code):
@@ -222,6 +222,15 @@ class __extend__(pyframe.PyFrame):
                 next_instr = self.POP_JUMP_IF_FALSE(oparg, next_instr)
             elif opcode == opcodedesc.POP_JUMP_IF_TRUE.index:
                 next_instr = self.POP_JUMP_IF_TRUE(oparg, next_instr)
+            elif opcode == opcodedesc.COMPARE_OP_POP_JUMP_IF_FALSE.index:
+                next_instr = self.COMPARE_OP_POP_JUMP_IF_FALSE(oparg,
+                                                    next_instr, co_code)
+            elif opcode == opcodedesc.LOAD_FAST_LOAD_FAST.index:
+                next_instr = self.LOAD_FAST_LOAD_FAST(oparg, next_instr,
+                                                      co_code)
+            elif opcode == opcodedesc.LOAD_FAST_LOAD_ATTR.index:
+                next_instr = self.LOAD_FAST_LOAD_ATTR(oparg, next_instr,
+                                                      co_code)
             elif opcode == opcodedesc.BINARY_ADD.index:
                 self.BINARY_ADD(oparg, next_instr)
             elif opcode == opcodedesc.BINARY_AND.index:
@@ -1344,6 +1353,34 @@ class __extend__(pyframe.PyFrame):
         else:
             self.MISSING_OPCODE(oparg, next_instr)
 
+    ### superinstructions ###
+
+    # The compiler replaces the opcode of the first instruction of some
+    # pairs with one of these; the second instruction follows unchanged.
+    # They execute both halves and skip over the second one.
+
+    def _second_oparg(self, co_code, next_instr):
+        lo = ord(co_code[next_instr + 1])
+        hi = ord(co_code[next_instr + 2])
+        return (hi * 256) | lo
+
+    def LOAD_FAST_LOAD_FAST(self, varindex, next_instr, co_code):
+        self.LOAD_FAST(varindex, next_instr)
+        self.LOAD_FAST(self._second_oparg(co_code, next_instr),
+                       next_instr + 3)
+        return next_instr + 3
+
+    def LOAD_FAST_LOAD_ATTR(self, varindex, next_instr, co_code):
+        self.LOAD_FAST(varindex, next_instr)
+        self.LOAD_ATTR(self._second_oparg(co_code, next_instr),
+                       next_instr + 3)
+        return next_instr + 3
+
+    def COMPARE_OP_POP_JUMP_IF_FALSE(self, testnum, next_instr, co_code):
+        self.COMPARE_OP(testnum, next_instr)
+        return self.POP_JUMP_IF_FALSE(self._second_oparg(co_code, next_instr),
+                                      next_instr + 3)
+
 
 ### ____________________________________________________________ ###
 
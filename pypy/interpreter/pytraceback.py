@@ -1,6 +1,8 @@
 from pypy.interpreter import baseobjspace
 from pypy.interpreter.error import OperationError
+from pypy.interpreter.pycode import CO_GENERATOR
 
+from rpython.rlib import jit
 from rpython.tool.error import offset2lineno
 
 
@@ -14,12 +16,39 @@ class PyTraceback(baseobjspace.W_Root):
      * 'tb_next'
     """
 
+    escaped = False
+
     def __init__(self, space, frame, lasti, next):
         self.space = space
         self.frame = frame
         self.lasti = lasti
         self.next = next
 
+    def escape(self):
+        """Called when the traceback becomes visible to app-level code.
+
+        Frames are not forced when an exception leaves them (see
+        ExecutionContext.leave()), because most exceptions are caught
+        without anybody looking at their traceback.  The price is that the
+        f_back of such a frame is not valid any more; but it is the frame
+        of the previous traceback entry, so we can fix it here.  Generator
+        frames don't have an f_back once they are suspended or finished.
+        """
+        if self.escaped:
+            return
+        self.escaped = True
+        self.frame.mark_as_escaped()
+        tb = self
+        next = tb.next
+        while next is not None and not next.escaped:
+            next.escaped = True
+            frame = next.frame
+            if (frame is not tb.frame and
+                    not frame.pycode.co_flags & CO_GENERATOR):
+                frame.f_backref = jit.non_virtual_ref(tb.frame)
+            tb = next
+            next = tb.next
+
     def get_lineno(self):
         return offset2lineno(self.frame.pycode, self.lasti)
 
@@ -53,7 +82,7 @@ class PyTraceback(baseobjspace.W_Root):
 def record_application_traceback(space, operror, frame, last_instruction):
     if frame.pycode.hidden_applevel:
         return
-    tb = operror.get_traceback()
+    tb = operror._application_traceback    # don't escape it
     tb = PyTraceback(space, frame, last_instruction, tb)
     operror.set_traceback(tb)
 
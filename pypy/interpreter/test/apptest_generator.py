@@ -309,3 +309,55 @@ def test_multiple_invalid_sends():
         g.send(2)
     with raises(TypeError):
         g.send(2)
+
+def test_consumers_of_generators():
+    def gen(n):
+        for i in range(n):
+            yield i
+    assert list(gen(4)) == [0, 1, 2, 3]
+    assert sum(gen(4)) == 6
+    assert sum(gen(4), 10) == 16
+    assert sum(gen(0), 10) == 10
+    assert sum((float(i) for i in range(4)), 0.5) == 6.5
+    assert sum(([i] for i in range(3)), []) == [0, 1, 2]
+    assert "-".join(str(i) for i in gen(3)) == "0-1-2"
+    assert dict((i, i * i) for i in gen(3)) == {0: 0, 1: 1, 2: 4}
+    l = [42]
+    l.extend(gen(2))
+    assert l == [42, 0, 1]
+    assert min(gen(3)) == 0
+    assert max(gen(3)) == 2
+
+def test_sum_generator_error_in_add():
+    def gen():
+        yield 1
+        yield "x"
+        yield 3
+    g = gen()
+    with raises(TypeError):
+        sum(g)
+    # the generator is still usable, like with a 'for' loop
+    assert next(g) == 3
+
+def test_sum_generator_not_running_during_add():
+    class A(object):
+        def __add__(self, other):
+            seen.append(g.gi_running)
+            seen.append(next(g))
+            return self
+    def gen():
+        for i in range(4):
+            yield i
+    seen = []
+    g = gen()
+    sum(g, A())
+    assert seen == [False, 1, False, 3]
+
+def test_sum_generator_raises():
+    def gen():
+        yield 1
+        raise KeyError
+    g = gen()
+    with raises(KeyError):
+        sum(g)
+    assert list(g) == []
@@ -151,6 +151,68 @@ def test_virtualref_through_traceback():
     assert tb.tb_frame.f_code.co_name == 'g'
     assert tb.tb_frame.f_back.f_code.co_name == 'f'
 
+def test_f_back_through_lazy_traceback():
+    import sys
+    def h():
+        raise ValueError
+    def g():
+        h()
+    def f():
+        g()
+    try:
+        f()
+    except ValueError:
+        _, _, tb = sys.exc_info()
+    assert tb.tb_frame is sys._getframe()
+    tb = tb.tb_next
+    names = []
+    while tb is not None:
+        names.append((tb.tb_frame.f_code.co_name,
+                      tb.tb_frame.f_back.f_code.co_name))
+        tb = tb.tb_next
+    me = sys._getframe().f_code.co_name
+    assert names == [('f', me), ('g', 'f'), ('h', 'g')]
+
+def test_f_back_through_reraised_traceback():
+    import sys
+    def g():
+        raise KeyError
+    def f():
+        try:
+            g()
+        except KeyError:
+            raise
+    def caller():
+        try:
+            f()
+        except KeyError:
+            return sys.exc_info()[2]
+    tb = caller()
+    frames = []
+    while tb is not None:
+        frames.append(tb.tb_frame)
+        tb = tb.tb_next
+    assert [fr.f_code.co_name for fr in frames] == ['caller', 'f', 'g']
+    assert frames[1].f_back is frames[0]
+    assert frames[2].f_back is frames[1]
+
+def test_f_back_through_traceback_of_generator():
+    import sys
+    def gen():
+        yield 1
+        raise IndexError
+    def f():
+        for x in gen():
+            pass
+    try:
+        f()
+    except IndexError:
+        tb = sys.exc_info()[2]
+    frame = tb.tb_next.tb_next.tb_frame
+    assert frame.f_code.co_name == 'gen'
+    assert frame.f_back is None
+    assert tb.tb_next.tb_frame.f_back is tb.tb_frame
+
 def test_trace_basic():
     import sys
     l = []
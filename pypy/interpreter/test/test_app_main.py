@@ -1110,3 +1110,55 @@ class AppTestAppMain:
             # assert it did not crash
         finally:
             sys.path[:] = old_sys_path
+
+
+@py.test.mark.skipif('config.getoption("runappdirect")')
+class AppTestStartupFiles:
+    spaceconfig = dict(usemodules=('pypyjit', 'binascii'))
+
+    def setup_class(cls):
+        cls.w_goal_dir = cls.space.wrap(os.path.dirname(app_main))
+        cls.w_tmp_dir = cls.space.wrap(
+            str(udir.join('startupfiles').ensure(dir=1)))
+
+    def test_snapshot_and_warmup_profile(self):
+        # the code objects loaded from the startup snapshot are seen by
+        # the code callback of the warm-up profile
+        import sys, os, imp, marshal, binascii, pypyjit, __pypy__
+        # if not translated
+        if not hasattr(sys, 'executable'):
+            sys.executable = 'from test_app_main.py'
+        old_sys_path = sys.path[:]
+        sys.path.append(self.goal_dir)
+        pathname = os.path.join(self.tmp_dir, 'snapmod.py')
+        source = 'def f(n):\n    while n > 0:\n        n -= 1\n'
+        with open(pathname, 'w') as f:
+            f.write(source)
+        code = compile(source, pathname, 'exec')
+        f_code = code.co_consts[0]
+        snapshot = os.path.join(self.tmp_dir, 'snapshot')
+        entries = [(pathname, int(os.stat(pathname).st_mtime), code, False)]
+        with open(snapshot, 'wb') as f:
+            marshal.dump((imp.get_magic(), sys.executable, entries), f)
+        profile = os.path.join(self.tmp_dir, 'profile')
+        key = (pathname, f_code.co_firstlineno, 'f',
+               binascii.crc32(f_code.co_code), 3, False)
+        with open(profile, 'wb') as f:
+            marshal.dump(('pypyjit-warmup-profile-1', {key: 1}), f)
+        #
+        seen = []
+        def trace_next_iteration(pc, is_being_profiled, code):
+            seen.append((pc, code.co_name, code.co_filename))
+        orig = pypyjit.trace_next_iteration
+        pypyjit.trace_next_iteration = trace_next_iteration
+        env = {'PYPYSTARTUPSNAPSHOT': snapshot, 'PYPYJITPROFILE': profile}
+        try:
+            import app_main
+            res = app_main.load_startup_files(env.get)
+        finally:
+            pypyjit.trace_next_iteration = orig
+            pypyjit.set_compile_hook(None)
+            __pypy__.set_code_callback(None)
+            sys.path[:] = old_sys_path
+        assert res == (snapshot, profile)
+        assert seen == [(3, 'f', pathname)]
@@ -4,7 +4,7 @@ functional programming.
 """
 import operator
 from __pypy__ import resizelist_hint, newlist_hint
-from __pypy__ import specialized_zip_2_lists
+from __pypy__ import specialized_zip_2_lists, sum_generator
 
 # ____________________________________________________________
 
@@ -57,8 +57,14 @@ empty, returns start."""
     return _regular_sum(sequence, start)
 
 
+_generator = type(_x for _x in ())
+
 def _regular_sum(sequence, start):
     # Default implementation for sum (no specialization)
+    if type(sequence) is _generator:
+        # same as the loop below, but without resuming the generator
+        # through next() every time
+        return sum_generator(sequence, start)
     last = start
     for x in sequence:
         # Very intentionally *not* +=, that would have different semantics if
@@ -9,7 +9,7 @@ from pypy.objspace.std.listobject import W_ListObject
 from pypy.objspace.std.setobject import W_BaseSetObject
 from pypy.objspace.std.typeobject import MethodCache
 from pypy.objspace.std.mapdict import MapAttrCache
-from rpython.rlib import rposix, rgc, rstack
+from rpython.rlib import rposix, rgc, rstack, jit
 from rpython.rtyper.lltypesystem import rffi
 
 
@@ -184,6 +184,34 @@ def specialized_zip_2_lists(space, w_list1, w_list2):
     from pypy.objspace.std.specialisedtupleobject import specialized_zip_2_lists
     return specialized_zip_2_lists(space, w_list1, w_list2)
 
+def sum_generator(space, w_generator, w_start):
+    """Like sum(generator, start), but runs the generator in a tight loop.
+    Used by sum()."""
+    from pypy.interpreter.generator import GeneratorIterator
+    generator = space.interp_w(GeneratorIterator, w_generator)
+    return generator.sum(w_start)
+
+@unwrap_spec(depth=int)
+def caller_info(space, depth=0):
+    """Return (code, lineno) for the frame that many calls below the top of
+    the stack, like sys._getframe(depth).f_code and f_lineno.  Raises
+    ValueError if the stack is not deep enough."""
+    if depth < 0:
+        raise oefmt(space.w_ValueError, "frame index must not be negative")
+    return _caller_info(space, depth)
+
+@jit.look_inside_iff(lambda space, depth: jit.isconstant(depth))
+def _caller_info(space, depth):
+    ec = space.getexecutioncontext()
+    f = ec.gettopframe_nohidden()
+    while True:
+        if f is None:
+            raise oefmt(space.w_ValueError, "call stack is not deep enough")
+        if depth == 0:
+            return space.newtuple([f.pycode, f.fget_f_lineno(space)])
+        depth -= 1
+        f = ec.getnextframe_nohidden(f)
+
 def set_code_callback(space, w_callable):
     cache = space.fromcache(CodeHookCache)
     if space.is_none(w_callable):
@@ -191,6 +219,13 @@ def set_code_callback(space, w_callable):
     else:
         cache._code_hook = w_callable
 
+def get_code_callback(space):
+    """Return the callable installed by set_code_callback(), or None."""
+    cache = space.fromcache(CodeHookCache)
+    if cache._code_hook is None:
+        return space.w_None
+    return cache._code_hook
+
 @unwrap_spec(string='bytes', byteorder='text', signed=int)
 def decode_long(space, string, byteorder='little', signed=1):
     from rpython.rlib.rbigint import rbigint, InvalidEndiannessError
@@ -219,6 +254,39 @@ def _promote(space, w_obj):
         jit.promote(w_obj)
     return w_obj
 
+@unwrap_spec(enabled=bool)
+def set_import_profiling(space, enabled):
+    """Start or stop recording the time spent importing modules.  Enabling
+    it again discards the previously recorded times."""
+    from pypy.module.imp.importing import getimportprofiler
+    profiler = getimportprofiler(space)
+    if enabled and not profiler.enabled:
+        profiler.roots = []
+    profiler.enabled = enabled
+
+def get_import_profile(space):
+    """Return the tree of imports recorded since set_import_profiling(True),
+    as a list of dicts with the keys 'name', 'total', 'find', 'read',
+    'compile', 'exec' (times in seconds) and 'children' (the modules
+    imported while executing that module, in the same format)."""
+    from pypy.module.imp.importing import getimportprofiler
+    return _wrap_import_profile(space, getimportprofiler(space).roots)
+
+def _wrap_import_profile(space, nodes):
+    from pypy.module.imp.importing import PHASES
+    nodes_w = []
+    for node in nodes:
+        w_node = space.newdict()
+        space.setitem_str(w_node, 'name', space.newtext(node.modulename))
+        space.setitem_str(w_node, 'total', space.newfloat(node.total))
+        for i in range(len(PHASES)):
+            space.setitem_str(w_node, PHASES[i],
+                              space.newfloat(node.phases[i]))
+        space.setitem_str(w_node, 'children',
+                          _wrap_import_profile(space, node.children))
+        nodes_w.append(w_node)
+    return space.newlist(nodes_w)
+
 def stack_almost_full(space):
     """Return True if the stack is more than 15/16th full."""
     return space.newbool(rstack.stack_almost_full())
@@ -6,7 +6,21 @@ class AppTestMagic:
     spaceconfig = dict(usemodules=['__pypy__'])
 
     def setup_class(cls):
+        from rpython.tool.udir import udir
         cls.w_file = cls.space.wrap(__file__)
+        d = udir.join('test_import_profile').ensure(dir=1)
+        d.join('impprof_outer.py').write('x = 1\nimport impprof_inner\n')
+        d.join('impprof_inner.py').write('y = 2\n')
+        pkg = d.join('impprof_pkg').ensure(dir=1)
+        pkg.join('__init__.py').write('import impprof_slow\n')
+        d.join('impprof_slow.py').write('z = 3\n')
+        d.join('impprof_loader.py').write(
+            'import imp, os\n'
+            'imp.load_source("impprof_loaded",\n'
+            '                os.path.join(os.path.dirname(__file__),\n'
+            '                             "impprof_loaded.py"))\n')
+        d.join('impprof_loaded.py').write('import time\ntime.sleep(0.2)\n')
+        cls.w_impprof_dir = cls.space.wrap(str(d))
 
     def test_save_module_content_for_future_reload(self):
         import sys, __pypy__
@@ -28,6 +42,7 @@ class AppTestMagic:
 
         import __pypy__
         __pypy__.set_code_callback(callable)
+        assert __pypy__.get_code_callback() is callable
         d = {}
         try:
             exec """
@@ -37,6 +52,7 @@ def f():
         finally:
             __pypy__.set_code_callback(None)
         assert d['f'].__code__ in l
+        assert __pypy__.get_code_callback() is None
 
     def test_decode_long(self):
         from __pypy__ import decode_long
@@ -84,3 +100,101 @@ def f():
         l = [1, 2]
         l.append(3)
         assert list_get_physical_size(l) >= 3 # should be 6, but untranslated 3
+
+    def test_import_profile(self):
+        import sys
+        from __pypy__ import set_import_profiling, get_import_profile
+        sys.path.insert(0, self.impprof_dir)
+        try:
+            set_import_profiling(True)
+            try:
+                import impprof_outer
+            finally:
+                set_import_profiling(False)
+        finally:
+            sys.path.remove(self.impprof_dir)
+        [outer] = get_import_profile()
+        assert outer['name'] == 'impprof_outer'
+        [inner] = outer['children']
+        assert inner['name'] == 'impprof_inner'
+        assert inner['children'] == []
+        for node in [outer, inner]:
+            phases = (node['find'] + node['read'] + node['compile'] +
+                      node['exec'])
+            assert 0.0 < phases <= node['total']
+        assert outer['exec'] >= inner['total']
+        # already imported: nothing recorded
+        set_import_profiling(True)
+        import impprof_outer
+        set_import_profiling(False)
+        assert get_import_profile() == []
+
+    def test_import_profile_failed_lookup(self):
+        import sys, time
+        from __pypy__ import set_import_profiling, get_import_profile
+        class SlowFinder(object):
+            def find_module(self, name, path=None):
+                if name == 'impprof_pkg.impprof_slow':
+                    time.sleep(0.1)
+        finder = SlowFinder()
+        sys.path.insert(0, self.impprof_dir)
+        sys.meta_path.append(finder)
+        try:
+            set_import_profiling(True)
+            try:
+                import impprof_pkg
+            finally:
+                set_import_profiling(False)
+        finally:
+            sys.meta_path.remove(finder)
+            sys.path.remove(self.impprof_dir)
+        # the implicit relative lookup of 'impprof_pkg.impprof_slow' fails
+        # and is counted as part of finding 'impprof_slow'
+        [pkg] = get_import_profile()
+        assert pkg['name'] == 'impprof_pkg'
+        [slow] = pkg['children']
+        assert slow['name'] == 'impprof_slow'
+        assert slow['find'] >= 0.1
+        assert slow['find'] <= slow['total'] <= pkg['exec']
+
+    def test_import_profile_load_source(self):
+        import sys
+        from __pypy__ import set_import_profiling, get_import_profile
+        sys.path.insert(0, self.impprof_dir)
+        try:
+            set_import_profiling(True)
+            try:
+                import impprof_loader
+            finally:
+                set_import_profiling(False)
+        finally:
+            sys.path.remove(self.impprof_dir)
+        # imp.load_source() is not an import: its time is only part of
+        # the exec time of impprof_loader, and not counted a second time
+        [loader] = get_import_profile()
+        assert loader['name'] == 'impprof_loader'
+        names = [child['name'] for child in loader['children']]
+        assert 'impprof_loaded' not in names
+        assert loader['exec'] >= 0.2
+        phases = (loader['find'] + loader['read'] + loader['compile'] +
+                  loader['exec'])
+        assert phases <= loader['total']
+
+    def test_caller_info(self):
+        import sys
+        from __pypy__ import caller_info
+        def f():
+            return g()
+        def g():
+            return [caller_info(0), caller_info(1)]
+        [(code0, lineno0), (code1, lineno1)] = f()
+        assert code0 is g.__code__
+        assert lineno0 == g.__code__.co_firstlineno + 1
+        assert code1 is f.__code__
+        assert lineno1 == f.__code__.co_firstlineno + 1
+        code, lineno = caller_info()
+        frame = sys._getframe()
+        assert code is frame.f_code
+        assert lineno == frame.f_lineno - 3
+        raises(ValueError, caller_info, -1)
+        raises(ValueError, caller_info, sys.getrecursionlimit() + 10)
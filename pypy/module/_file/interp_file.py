@@ -262,28 +262,10 @@ class W_File(W_AbstractStream):
     def direct_readlines(self, size=0):
         stream = self.getstream()
         self.check_readable()
-        # this is implemented as: .read().split('\n')
-        # except that it keeps the \n in the resulting strings
-        if size <= 0:
-            data = stream.readall()
-        else:
-            data = stream.read(size)
+        # the stream splits whole blocks of its buffer into lines; if
+        # size > 0, it stops after the line that reaches 'size' bytes
         result = []
-        splitfrom = 0
-        for i in range(len(data)):
-            if data[i] == '\n':
-                result.append(data[splitfrom : i + 1])
-                splitfrom = i + 1
-        #
-        if splitfrom < len(data):
-            # there is a partial line at the end.  If size > 0, it is likely
-            # to be because the 'read(size)' returned data up to the middle
-            # of a line.  In that case, use 'readline()' to read until the
-            # end of the current line.
-            data = data[splitfrom:]
-            if size > 0:
-                data += stream.readline()
-            result.append(data)
+        stream.readlines_into(result, size)
         return result
 
     @unwrap_spec(offset=r_longlong, whence=int)
@@ -387,6 +387,29 @@ class AppTestAFewExtra:
         assert len(somelines) > 200
         assert somelines == lines[:len(somelines)]
 
+    def test_readlines_across_blocks(self):
+        fn = self.temptestfile
+        lines = ['%d%s\n' % (i, 'x' * (i * 37 % 5000)) for i in range(200)]
+        lines.append('no newline at the end')
+        f = file(fn, 'wb')
+        f.writelines(lines)
+        f.close()
+        f = open(fn, 'rb')
+        assert f.readline() == lines[0]
+        assert f.readlines() == lines[1:]
+        assert f.readlines() == []
+        f.close()
+        f = open(fn, 'rb')
+        got = []
+        while True:
+            somelines = f.readlines(50000)
+            if not somelines:
+                break
+            assert len(''.join(somelines[:-1])) < 50000
+            got += somelines
+        assert got == lines
+        f.close()
+
     def test_writelines(self):
         import array
         import sys
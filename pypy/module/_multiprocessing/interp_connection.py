@@ -2,6 +2,8 @@ import sys
 from errno import EINTR
 
 from rpython.rlib import rpoll, rsocket
+from rpython.rlib.buffer import StringBuffer
+from rpython.rlib.objectmodel import keepalive_until_here
 from rpython.rlib.rarithmetic import intmask, r_uint
 from rpython.rtyper.lltypesystem import lltype, rffi
 
@@ -35,6 +37,22 @@ def BufferTooShort(space, w_data):
 def w_handle(space, handle):
     return space.newint(rffi.cast(rffi.INTPTR_T, handle))
 
+if sys.platform != 'win32':
+    from rpython.rtyper.tool import rffi_platform
+    from rpython.translator.tool.cbuild import ExternalCompilationInfo
+
+    class CConfig:
+        _compilation_info_ = ExternalCompilationInfo(includes=['sys/uio.h'])
+        IOVEC = rffi_platform.Struct('struct iovec',
+                                     [('iov_base', rffi.VOIDP),
+                                      ('iov_len', rffi.SIZE_T)])
+    IOVEC = rffi_platform.configure(CConfig)['IOVEC']
+    c_writev = rffi.llexternal('writev',
+                               [rffi.INT, rffi.CArrayPtr(IOVEC), rffi.INT],
+                               rffi.SSIZE_T,
+                               compilation_info=CConfig._compilation_info_,
+                               save_err=rffi.RFFI_SAVE_ERRNO)
+
 
 class W_BaseConnection(W_Root):
     BUFFER_SIZE = 1024
@@ -65,6 +83,36 @@ class W_BaseConnection(W_Root):
         raise NotImplementedError
     def do_recv_string(self, space, buflength, maxlength):
         raise NotImplementedError
+
+    # Default implementations, overridden by connections that can transfer
+    # data directly from and to the memory of a buffer
+    def do_send_buffer(self, space, buf, offset, size):
+        self.do_send_string(space, buf.as_str(), offset, size)
+
+    def do_recv_bytes(self, space, maxlength):
+        res, newbuf = self.do_recv_string(
+            space, self.BUFFER_SIZE, maxlength)
+        try:
+            if newbuf:
+                return space.newbytes(rffi.charpsize2str(newbuf, res))
+            else:
+                return space.newbytes(rffi.charpsize2str(self.buffer, res))
+        finally:
+            if newbuf:
+                rffi.free_charp(newbuf)
+
+    def do_recv_into(self, space, rwbuffer, offset):
+        res, newbuf = self.do_recv_string(
+            space, rwbuffer.getlength() - offset, PY_SSIZE_T_MAX)
+        try:
+            if newbuf:
+                raise BufferTooShort(space, space.newbytes(
+                    rffi.charpsize2str(newbuf, res)))
+            rwbuffer.setslice(offset, rffi.charpsize2str(self.buffer, res))
+        finally:
+            if newbuf:
+                rffi.free_charp(newbuf)
+        return res
     def do_poll(self, space, timeout):
         raise NotImplementedError
 
@@ -95,8 +143,8 @@ class W_BaseConnection(W_Root):
 
     @unwrap_spec(offset='index', size='index')
     def send_bytes(self, space, w_buf, offset=0, size=PY_SSIZE_T_MIN):
-        buf = space.getarg_w('s*', w_buf).as_str()
-        length = len(buf)
+        buf = space.getarg_w('s*', w_buf)
+        length = buf.getlength()
         self._check_writable(space)
         if offset < 0:
             raise oefmt(space.w_ValueError, "offset is negative")
@@ -110,7 +158,7 @@ class W_BaseConnection(W_Root):
         elif offset + size > length:
             raise oefmt(space.w_ValueError, "buffer length > offset + size")
 
-        self.do_send_string(space, buf, offset, size)
+        self.do_send_buffer(space, buf, offset, size)
 
     @unwrap_spec(maxlength='index')
     def recv_bytes(self, space, maxlength=PY_SSIZE_T_MAX):
@@ -118,33 +166,18 @@ class W_BaseConnection(W_Root):
         if maxlength < 0:
             raise oefmt(space.w_ValueError, "maxlength < 0")
 
-        res, newbuf = self.do_recv_string(
-            space, self.BUFFER_SIZE, maxlength)
-        try:
-            if newbuf:
-                return space.newbytes(rffi.charpsize2str(newbuf, res))
-            else:
-                return space.newbytes(rffi.charpsize2str(self.buffer, res))
-        finally:
-            if newbuf:
-                rffi.free_charp(newbuf)
+        return self.do_recv_bytes(space, maxlength)
 
     @unwrap_spec(offset='index')
     def recv_bytes_into(self, space, w_buffer, offset=0):
         rwbuffer = space.writebuf_w(w_buffer)
         length = rwbuffer.getlength()
+        if offset < 0:
+            raise oefmt(space.w_ValueError, "negative offset")
+        if offset > length:
+            raise oefmt(space.w_ValueError, "offset too large")
 
-        res, newbuf = self.do_recv_string(
-            space, length - offset, PY_SSIZE_T_MAX)
-        try:
-            if newbuf:
-                raise BufferTooShort(space, space.newbytes(
-                    rffi.charpsize2str(newbuf, res)))
-            rwbuffer.setslice(offset, rffi.charpsize2str(self.buffer, res))
-        finally:
-            if newbuf:
-                rffi.free_charp(newbuf)
-
+        res = self.do_recv_into(space, rwbuffer, offset)
         return space.newint(res)
 
     def send(self, space, w_obj):
@@ -162,16 +195,7 @@ class W_BaseConnection(W_Root):
     def recv(self, space):
         self._check_readable(space)
 
-        res, newbuf = self.do_recv_string(
-            space, self.BUFFER_SIZE, PY_SSIZE_T_MAX)
-        try:
-            if newbuf:
-                w_received = space.newbytes(rffi.charpsize2str(newbuf, res))
-            else:
-                w_received = space.newbytes(rffi.charpsize2str(self.buffer, res))
-        finally:
-            if newbuf:
-                rffi.free_charp(newbuf)
+        w_received = self.do_recv_bytes(space, PY_SSIZE_T_MAX)
 
         w_builtins = space.getbuiltinmodule('__builtin__')
         w_picklemodule = space.fromcache(State).w_picklemodule
@@ -211,30 +235,33 @@ class W_FileConnection(W_BaseConnection):
     INVALID_HANDLE_VALUE = -1
     fd = INVALID_HANDLE_VALUE
 
+    # WRITE() and READ() transfer data from and to raw memory, and return
+    # the number of bytes actually transferred
     if sys.platform == 'win32':
-        def WRITE(self, data):
+        def WRITE(self, data, size):
             from rpython.rlib._rsocket_rffi import send, geterrno
-            length = send(self.fd, data, len(data), 0)
+            length = send(self.fd, data, size, 0)
             if length < 0:
                 raise WindowsError(geterrno(), "send")
             return length
-        def READ(self, size):
+        def READ(self, buf, size):
             from rpython.rlib._rsocket_rffi import socketrecv, geterrno
-            with rffi.scoped_alloc_buffer(size) as buf:
-                length = socketrecv(self.fd, buf.raw, buf.size, 0)
-                if length < 0:
-                    raise WindowsError(geterrno(), "recv")
-                return buf.str(length)
+            length = socketrecv(self.fd, rffi.cast(rffi.VOIDP, buf), size, 0)
+            if length < 0:
+                raise WindowsError(geterrno(), "recv")
+            return intmask(length)
         def CLOSE(self):
             from rpython.rlib._rsocket_rffi import socketclose
             socketclose(self.fd)
     else:
-        def WRITE(self, data):
-            import os
-            return os.write(self.fd, data)
-        def READ(self, length):
-            import os
-            return os.read(self.fd, length)
+        def WRITE(self, data, size):
+            from rpython.rlib import rposix
+            return rposix.handle_posix_error('write', rposix.c_write(
+                self.fd, rffi.cast(rffi.VOIDP, data), size))
+        def READ(self, buf, size):
+            from rpython.rlib import rposix
+            return rposix.handle_posix_error('read', rposix.c_read(
+                self.fd, rffi.cast(rffi.VOIDP, buf), size))
         def CLOSE(self):
             import os
             try:
@@ -271,22 +298,86 @@ class W_FileConnection(W_BaseConnection):
             self.fd = self.INVALID_HANDLE_VALUE
 
     def do_send_string(self, space, buf, offset, size):
-        # Since str2charp copies the buf anyway, always combine the
-        # "header" and the "body" of the message and send them at once.
-        message = lltype.malloc(rffi.CCHARP.TO, size + 4, flavor='raw')
+        with rffi.scoped_nonmovingbuffer(buf) as charp:
+            self._send_message(space, rffi.ptradd(charp, offset), size)
+
+    def do_send_buffer(self, space, buf, offset, size):
+        # send directly from the memory of the buffer if it has a raw
+        # address; strings are pinned instead of copied
+        if isinstance(buf, StringBuffer):
+            self.do_send_string(space, buf.as_str(), offset, size)
+            return
         try:
-            length = rffi.r_uint(rsocket.htonl(
+            ptr = buf.get_raw_address()
+        except ValueError:
+            self.do_send_string(space, buf.as_str(), offset, size)
+            return
+        self._send_message(space, rffi.ptradd(ptr, offset), size, buf, offset)
+        keepalive_until_here(buf)
+
+    def _raw_address(self, space, rawbuf, pos, size):
+        # 'rawbuf' is a buffer whose memory is used in place, see
+        # do_send_buffer() and do_recv_into().  The signal handlers called
+        # on EINTR can resize it or free its memory, so its address is
+        # fetched again after them, and it must still be long enough.
+        if rawbuf.getlength() < pos + size:
+            raise oefmt(space.w_BufferError,
+                        "buffer was resized during the transfer")
+        return rffi.ptradd(rawbuf.get_raw_address(), pos)
+
+    def _send_message(self, space, data, size, rawbuf=None, pos=0):
+        with lltype.scoped_alloc(rffi.CArrayPtr(rffi.UINT).TO, 1) as header:
+            header[0] = rffi.r_uint(rsocket.htonl(
                     rffi.cast(lltype.Unsigned, size)))
-            rffi.cast(rffi.UINTP, message)[0] = length
-            i = size - 1
-            while i >= 0:
-                message[4 + i] = buf[offset + i]
-                i -= 1
-            self._sendall(space, message, size + 4)
-        finally:
-            lltype.free(message, flavor='raw')
+            self._sendall_with_header(space, rffi.cast(rffi.CCHARP, header),
+                                      data, size, rawbuf, pos)
 
-    def do_recv_string(self, space, buflength, maxlength):
+    if sys.platform == 'win32':
+        def _sendall_with_header(self, space, header, data, size,
+                                 rawbuf, pos):
+            # combine the "header" and the "body" of the message and send
+            # them at once
+            message = lltype.malloc(rffi.CCHARP.TO, size + 4, flavor='raw')
+            try:
+                rffi.c_memcpy(rffi.cast(rffi.VOIDP, message),
+                              rffi.cast(rffi.VOIDP, header), 4)
+                rffi.c_memcpy(rffi.cast(rffi.VOIDP, rffi.ptradd(message, 4)),
+                              rffi.cast(rffi.VOIDP, data), size)
+                self._sendall(space, message, size + 4)
+            finally:
+                lltype.free(message, flavor='raw')
+    else:
+        def _sendall_with_header(self, space, header, data, size,
+                                 rawbuf, pos):
+            # send the "header" and the "body" of the message with a single
+            # writev(), without copying them together; finish a partial
+            # write with _sendall()
+            with lltype.scoped_alloc(rffi.CArray(IOVEC), 2) as iov:
+                iov[0].c_iov_base = rffi.cast(rffi.VOIDP, header)
+                iov[0].c_iov_len = rffi.cast(rffi.SIZE_T, 4)
+                iov[1].c_iov_base = rffi.cast(rffi.VOIDP, data)
+                iov[1].c_iov_len = rffi.cast(rffi.SIZE_T, size)
+                while True:
+                    count = intmask(c_writev(self.fd, iov, 2))
+                    if count >= 0:
+                        break
+                    from rpython.rlib import rposix
+                    errno = rposix.get_saved_errno()
+                    if errno == EINTR:
+                        space.getexecutioncontext().checksignals()
+                        if rawbuf is not None:
+                            data = self._raw_address(space, rawbuf, pos, size)
+                            iov[1].c_iov_base = rffi.cast(rffi.VOIDP, data)
+                        continue
+                    raise wrap_oserror(space, OSError(errno, "writev"))
+            if count < 4:
+                self._sendall(space, rffi.ptradd(header, count), 4 - count)
+                count = 4
+            count -= 4
+            self._sendall(space, rffi.ptradd(data, count), size - count,
+                          rawbuf, pos + count)
+
+    def _recv_length(self, space, maxlength):
         with lltype.scoped_alloc(rffi.CArrayPtr(rffi.UINT).TO, 1) as length_ptr:
             self._recvall(space, rffi.cast(rffi.CCHARP, length_ptr), 4)
             length = intmask(rsocket.ntohl(
@@ -296,7 +387,41 @@ class W_FileConnection(W_BaseConnection):
             if self.flags == 0:
                 self.close()
             raise oefmt(space.w_IOError, "bad message length")
+        return length
+
+    def do_recv_into(self, space, rwbuffer, offset):
+        length = self._recv_length(space, PY_SSIZE_T_MAX)
+        if length > rwbuffer.getlength() - offset:
+            with rffi.scoped_alloc_buffer(length) as buf:
+                self._recvall(space, buf.raw, length)
+                data = buf.str(length)
+            raise BufferTooShort(space, space.newbytes(data))
+        try:
+            ptr = rwbuffer.get_raw_address()
+        except ValueError:
+            with rffi.scoped_alloc_buffer(length) as buf:
+                self._recvall(space, buf.raw, length)
+                rwbuffer.setslice(offset, buf.str(length))
+        else:
+            # read directly into the memory of the buffer
+            self._recvall(space, rffi.ptradd(ptr, offset), length,
+                          rwbuffer, offset)
+            keepalive_until_here(rwbuffer)
+        return length
+
+    def do_recv_bytes(self, space, maxlength):
+        length = self._recv_length(space, maxlength)
+        # read the message body directly into the memory of the result:
+        # scoped_alloc_buffer() allocates the result string itself and
+        # pins it (or it doesn't move anyway), and buf.str() with the full
+        # size returns that same string.  Only if the GC refuses to pin it
+        # is a separate raw buffer used, and copied once by buf.str().
+        with rffi.scoped_alloc_buffer(length) as buf:
+            self._recvall(space, buf.raw, length)
+            return space.newbytes(buf.str(length))
 
+    def do_recv_string(self, space, buflength, maxlength):
+        length = self._recv_length(space, maxlength)
         if length <= buflength:
             self._recvall(space, self.buffer, length)
             return length, lltype.nullptr(rffi.CCHARP.TO)
@@ -305,42 +430,44 @@ class W_FileConnection(W_BaseConnection):
             self._recvall(space, newbuf, length)
             return length, newbuf
 
-    def _sendall(self, space, message, size):
+    def _sendall(self, space, message, size, rawbuf=None, pos=0):
+        # if 'rawbuf' is given, 'message' points into its memory at 'pos'
         while size > 0:
-            # XXX inefficient
-            data = rffi.charpsize2str(message, size)
+            if rawbuf is not None:
+                message = self._raw_address(space, rawbuf, pos, size)
             try:
-                count = self.WRITE(data)
+                count = self.WRITE(message, size)
             except OSError as e:
                 if e.errno == EINTR:
                     space.getexecutioncontext().checksignals()
                     continue
                 raise wrap_oserror(space, e)
             size -= count
+            pos += count
             message = rffi.ptradd(message, count)
 
-    def _recvall(self, space, buf, length):
+    def _recvall(self, space, buf, length, rawbuf=None, pos=0):
+        # if 'rawbuf' is given, 'buf' points into its memory at 'pos'
         length = intmask(length)
         remaining = length
         while remaining > 0:
+            if rawbuf is not None:
+                buf = self._raw_address(space, rawbuf, pos, remaining)
             try:
-                data = self.READ(remaining)
+                count = self.READ(buf, remaining)
             except OSError as e:
                 if e.errno == EINTR:
                     space.getexecutioncontext().checksignals()
                     continue
                 raise wrap_oserror(space, e)
-            count = len(data)
             if count == 0:
                 if remaining == length:
                     raise OperationError(space.w_EOFError, space.w_None)
                 else:
                     raise oefmt(space.w_IOError,
                                 "got end of file during message")
-            # XXX inefficient
-            for i in range(count):
-                buf[i] = data[i]
             remaining -= count
+            pos += count
             buf = rffi.ptradd(buf, count)
 
     if sys.platform == 'win32':
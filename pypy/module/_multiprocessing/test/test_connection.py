@@ -91,6 +91,37 @@ class BaseConnectionTest(object):
         raises(multiprocessing.BufferTooShort, rhandle.recv_bytes_into, buffer)
         assert rhandle.readable
 
+    def test_send_recv_buffers(self):
+        import array
+        import sys
+        # if not translated, for win32
+        if not hasattr(sys, 'executable'):
+            sys.executable = 'from test_connection.py'
+        rhandle, whandle = self.make_pair()
+
+        data = ''.join([chr(i & 0xff) for i in range(50000)])
+        whandle.send_bytes(array.array('c', data))
+        whandle.send_bytes(bytearray(data), 10, 20)
+        whandle.send_bytes(memoryview(data)[5:])
+        whandle.send_bytes(buffer(data, 7), 1)
+        whandle.send_bytes("")
+        raises(ValueError, whandle.send_bytes, data, -1)
+        raises(ValueError, whandle.send_bytes, data, 50001)
+        raises(ValueError, whandle.send_bytes, data, 10, 49991)
+
+        assert rhandle.recv_bytes() == data
+        buf = bytearray(30)
+        assert rhandle.recv_bytes_into(buf, 3) == 20
+        assert buf[3:23] == data[10:30]
+        assert buf[:3] == '\x00' * 3 and buf[23:] == '\x00' * 7
+        arr = array.array('c', '\x00' * 60000)
+        assert rhandle.recv_bytes_into(arr, 100) == 49995
+        assert arr[100:100 + 49995].tostring() == data[5:]
+        assert rhandle.recv_bytes() == data[8:]
+        assert rhandle.recv_bytes() == ""
+        raises(ValueError, rhandle.recv_bytes_into, buf, -1)
+        raises(ValueError, rhandle.recv_bytes_into, buf, 31)
+
 class AppTestWinpipeConnection(BaseConnectionTest):
     spaceconfig = {
         "usemodules": [
@@ -209,6 +240,28 @@ class AppTestSocketConnection(BaseConnectionTest):
         data2 = sock.recv(8)
         assert data2 == '\x00\x00\x00\x04defg'
 
+    def test_recv_into_buffer_resized_by_signal(self):
+        import os, signal, struct
+        if not hasattr(signal, 'setitimer'):
+            skip('No setitimer in signal')
+        rhandle, whandle = self.make_pair()
+        buf = bytearray(100)
+        def handler(signum, frame):
+            del buf[10:]
+            os.write(whandle.fileno(), 'x' * 50)
+        signal.signal(signal.SIGALRM, handler)
+        try:
+            # the header of a 50-byte message, without the body: the read
+            # blocks until the signal handler shrinks the buffer and sends
+            # the body
+            os.write(whandle.fileno(), struct.pack('!i', 50))
+            signal.setitimer(signal.ITIMER_REAL, 0.2)
+            raises(BufferError, rhandle.recv_bytes_into, buf)
+        finally:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, signal.SIG_DFL)
+        assert len(buf) == 10
+
     def test_repr(self):
         import _multiprocessing, os
         fd = os.dup(1)     # closed by Connection.__del__
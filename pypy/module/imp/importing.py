@@ -2,7 +2,7 @@
 Implementation of the interpreter-level default import logic.
 """
 
-import sys, os, stat
+import sys, os, stat, time
 
 from pypy.interpreter.module import Module
 from pypy.interpreter.gateway import interp2app, unwrap_spec
@@ -15,6 +15,7 @@ from pypy.interpreter.streamutil import wrap_streamerror
 from rpython.rlib import streamio, jit
 from rpython.rlib.streamio import StreamErrors
 from rpython.rlib.objectmodel import we_are_translated, specialize
+from rpython.rlib.debug import debug_start, debug_stop, debug_print
 from pypy.module.sys.version import PYPY_VERSION
 
 _WIN32 = sys.platform == 'win32'
@@ -60,12 +61,20 @@ def log_pyverbose(space, level, message):
         w_stderr = space.sys.get('stderr')
         space.call_method(w_stderr, "write", space.newtext(message))
 
-def file_exists(path):
-    "Test whether the given path is an existing regular file."
+def file_exists(path, listing=None):
+    """Test whether the given path is an existing regular file.
+    'listing' is the cached content of the directory of 'path', if known;
+    see DirectoryCache.
+    """
+    if listing is not None:
+        # the listing has the exact case, so case_ok() is not needed
+        return path in listing and os.path.isfile(path)
     return os.path.isfile(path) and case_ok(path)
 
-def path_exists(path):
+def path_exists(path, listing=None):
     "Test whether the given path exists."
+    if listing is not None:
+        return path in listing
     return os.path.exists(path) and case_ok(path)
 
 def has_so_extension(space):
@@ -74,27 +83,30 @@ def has_so_extension(space):
 
 def has_init_module(space, filepart):
     "Return True if the directory filepart qualifies as a package."
+    listing = getdircache(space).listdir(filepart)
     init = os.path.join(filepart, "__init__")
-    if path_exists(init + ".py"):
+    if path_exists(init + ".py", listing):
         return True
-    if space.config.objspace.lonepycfiles and path_exists(init + ".pyc"):
+    if (space.config.objspace.lonepycfiles and
+            path_exists(init + ".pyc", listing)):
         return True
     return False
 
-def find_modtype(space, filepart):
+def find_modtype(space, filepart, listing=None):
     """Check which kind of module to import for the given filepart,
     which is a path without extension.  Returns PY_SOURCE, PY_COMPILED or
-    SEARCH_ERROR.
+    SEARCH_ERROR.  'listing' is the cached content of the directory
+    containing filepart, or None.
     """
     # check the .py file
     pyfile = filepart + ".py"
-    if file_exists(pyfile):
+    if file_exists(pyfile, listing):
         return PY_SOURCE, ".py", "U"
 
     # on Windows, also check for a .pyw file
     if _WIN32:
         pyfile = filepart + ".pyw"
-        if file_exists(pyfile):
+        if file_exists(pyfile, listing):
             return PY_SOURCE, ".pyw", "U"
 
     # The .py file does not exist.  By default on PyPy, lonepycfiles
@@ -105,14 +117,14 @@ def find_modtype(space, filepart):
     # check the .pyc file
     if space.config.objspace.lonepycfiles:
         pycfile = filepart + ".pyc"
-        if file_exists(pycfile):
+        if file_exists(pycfile, listing):
             # existing .pyc file
             return PY_COMPILED, ".pyc", "rb"
 
     if has_so_extension(space):
         so_extension = get_so_extension(space)
         pydfile = filepart + so_extension
-        if file_exists(pydfile):
+        if file_exists(pydfile, listing):
             return C_EXTENSION, so_extension, "rb"
 
     return SEARCH_ERROR, None, None
@@ -137,6 +149,242 @@ else:
         except OSError:
             return False
 
+# ____________________________________________________________
+#
+# Directory listing cache.  Looking for a module in a directory of
+# sys.path costs one stat() per candidate file name, for every import and
+# every entry of sys.path.  Instead, we stat() the directory itself and
+# keep the result of listdir() as long as its modification time does not
+# change.  A listing whose mtime is very close to the current time is not
+# kept, because more changes could occur within the resolution of the
+# timestamp; in-place changes that do not show up in the mtime at all
+# (e.g. on some network filesystems) need an explicit call to
+# imp.invalidate_caches().
+
+class DirectoryListing(object):
+    def __init__(self, mtime, names):
+        self.mtime = mtime
+        self.names = names     # {os.path.join(dir, entry): None}
+
+class DirectoryCache(object):
+    RACY_DELAY = 2.0     # seconds; FAT has a 2-seconds mtime resolution
+
+    def __init__(self, space):
+        self.listings = {}
+
+    def listdir(self, path):
+        """Return a dict whose keys are os.path.join(path, entry) for all
+        entries of the directory 'path', or None if we cannot tell and the
+        caller must check the files individually.
+        """
+        if not os.path.isabs(path):
+            return None      # depends on the current working directory
+        try:
+            st = os.stat(path)
+        except OSError:
+            return _empty_listing     # nothing can be found in there
+        if not stat.S_ISDIR(st.st_mode):
+            return _empty_listing
+        mtime = st.st_mtime
+        listing = self.listings.get(path, None)
+        if listing is not None and listing.mtime == mtime:
+            return listing.names
+        try:
+            entries = os.listdir(path)
+        except OSError:
+            return None      # e.g. search but no read permission
+        names = {}
+        for entry in entries:
+            names[os.path.join(path, entry)] = None
+        if time.time() - mtime > self.RACY_DELAY:
+            self.listings[path] = DirectoryListing(mtime, names)
+        elif listing is not None:
+            del self.listings[path]
+        return names
+
+    def invalidate(self):
+        self.listings.clear()
+
+_empty_listing = {}
+
+def getdircache(space):
+    return space.fromcache(DirectoryCache)
+
+# ____________________________________________________________
+#
+# Startup snapshot.  app_main.py can load, in one go, the code objects of
+# all the source modules that a previous run of the same program imported
+# (see PYPYSTARTUPSNAPSHOT there).  Modules are still found the normal
+# way; only the .pyc is not looked for if the snapshot contains a code
+# object compiled from a source file with the same mtime.  While
+# recording, the modules missing from the snapshot or stale are added to
+# it, and 'changed' tells app_main.py that the file must be rewritten.
+# The snapshot is not used with -OO, which strips the docstrings of the
+# code objects in place.
+
+class SnapshotEntry(object):
+    def __init__(self, mtime, code_w, from_pyc):
+        self.mtime = mtime
+        self.code_w = code_w
+        self.from_pyc = from_pyc    # the module's __file__ is the .pyc
+
+class StartupSnapshot(object):
+    # at most that many entries are saved, the ones used by the current
+    # process first
+    MAX_ENTRIES = 2000
+
+    def __init__(self, space):
+        self.codes = {}          # {pathname: SnapshotEntry}
+        self.used = {}           # {pathname: None} imported by this process
+        self.recording = False
+        self.changed = False
+
+    def add(self, pathname, mtime, code_w, from_pyc):
+        self.codes[pathname] = SnapshotEntry(mtime, code_w, from_pyc)
+
+    def lookup(self, pathname, mtime):
+        entry = self.codes.get(pathname, None)
+        if entry is None:
+            return None
+        if entry.mtime != mtime:
+            del self.codes[pathname]      # stale
+            return None
+        return entry
+
+    def record(self, pathname, mtime, code_w, from_pyc):
+        if not self.recording:
+            return
+        self.used[pathname] = None
+        entry = self.codes.get(pathname, None)
+        if entry is not None and entry.code_w is code_w:
+            return                        # taken from the snapshot
+        self.codes[pathname] = SnapshotEntry(mtime, code_w, from_pyc)
+        self.changed = True
+
+    def entries_to_save(self):
+        """Return the list of (pathname, entry) to write to the file, or
+        None if it doesn't need to be rewritten.  Entries not used by
+        this process are dropped if their source file changed or is gone,
+        or if there are too many."""
+        result = []
+        for pathname in self.used:
+            entry = self.codes.get(pathname, None)
+            if entry is not None and len(result) < self.MAX_ENTRIES:
+                result.append((pathname, entry))
+        pruned = len(result) < len(self.used)
+        for pathname, entry in self.codes.items():
+            if pathname in self.used:
+                continue
+            if (len(result) >= self.MAX_ENTRIES or
+                    not _source_unchanged(pathname, entry.mtime)):
+                pruned = True
+                continue
+            result.append((pathname, entry))
+        if not self.changed and not pruned:
+            return None
+        return result
+
+def _source_unchanged(pathname, mtime):
+    try:
+        st = os.stat(pathname)
+    except OSError:
+        return False
+    return int(st[stat.ST_MTIME]) == mtime
+
+def getstartupsnapshot(space):
+    return space.fromcache(StartupSnapshot)
+
+# ____________________________________________________________
+#
+# Import profiling.  Every lookup of a module that is not in sys.modules
+# yet is logged as a PYPYLOG section "import-find".  If the module is
+# found, it is followed by a section "import" with the module name,
+# containing the sections "import-read" (reading the source or the .pyc,
+# including unmarshalling), "import-compile" and "import-exec"; the latter
+# contains the sections of the modules imported by the module body.  If
+# enabled with __pypy__.set_import_profiling(), the same times are also
+# recorded as a tree of ImportProfileNodes (see "-X importtime" in
+# app_main.py).  The time of the lookups that fail within an import
+# statement, like the implicit relative lookup of 'pkg.foo' before 'foo',
+# is counted as find time of the module that is eventually imported.
+
+PHASES = ['find', 'read', 'compile', 'exec']
+PHASE_FIND = 0
+PHASE_READ = 1
+PHASE_COMPILE = 2
+PHASE_EXEC = 3
+
+class ImportProfileNode(object):
+    def __init__(self, modulename, parent):
+        self.modulename = modulename
+        self.parent = parent
+        self.start = 0.0
+        self.total = 0.0
+        self.phases = [0.0] * len(PHASES)
+        self.children = []
+
+class ImportProfiler(object):
+    def __init__(self, space):
+        self.space = space
+        self.enabled = False
+        self.current = None     # node of the module being imported
+        self.roots = []
+        self.failed_find = 0.0  # time of the failed lookups so far
+
+    def leave_find(self, start, found):
+        """Close the "import-find" section opened with enter_phase().
+        If the module was found, enter_module() must be called next."""
+        if self.enabled and not found:
+            self.failed_find += time.time() - start
+        debug_stop("import-find")
+
+    def forget_failed_finds(self):
+        """Called at the end of an import statement: the failed lookups
+        did not lead to importing a module."""
+        self.failed_find = 0.0
+
+    def enter_module(self, modulename, find_start):
+        debug_start("import")
+        debug_print(modulename)
+        if not self.enabled:
+            return None
+        node = ImportProfileNode(modulename, self.current)
+        node.start = find_start - self.failed_find
+        node.phases[PHASE_FIND] = time.time() - node.start
+        self.failed_find = 0.0
+        self.current = node
+        return node
+
+    def leave_module(self, node):
+        if node is not None:
+            node.total = time.time() - node.start
+            self.current = node.parent
+            if node.parent is None:
+                self.roots.append(node)
+            else:
+                node.parent.children.append(node)
+        debug_stop("import")
+
+    @specialize.arg(1)
+    def enter_phase(self, category):
+        debug_start(category)
+        if self.enabled:
+            return time.time()
+        return 0.0
+
+    @specialize.arg(1, 2)
+    def leave_phase(self, category, phase, start, w_modulename):
+        # only count the phase if it belongs to the module being imported,
+        # and not e.g. to imp.load_source() called from its body
+        node = self.current
+        if (node is not None and
+                node.modulename == self.space.text_w(w_modulename)):
+            node.phases[phase] += time.time() - start
+        debug_stop(category)
+
+def getimportprofiler(space):
+    return space.fromcache(ImportProfiler)
+
 def try_getattr(space, w_obj, w_name):
     try:
         return space.getattr(w_obj, w_name)
@@ -321,10 +569,15 @@ def absolute_import_with_lock(space, modulename, baselevel,
                               w_fromlist, tentative):
     lock = getimportlock(space)
     lock.acquire_lock()
+    w_mod = None
     try:
-        return _absolute_import(space, modulename, baselevel,
-                                w_fromlist, tentative)
+        w_mod = _absolute_import(space, modulename, baselevel,
+                                 w_fromlist, tentative)
+        return w_mod
     finally:
+        if w_mod is not None or not tentative:
+            # a failed tentative import is followed by the absolute one
+            getimportprofiler(space).forget_failed_finds()
         lock.release_lock(silent_after_fork=True)
 
 @jit.unroll_safe
@@ -578,14 +831,19 @@ def find_module(space, modulename, w_modulename, partname, w_path,
             path = space.fsencode_w(w_pathitem)
             filepart = os.path.join(path, partname)
             log_pyverbose(space, 2, "# trying %s\n" % (filepart,))
-            if os.path.isdir(filepart) and case_ok(filepart):
+            listing = getdircache(space).listdir(path)
+            if listing is None:
+                is_dir = os.path.isdir(filepart) and case_ok(filepart)
+            else:
+                is_dir = filepart in listing and os.path.isdir(filepart)
+            if is_dir:
                 if has_init_module(space, filepart):
                     return FindInfo(PKG_DIRECTORY, filepart, None)
                 else:
                     msg = ("Not importing directory '%s' missing __init__.py" %
                            (filepart,))
                     space.warn(space.newtext(msg), space.w_ImportWarning)
-            modtype, suffix, filemode = find_modtype(space, filepart)
+            modtype, suffix, filemode = find_modtype(space, filepart, listing)
             try:
                 if modtype in (PY_SOURCE, PY_COMPILED, C_EXTENSION):
                     assert suffix is not None
@@ -657,23 +915,41 @@ def load_module(space, w_modulename, find_info, reuse=False):
             pkgdir = None
         _prepare_module(space, w_mod, find_info.filename, pkgdir)
 
+        profiler = getimportprofiler(space)
         try:
             if find_info.modtype == PY_SOURCE:
+                start = profiler.enter_phase("import-read")
+                try:
+                    source = _wrap_readall(space, find_info.stream)
+                finally:
+                    profiler.leave_phase("import-read", PHASE_READ, start,
+                                         w_modulename)
                 return load_source_module(
                     space, w_modulename, w_mod,
-                    find_info.filename, _wrap_readall(space, find_info.stream),
+                    find_info.filename, source,
                     find_info.stream.try_to_find_file_descriptor())
             elif find_info.modtype == PY_COMPILED:
-                magic = _wrap_r_long(space, find_info.stream)
-                timestamp = _wrap_r_long(space, find_info.stream)
+                start = profiler.enter_phase("import-read")
+                try:
+                    magic = _wrap_r_long(space, find_info.stream)
+                    timestamp = _wrap_r_long(space, find_info.stream)
+                    source = _wrap_readall(space, find_info.stream)
+                finally:
+                    profiler.leave_phase("import-read", PHASE_READ, start,
+                                         w_modulename)
                 return load_compiled_module(space, w_modulename, w_mod, find_info.filename,
-                                     magic, timestamp,
-                                     _wrap_readall(space, find_info.stream))
+                                     magic, timestamp, source)
             elif find_info.modtype == PKG_DIRECTORY:
                 w_path = space.newlist([space.newtext(find_info.filename)])
                 space.setattr(w_mod, space.newtext('__path__'), w_path)
-                find_info = find_module(space, "__init__", None, "__init__",
-                                        w_path, use_loader=False)
+                start = profiler.enter_phase("import-find")
+                try:
+                    find_info = find_module(space, "__init__", None,
+                                            "__init__", w_path,
+                                            use_loader=False)
+                finally:
+                    profiler.leave_phase("import-find", PHASE_FIND, start,
+                                         w_modulename)
                 if find_info is None:
                     return w_mod
                 try:
@@ -699,20 +975,28 @@ def load_part(space, w_path, prefix, partname, w_parent, tentative):
         if not space.is_w(w_mod, space.w_None):
             return w_mod
     elif not prefix or w_path is not None:
-        find_info = find_module(
-            space, modulename, w_modulename, partname, w_path)
-
+        profiler = getimportprofiler(space)
+        find_info = None
+        start = profiler.enter_phase("import-find")
+        debug_print(modulename)
         try:
-            if find_info:
+            find_info = find_module(
+                space, modulename, w_modulename, partname, w_path)
+        finally:
+            profiler.leave_find(start, find_info is not None)
+
+        if find_info:
+            node = profiler.enter_module(modulename, start)
+            try:
                 w_mod = load_module(space, w_modulename, find_info)
                 if w_parent is not None:
                     space.setattr(w_parent, space.newtext(partname), w_mod)
                 return w_mod
-        finally:
-            if find_info:
+            finally:
                 stream = find_info.stream
                 if stream:
                     _close_ignore(stream)
+                profiler.leave_module(node)
 
     if tentative:
         return None
@@ -867,11 +1151,12 @@ def getimportlock(space):
 # CPython leaves a gap of 10 when it increases its own magic number.
 # To avoid assigning exactly the same numbers as CPython, we can pick
 # any number between CPython + 2 and CPython + 9.  Right now,
-# default_magic = CPython + 7.
+# default_magic = CPython + 8.
 #
 #     CPython + 0                  -- used by CPython without the -U option
 #     CPython + 1                  -- used by CPython with the -U option
-#     CPython + 7 = default_magic  -- used by PyPy (incompatible!)
+#     CPython + 7                  -- used by PyPy before superinstructions
+#     CPython + 8 = default_magic  -- used by PyPy (incompatible!)
 #
 from pypy.interpreter.pycode import default_magic
 MARSHAL_VERSION_FOR_PYC = 2
@@ -902,7 +1187,12 @@ def exec_code_module(space, w_mod, code_w, w_modulename, check_afterwards=True):
     space.call_method(w_dict, 'setdefault',
                       space.newtext('__builtins__'),
                       space.builtin)
-    code_w.exec_code(space, w_dict, w_dict)
+    profiler = getimportprofiler(space)
+    start = profiler.enter_phase("import-exec")
+    try:
+        code_w.exec_code(space, w_dict, w_dict)
+    finally:
+        profiler.leave_phase("import-exec", PHASE_EXEC, start, w_modulename)
 
     if check_afterwards:
         w_mod = check_sys_modules(space, w_modulename)
@@ -931,28 +1221,62 @@ def load_source_module(space, w_modulename, w_mod, pathname, source, fd,
     cpathname = pathname + 'c'
     mtime = int(src_stat[stat.ST_MTIME])
     mode = src_stat[stat.ST_MODE]
-    stream = check_compiled_module(space, cpathname, mtime)
-
-    if stream:
+    try:
+        optimize = space.sys.get_flag('optimize')
+    except RuntimeError:
+        # during bootstrapping
+        optimize = 0
+    snapshot = getstartupsnapshot(space)
+    use_snapshot = optimize < 2     # see StartupSnapshot
+    code_w = None
+    from_pyc = False
+    if use_snapshot:
+        entry = snapshot.lookup(pathname, mtime)
+        if entry is not None:
+            code_w = entry.code_w
+            from_pyc = entry.from_pyc
+    profiler = getimportprofiler(space)
+    if code_w is not None:
+        stream = None
+    else:
+        start = profiler.enter_phase("import-read")
+        try:
+            stream = check_compiled_module(space, cpathname, mtime)
+        finally:
+            profiler.leave_phase("import-read", PHASE_READ, start,
+                                 w_modulename)
+
+    if code_w is not None:
+        # from the startup snapshot
+        if from_pyc:
+            space.setattr(w_mod, space.newtext('__file__'),
+                          space.newtext(cpathname))
+    elif stream:
         # existing and up-to-date .pyc file
+        start = profiler.enter_phase("import-read")
         try:
             code_w = read_compiled_module(space, cpathname,
                                           _wrap_readall(space, stream))
         finally:
             _close_ignore(stream)
+            profiler.leave_phase("import-read", PHASE_READ, start,
+                                 w_modulename)
         space.setattr(w_mod, space.newtext('__file__'), space.newtext(cpathname))
+        from_pyc = True
     else:
-        code_w = parse_source_module(space, pathname, source)
+        start = profiler.enter_phase("import-compile")
+        try:
+            code_w = parse_source_module(space, pathname, source)
+        finally:
+            profiler.leave_phase("import-compile", PHASE_COMPILE, start,
+                                 w_modulename)
 
         if write_pyc:
             if not space.is_true(space.sys.get('dont_write_bytecode')):
                 write_compiled_module(space, code_w, cpathname, mode, mtime)
+    if use_snapshot:
+        snapshot.record(pathname, mtime, code_w, from_pyc)
 
-    try:
-        optimize = space.sys.get_flag('optimize')
-    except RuntimeError:
-        # during bootstrapping
-        optimize = 0
     if optimize >= 2:
         code_w.remove_docstrings(space)
 
@@ -1078,7 +1402,13 @@ def load_compiled_module(space, w_modulename, w_mod, cpathname, magic,
     if magic != get_pyc_magic(space):
         raise oefmt(space.w_ImportError, "Bad magic number in %s", cpathname)
     #print "loading pyc file:", cpathname
-    code_w = read_compiled_module(space, cpathname, source)
+    profiler = getimportprofiler(space)
+    start = profiler.enter_phase("import-read")
+    try:
+        code_w = read_compiled_module(space, cpathname, source)
+    finally:
+        profiler.leave_phase("import-read", PHASE_READ, start,
+                             w_modulename)
     try:
         optimize = space.sys.get_flag('optimize')
     except RuntimeError:
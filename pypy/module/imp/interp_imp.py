@@ -4,6 +4,7 @@ from rpython.rlib import streamio
 from rpython.rlib.streamio import StreamErrors
 from pypy.interpreter.error import oefmt
 from pypy.interpreter.module import Module
+from pypy.interpreter.pycode import PyCode
 from pypy.interpreter.gateway import unwrap_spec
 from pypy.interpreter.streamutil import wrap_streamerror
 
@@ -144,6 +145,44 @@ def load_dynamic(space, w_modulename, filename, w_file=None):
 def new_module(space, w_name):
     return Module(space, w_name, add_package=False)
 
+def invalidate_caches(space):
+    """Forget the cached directory listings used to find modules.  Needed
+    only if files are added to a directory of sys.path without changing
+    its modification time."""
+    importing.getdircache(space).invalidate()
+
+def _load_startup_snapshot(space, w_entries):
+    """Internal, used by app_main.py: 'entries' is a list of tuples
+    (source pathname, source mtime, code object, loaded from the .pyc)."""
+    snapshot = importing.getstartupsnapshot(space)
+    for w_entry in space.listview(w_entries):
+        w_pathname, w_mtime, w_code, w_from_pyc = space.fixedview(w_entry, 4)
+        code_w = space.interp_w(PyCode, w_code)
+        snapshot.add(space.fsencode_w(w_pathname), space.int_w(w_mtime),
+                     code_w, space.is_true(w_from_pyc))
+
+def _record_startup_snapshot(space):
+    """Internal, used by app_main.py: from now on, add to the snapshot the
+    code objects of all source modules imported that are missing from it
+    or stale."""
+    importing.getstartupsnapshot(space).recording = True
+
+def _get_startup_snapshot(space):
+    """Internal, used by app_main.py: return the list of entries to save,
+    in the format expected by _load_startup_snapshot(), or None if the
+    snapshot loaded by _load_startup_snapshot() is still up to date."""
+    snapshot = importing.getstartupsnapshot(space)
+    entries = snapshot.entries_to_save()
+    if entries is None:
+        return space.w_None
+    entries_w = []
+    for pathname, entry in entries:
+        entries_w.append(space.newtuple([space.newtext(pathname),
+                                         space.newint(entry.mtime),
+                                         entry.code_w,
+                                         space.newbool(entry.from_pyc)]))
+    return space.newlist(entries_w)
+
 def init_builtin(space, w_name):
     name = space.text0_w(w_name)
     if name not in space.builtin_modules:
@@ -24,6 +24,10 @@ class Module(MixedModule):
         'load_dynamic':    'interp_imp.load_dynamic',
         '_run_compiled_module': 'interp_imp._run_compiled_module',   # pypy
         '_getimporter':    'importing._getimporter',                 # pypy
+        'invalidate_caches': 'interp_imp.invalidate_caches',         # pypy
+        '_load_startup_snapshot': 'interp_imp._load_startup_snapshot',     # pypy
+        '_record_startup_snapshot': 'interp_imp._record_startup_snapshot', # pypy
+        '_get_startup_snapshot': 'interp_imp._get_startup_snapshot',       # pypy
         #'run_module':      'interp_imp.run_module',
         'new_module':      'interp_imp.new_module',
         'init_builtin':    'interp_imp.init_builtin',
@@ -4,7 +4,7 @@ from pypy.interpreter import gateway
 from pypy.interpreter.error import OperationError
 import pypy.interpreter.pycode
 from rpython.tool.udir import udir
-from rpython.rlib import streamio
+from rpython.rlib import streamio, debug
 from pypy.tool.option import make_config
 from pypy.tool.pytest.objspace import maketestobjspace
 import pytest
@@ -1196,6 +1196,108 @@ class TestPycStuff:
                     stream.close()
 
 
+class TestDirectoryCache:
+    def test_listdir(self, space):
+        p = udir.join('test_dircache').ensure(dir=1)
+        p.join('x.py').write('')
+        os.utime(str(p), (1000000000, 1000000000))
+        cache = importing.DirectoryCache(space)
+        path = str(p)
+        listing = cache.listdir(path)
+        assert listing == {os.path.join(path, 'x.py'): None}
+        assert cache.listdir(path) is listing
+        # a change that does not show up in the mtime is not seen...
+        p.join('y.py').write('')
+        os.utime(str(p), (1000000000, 1000000000))
+        assert cache.listdir(path) is listing
+        # ...until the cache is invalidated
+        cache.invalidate()
+        listing = cache.listdir(path)
+        assert os.path.join(path, 'y.py') in listing
+        # recently modified directories are not cached
+        p.join('z.py').write('')
+        listing = cache.listdir(path)
+        assert os.path.join(path, 'z.py') in listing
+        assert path not in cache.listings
+        # non-directories cannot contain anything; relative paths are
+        # not cached at all
+        assert cache.listdir(str(p.join('x.py'))) == {}
+        assert cache.listdir(str(p.join('nonexistent'))) == {}
+        assert cache.listdir('') is None
+
+class TestStartupSnapshot:
+    def test_changed(self, space):
+        snapshot = importing.StartupSnapshot(space)
+        code_a, code_b = object(), object()
+        snapshot.add('a.py', 10, code_a, False)
+        snapshot.recording = True
+        # a module taken from the snapshot does not change it
+        assert snapshot.lookup('a.py', 10).code_w is code_a
+        snapshot.record('a.py', 10, code_a, False)
+        assert not snapshot.changed
+        # a missing module does
+        assert snapshot.lookup('b.py', 10) is None
+        snapshot.record('b.py', 10, code_b, True)
+        assert snapshot.changed
+        entry = snapshot.codes['b.py']
+        assert (entry.mtime, entry.code_w, entry.from_pyc) == (10, code_b, True)
+        # and so does a stale one
+        snapshot.changed = False
+        assert snapshot.lookup('a.py', 11) is None
+        snapshot.record('a.py', 11, code_b, False)
+        assert snapshot.changed
+        assert snapshot.codes['a.py'].mtime == 11
+
+    def test_entries_to_save(self, space):
+        p = udir.join('test_snapshot_prune').ensure(dir=1)
+        p.join('fresh.py').write('')
+        p.join('stale.py').write('')
+        fresh = str(p.join('fresh.py'))
+        stale = str(p.join('stale.py'))
+        fresh_mtime = int(os.stat(fresh).st_mtime)
+        snapshot = importing.StartupSnapshot(space)
+        snapshot.add(fresh, fresh_mtime, object(), False)
+        snapshot.recording = True
+        assert snapshot.entries_to_save() is None
+        # entries whose source changed or is gone are dropped
+        snapshot.add(stale, fresh_mtime - 10, object(), False)
+        snapshot.add(str(p.join('gone.py')), fresh_mtime, object(), False)
+        entries = snapshot.entries_to_save()
+        assert [pathname for pathname, _ in entries] == [fresh]
+        # the entries used by this process come first
+        snapshot.MAX_ENTRIES = 1
+        snapshot.record('used.py', 5, object(), False)
+        entries = snapshot.entries_to_save()
+        assert [pathname for pathname, _ in entries] == ['used.py']
+
+class TestImportProfiler:
+    def test_log_sections(self, space, monkeypatch):
+        p = udir.join('test_import_log').ensure(dir=1)
+        p.join('implog_pkg').ensure(dir=1).join('__init__.py').write(
+            'import implog_mod\n')
+        p.join('implog_mod.py').write('')
+        dlog = debug.DebugLog()
+        monkeypatch.setattr(debug, '_log', dlog)
+        space.appexec([space.wrap(str(p))], """(path):
+            import sys
+            sys.path.insert(0, path)
+            try:
+                import implog_pkg
+            finally:
+                sys.path.remove(path)
+        """)
+        def sections(log):
+            return [(entry[0], entry[1][0][1]) for entry in log
+                    if entry[0] in ('import', 'import-find')]
+        assert sections(dlog) == [('import-find', 'implog_pkg'),
+                                  ('import', 'implog_pkg')]
+        [exec_log] = [entry[1] for entry in dlog[-1][1]
+                      if entry[0] == 'import-exec']
+        # the failed implicit relative lookup is only an "import-find"
+        assert sections(exec_log) == [('import-find', 'implog_pkg.implog_mod'),
+                                      ('import-find', 'implog_mod'),
+                                      ('import', 'implog_mod')]
+
 def test_PYTHONPATH_takes_precedence(space):
     if sys.platform == "win32":
         py.test.skip("unresolved issues with win32 shell quoting rules")
@@ -1448,6 +1550,61 @@ class AppTestPyPyExtension(object):
         raises(IOError, imp._run_compiled_module,
                'foobar', 'this_file_does_not_exist', None, module)
 
+    def test_invalidate_caches(self):
+        import imp, os, sys
+        path = os.path.join(self.udir, 'test_invalidate_caches')
+        os.mkdir(path)
+        with open(os.path.join(path, 'invcache1.py'), 'w') as f:
+            f.write('x = 1\n')
+        os.utime(path, (1000000000, 1000000000))
+        sys.path.insert(0, path)
+        try:
+            import invcache1
+            assert invcache1.x == 1
+            # add a module without changing the mtime of the directory
+            with open(os.path.join(path, 'invcache2.py'), 'w') as f:
+                f.write('x = 2\n')
+            os.utime(path, (1000000000, 1000000000))
+            raises(ImportError, "import invcache2")
+            imp.invalidate_caches()
+            import invcache2
+            assert invcache2.x == 2
+        finally:
+            sys.path.remove(path)
+
+    def test_startup_snapshot(self):
+        import imp, os, sys
+        path = os.path.join(self.udir, 'test_startup_snapshot')
+        os.mkdir(path)
+        fn = os.path.join(path, 'snapmod.py')
+        with open(fn, 'w') as f:
+            f.write('x = 1\n')
+        sys.path.insert(0, path)
+        try:
+            imp._record_startup_snapshot()
+            import snapmod
+            assert snapmod.x == 1
+            [entry] = [e for e in imp._get_startup_snapshot() if e[0] == fn]
+            assert entry[1] == int(os.stat(fn).st_mtime)
+            assert entry[2].co_filename == fn
+            assert entry[3] is False      # compiled from the source
+            #
+            # a code object from the snapshot is used instead of the .pyc
+            del sys.modules['snapmod']
+            code = compile('x = 2\n', fn, 'exec')
+            imp._load_startup_snapshot([(fn, entry[1], code, True)])
+            import snapmod
+            assert snapmod.x == 2
+            assert snapmod.__file__ == fn + 'c'
+            # but not if the source file changed
+            del sys.modules['snapmod']
+            os.utime(fn, (entry[1] - 10, entry[1] - 10))
+            import snapmod
+            assert snapmod.x == 1
+        finally:
+            sys.path.remove(path)
+            sys.modules.pop('snapmod', None)
+
     def test_getimporter(self):
         import imp, os
         # an existing directory
@@ -2,10 +2,12 @@ from pypy.interpreter.error import OperationError, oefmt, wrap_oserror
 from pypy.interpreter.baseobjspace import W_Root
 from pypy.interpreter.typedef import TypeDef
 from pypy.interpreter.gateway import interp2app, unwrap_spec
+from pypy.interpreter.buffer import SimpleView
 from rpython.rlib import rmmap, rarithmetic, objectmodel
 from rpython.rlib.buffer import RawBuffer
 from rpython.rlib.rmmap import RValueError, RTypeError, RMMapError
 from rpython.rlib.rstring import StringBuilder
+import weakref
 
 if rmmap.HAVE_LARGEFILE_SUPPORT:
     OFF_T = rarithmetic.r_longlong
@@ -17,6 +19,8 @@ class W_MMap(W_Root):
     def __init__(self, space, mmap_obj):
         self.space = space
         self.mmap = mmap_obj
+        # weakrefs to the buffers exported to memoryviews
+        self.exports = []
 
     def readbuf_w(self, space):
         self.check_valid()
@@ -26,7 +30,29 @@ class W_MMap(W_Root):
         self.check_writeable()
         return MMapBuffer(self.space, self.mmap, False)
 
+    def buffer_w(self, space, flags):
+        # memoryview(mmap) and its slices read and write the mapped
+        # memory directly, without copying
+        self.check_valid()
+        readonly = self.mmap.access == ACCESS_READ
+        space.check_buf_flags(flags, readonly)
+        return MMapView(self, MMapBuffer(self.space, self.mmap, readonly))
+
+    def add_export(self, buf):
+        self.exports = [ref for ref in self.exports if ref() is not None]
+        self.exports.append(weakref.ref(buf))
+
+    def check_no_exports(self, action):
+        # memoryviews cannot be released explicitly on PyPy2, so an
+        # export stays alive until its last view is garbage-collected
+        for ref in self.exports:
+            if ref() is not None:
+                raise oefmt(self.space.w_BufferError,
+                            "cannot %s mmap: exported buffers exist", action)
+        self.exports = []
+
     def close(self):
+        self.check_no_exports("close")
         self.mmap.close()
 
     def read_byte(self):
@@ -133,6 +159,7 @@ class W_MMap(W_Root):
     def resize(self, newsize):
         self.check_valid()
         self.check_resizeable()
+        self.check_no_exports("resize")
         try:
             self.mmap.resize(newsize)
         except OSError as e:
@@ -143,6 +170,27 @@ class W_MMap(W_Root):
             raise OperationError(self.space.w_SystemError,
                                  self.space.newtext(e.message))
 
+    if rmmap.has_madvise:
+        @unwrap_spec(option=int, start=int)
+        def madvise(self, option, start=0, w_length=None):
+            self.check_valid()
+            space = self.space
+            size = self.mmap.size
+            if start < 0 or start >= size:
+                raise oefmt(space.w_ValueError, "madvise start out of bounds")
+            if w_length is None:
+                length = size
+            else:
+                length = space.getindex_w(w_length, space.w_OverflowError)
+                if length < 0:
+                    raise oefmt(space.w_ValueError, "madvise length invalid")
+            if length > size - start:
+                length = size - start
+            try:
+                self.mmap.madvise(option, start, length)
+            except OSError as e:
+                raise mmap_error(self.space, e)
+
     def __len__(self):
         self.check_valid()
         return self.space.newint(self.mmap.size)
@@ -304,6 +352,8 @@ W_MMap.typedef = TypeDef("mmap.mmap", None, None, "read-write",
     __getslice__ = interp2app(W_MMap.descr_getslice),
     __setslice__ = interp2app(W_MMap.descr_setslice),
 )
+if rmmap.has_madvise:
+    W_MMap.typedef.add_entries(madvise=interp2app(W_MMap.madvise))
 
 constants = rmmap.constants
 PAGESIZE = rmmap.PAGESIZE
@@ -331,6 +381,21 @@ def mmap_error(space, e):
         return OperationError(space.w_SystemError, space.newtext('%s' % e))
 
 
+class MMapView(SimpleView):
+    _attrs_ = ['readonly', 'data', 'w_mmap']
+    _immutable_ = True
+
+    def __init__(self, w_mmap, data):
+        SimpleView.__init__(self, data)
+        self.w_mmap = w_mmap
+
+    def wrap(self, space):
+        # only views that end up in a memoryview count as exports;
+        # the ones taken for a single operation are dropped right away
+        self.w_mmap.add_export(self.data)
+        return SimpleView.wrap(self, space)
+
+
 class MMapBuffer(RawBuffer):
     _immutable_ = True
 
@@ -187,6 +187,23 @@ class AppTestMMap:
         m.close()
         f.close()
 
+    def test_find_long(self):
+        from mmap import mmap
+        f = open(self.tmpname + "g", "w+")
+        data = "abcabd" * 1000 + "abcabe" + "x\n" * 1000
+        f.write(data)
+        f.flush()
+        m = mmap(f.fileno(), len(data))
+        for s in ["abcabe", "abe", "e", "bdab", "abcabdx", "x\nx", ""]:
+            assert m.find(s) == data.find(s)
+            assert m.find(s, 100, 4000) == data.find(s, 100, 4000)
+            assert m.rfind(s, 0, 6000) == data.rfind(s, 0, 6000)
+        m.seek(5999)
+        assert m.readline() == "dabcabex\n"
+        assert m.readline() == "x\n"
+        m.close()
+        f.close()
+
     def test_rfind(self):
         from mmap import mmap
         f = open(self.tmpname + "g", "w+")
@@ -599,11 +616,78 @@ class AppTestMMap:
         f.flush()
         m = mmap(f.fileno(), 6)
         m[5] = '?'
-        exc = raises(TypeError, memoryview, m)
-        assert 'buffer interface' in str(exc.value)
+        v = memoryview(m)
+        assert len(v) == 6
+        assert not v.readonly
+        assert v.tobytes() == "fooba?"
+        w = v[1:4]
+        assert w.tobytes() == "oob"
+        w[0] = 'X'
+        assert m[:] == "fXoba?"
+        m[2] = 'Y'
+        assert w.tobytes() == "XYb"
+        del v, w
+        import gc; gc.collect()
+        m.close()
+        f.close()
+
+    def test_memoryview_readonly(self):
+        from mmap import mmap, ACCESS_READ
+        f = open(self.tmpname + "y", "w+")
+        f.write("foobar")
+        f.flush()
+        m = mmap(f.fileno(), 6, access=ACCESS_READ)
+        v = memoryview(m)
+        assert v.readonly
+        assert v[3:].tobytes() == "bar"
+        with raises(TypeError):
+            v[0] = 'x'
+        del v
+        import gc; gc.collect()
         m.close()
         f.close()
 
+    def test_memoryview_exports(self):
+        import gc
+        from mmap import mmap
+        f = open(self.tmpname + "y", "w+")
+        f.write("foobar")
+        f.flush()
+        m = mmap(f.fileno(), 6)
+        v = memoryview(m)
+        w = v[2:]
+        del v
+        gc.collect()
+        # the slice still refers to the mapped memory
+        raises(BufferError, m.resize, 3)
+        raises(BufferError, m.close)
+        assert w.tobytes() == "obar"
+        # a buffer taken for a single operation is not an export
+        assert bytearray(m) == "foobar"
+        del w
+        gc.collect()
+        m.resize(3)
+        assert m[:] == "foo"
+        m.close()
+        f.close()
+
+    def test_madvise(self):
+        import mmap
+        if not hasattr(mmap.mmap, 'madvise'):
+            skip("no madvise() on this platform")
+        size = mmap.PAGESIZE * 4
+        m = mmap.mmap(-1, size)
+        assert m.madvise(mmap.MADV_NORMAL) is None
+        m.madvise(mmap.MADV_SEQUENTIAL, mmap.PAGESIZE)
+        m.madvise(mmap.MADV_WILLNEED, 0, mmap.PAGESIZE)
+        m.madvise(mmap.MADV_NORMAL, mmap.PAGESIZE, size * 2)
+        raises(ValueError, m.madvise, mmap.MADV_NORMAL, -1)
+        raises(ValueError, m.madvise, mmap.MADV_NORMAL, size)
+        raises(ValueError, m.madvise, mmap.MADV_NORMAL, 0, -1)
+        raises(mmap.error, m.madvise, mmap.MADV_NORMAL, 1)   # unaligned
+        m.close()
+        raises(ValueError, m.madvise, mmap.MADV_NORMAL)
+
     def test_offset(self):
         from mmap import mmap, ALLOCATIONGRANULARITY
         f = open(self.tmpname + "y", "w+")
@@ -0,0 +1,165 @@
+"""
+Warm-up profiles: the loops compiled by the JIT in previous processes,
+saved to a file so that the next process can trace them as soon as they
+are reached, instead of after 'threshold' iterations.
+
+A loop is identified by its code object (filename, first line number,
+name and a checksum of the bytecode) and the position in the bytecode,
+so that the profile stays valid across processes but is ignored for code
+that changed.
+"""
+
+_MAGIC = 'pypyjit-warmup-profile-1'
+
+# {(filename, firstlineno, name): [(crc, pc, is_being_profiled)]}
+_loaded = {}
+# {(filename, firstlineno, name, crc, pc, is_being_profiled): count}
+_recorded = {}
+# the code callback that was installed before load_warmup_profile()
+_previous_code_callback = None
+
+
+def _crc(code):
+    import binascii
+    return binascii.crc32(code.co_code)
+
+def _read_profile(filename):
+    import marshal
+    try:
+        with open(filename, 'rb') as f:
+            magic, entries = marshal.load(f)
+    except (IOError, EOFError, ValueError, TypeError):
+        return {}
+    if magic != _MAGIC or not isinstance(entries, dict):
+        return {}
+    return entries
+
+def _write_profile(filename, entries):
+    import marshal, os
+    tmpname = '%s.%d' % (filename, os.getpid())
+    with open(tmpname, 'wb') as f:
+        marshal.dump((_MAGIC, entries), f)
+    try:
+        os.rename(tmpname, filename)    # atomically
+    except OSError:
+        if os.name != 'nt':
+            raise
+        # on Windows, rename() does not replace an existing file
+        os.remove(filename)
+        os.rename(tmpname, filename)
+
+def _lock_profile(filename):
+    # Returns an open file holding an exclusive lock, released by closing
+    # it, or None if the platform has no fcntl.
+    try:
+        import fcntl
+    except ImportError:
+        return None
+    f = open(filename + '.lock', 'ab')
+    try:
+        fcntl.lockf(f, fcntl.LOCK_EX)
+    except:
+        f.close()
+        raise
+    return f
+
+def _new_code(code):
+    if _previous_code_callback is not None:
+        _previous_code_callback(code)
+    positions = _loaded.get((code.co_filename, code.co_firstlineno,
+                             code.co_name))
+    if positions is None:
+        return
+    import pypyjit
+    crc = _crc(code)
+    for code_crc, pc, is_being_profiled in positions:
+        if code_crc == crc:
+            pypyjit.trace_next_iteration(pc, is_being_profiled, code)
+
+def _compiled(info):
+    if info.jitdriver_name != 'pypyjit' or info.type == 'bridge':
+        return
+    code, pc, is_being_profiled = info.greenkey
+    key = (code.co_filename, code.co_firstlineno, code.co_name, _crc(code),
+           pc, is_being_profiled)
+    _recorded[key] = _recorded.get(key, 0) + 1
+
+def load_warmup_profile(filename, min_count=1):
+    """load_warmup_profile(filename, min_count=1)
+
+    Make the JIT trace the loops recorded in 'filename' as soon as they
+    are reached, for all the code objects created from now on.  Only
+    the loops that were compiled at least 'min_count' times (e.g. by
+    that many workers, see merge_warmup_profiles()) are considered.
+    Returns the number of such loops.
+
+    This uses __pypy__.set_code_callback().  A code callback that was
+    already installed keeps being called.
+    """
+    global _previous_code_callback
+    import __pypy__
+    count = 0
+    for key, n in _read_profile(filename).items():
+        if n < min_count:
+            continue
+        co_filename, firstlineno, name, crc, pc, is_being_profiled = key
+        _loaded.setdefault((co_filename, firstlineno, name), []).append(
+            (crc, pc, is_being_profiled))
+        count += 1
+    callback = __pypy__.get_code_callback()
+    if callback is not _new_code:
+        _previous_code_callback = callback
+        __pypy__.set_code_callback(_new_code)
+    return count
+
+def record_warmup_profile():
+    """record_warmup_profile()
+
+    Start recording the loops compiled by the JIT, to be written by
+    save_warmup_profile().  Bridges are not recorded: they are compiled
+    again when their guards fail often enough.
+
+    This uses set_compile_hook().  If another compile hook is already
+    installed, it is left alone and nothing is recorded.
+    """
+    import pypyjit
+    hook = pypyjit.get_compile_hook()
+    if hook is not None and hook is not _compiled:
+        import warnings
+        warnings.warn("a compile hook is already installed, "
+                      "the warm-up profile is not recorded", RuntimeWarning)
+        return
+    pypyjit.set_compile_hook(_compiled, operations=False)
+
+def save_warmup_profile(filename):
+    """save_warmup_profile(filename)
+
+    Add the loops recorded since record_warmup_profile() to the profile
+    in 'filename', creating it if needed.  The file is replaced
+    atomically.  Where fcntl is available, the update is done while
+    holding a lock on 'filename.lock', so several processes can share
+    the profile; elsewhere, concurrent saves may lose some counts.
+    """
+    lock = _lock_profile(filename)
+    try:
+        entries = _read_profile(filename)
+        for key, n in _recorded.items():
+            entries[key] = entries.get(key, 0) + n
+        _recorded.clear()
+        _write_profile(filename, entries)
+    finally:
+        if lock is not None:
+            lock.close()
+
+def merge_warmup_profiles(filename, sources):
+    """merge_warmup_profiles(filename, sources)
+
+    Write to 'filename' the profile combining all the profiles whose file
+    names are in 'sources', e.g. saved by several workers.  The count of
+    each loop is the sum of its counts.
+    """
+    entries = {}
+    for source in sources:
+        for key, n in _read_profile(source).items():
+            entries[key] = entries.get(key, 0) + n
+    _write_profile(filename, entries)
@@ -36,18 +36,27 @@ class PyPyJitIface(JitHookInterface):
             finally:
                 cache.in_recursion = False
 
-    def on_trace_too_long(self, jitdriver, greenkey, greenkey_repr):
+    def on_trace_too_long_counters(self, jitdriver, greenkey, greenkey_repr,
+                                   doublings, trace_limit):
         space = self.space
         cache = space.fromcache(Cache)
         if cache.in_recursion:
             return
         if cache.w_trace_too_long_hook is not None:
             cache.in_recursion = True
+            w_name = space.newtext(jitdriver.name)
+            w_greenkey = wrap_greenkey(space, jitdriver, greenkey,
+                                       greenkey_repr)
             try:
                 try:
-                    space.call_function(cache.w_trace_too_long_hook,
-                        space.newtext(jitdriver.name),
-                        wrap_greenkey(space, jitdriver, greenkey, greenkey_repr))
+                    if cache.trace_too_long_hook_with_counters:
+                        space.call_function(cache.w_trace_too_long_hook,
+                                            w_name, w_greenkey,
+                                            space.newint(doublings),
+                                            space.newint(trace_limit))
+                    else:
+                        space.call_function(cache.w_trace_too_long_hook,
+                                            w_name, w_greenkey)
                 except OperationError as e:
                     e.write_unraisable(space, "jit hook", cache.w_trace_too_long_hook)
             finally:
@@ -13,6 +13,7 @@ from rpython.rlib.nonconst import NonConstant
 from rpython.rlib.rarithmetic import r_uint
 from rpython.rlib import jit_hooks
 from rpython.rlib.jit import Counters
+from rpython.jit.metainterp.compilebudget import NUM_BUCKETS
 from rpython.rlib.objectmodel import compute_unique_id
 from pypy.module.pypyjit.interp_jit import pypyjitdriver
 
@@ -25,6 +26,7 @@ class Cache(object):
         self.w_abort_hook = None
         self.w_trace_too_long_hook = None
         self.compile_hook_with_ops = False
+        self.trace_too_long_hook_with_counters = False
 
     def getno(self):
         self.no += 1
@@ -65,6 +67,16 @@ def set_compile_hook(space, w_hook, operations=True):
     cache.compile_hook_with_ops = operations
     cache.in_recursion = NonConstant(False)
 
+def get_compile_hook(space):
+    """ get_compile_hook()
+
+    Return the hook installed by set_compile_hook(), or None.
+    """
+    cache = space.fromcache(Cache)
+    if cache.w_compile_hook is None:
+        return space.w_None
+    return cache.w_compile_hook
+
 def set_abort_hook(space, w_hook):
     """ set_abort_hook(hook)
 
@@ -84,8 +96,9 @@ def set_abort_hook(space, w_hook):
     cache.w_abort_hook = w_hook
     cache.in_recursion = NonConstant(False)
 
-def set_trace_too_long_hook(space, w_hook):
-    """ set_trace_too_long_hook(hook)
+@unwrap_spec(counters=bool)
+def set_trace_too_long_hook(space, w_hook, counters=False):
+    """ set_trace_too_long_hook(hook, counters=False)
 
     Set a hook (callable) that will be called each time we abort
     tracing because the trace is too long.
@@ -93,11 +106,20 @@ def set_trace_too_long_hook(space, w_hook):
     The hook will be called with the signature:
 
         hook(jitdriver_name, greenkey)
+
+    where greenkey is either the function that will not be inlined any
+    more, or the loop whose trace limit was doubled because it was too
+    long without any function to blame.  If 'counters' is True, the hook
+    is called as hook(jitdriver_name, greenkey, doublings, trace_limit),
+    with the number of times the trace limit of the loops at greenkey was
+    doubled and their current trace limit (see the 'trace_limit_max'
+    parameter).
     """
     cache = space.fromcache(Cache)
     if space.is_w(w_hook, space.w_None):
         w_hook = None
     cache.w_trace_too_long_hook = w_hook
+    cache.trace_too_long_hook_with_counters = counters
     cache.in_recursion = NonConstant(False)
 
 def wrap_oplist(space, logops, operations, ops_offset=None):
@@ -397,6 +419,111 @@ def get_stats_asmmemmgr(space):
     m2 = jit_hooks.stats_asmmemmgr_used(None)
     return space.newtuple2(space.newint(m1), space.newint(m2))
 
+def get_stats_memmgr(space):
+    """Returns a dict describing the loops kept alive by the JIT:
+    'alive_loops' and 'code_size', their number and the size of their
+    machine code, and 'evicted_loops' and 'evicted_code_size', the same
+    for the loops freed so far because of the 'max_code_size' parameter."""
+    w_result = space.newdict()
+    space.setitem_str(w_result, 'alive_loops',
+                      space.newint(jit_hooks.stats_memmgr_alive_loops(None)))
+    space.setitem_str(w_result, 'code_size',
+                      space.newint(jit_hooks.stats_memmgr_code_size(None)))
+    space.setitem_str(w_result, 'evicted_loops',
+                      space.newint(jit_hooks.stats_memmgr_evicted_loops(None)))
+    space.setitem_str(w_result, 'evicted_code_size',
+                      space.newint(
+                          jit_hooks.stats_memmgr_evicted_code_size(None)))
+    return w_result
+
+def get_stats_compile_pauses(space):
+    """Returns a dict describing the time spent tracing and compiling:
+    'pauses' is a histogram of the pauses, as a list of pairs
+    (limit, count) where 'count' is the number of pauses shorter than
+    'limit' milliseconds and longer than the previous limit, the last
+    limit being None; 'time' is their total in seconds; and 'deferred'
+    is the number of compilations delayed because of the
+    'compile_budget' parameter."""
+    pauses_w = []
+    limit = 1
+    for i in range(NUM_BUCKETS):
+        if i == NUM_BUCKETS - 1:
+            w_limit = space.w_None
+        else:
+            w_limit = space.newint(limit)
+        w_count = space.newint(jit_hooks.stats_compile_pauses(None, i))
+        pauses_w.append(space.newtuple2(w_limit, w_count))
+        limit *= 2
+    w_result = space.newdict()
+    space.setitem_str(w_result, 'pauses', space.newlist(pauses_w))
+    space.setitem_str(w_result, 'time',
+                      space.newfloat(jit_hooks.stats_compile_time(None)))
+    space.setitem_str(w_result, 'deferred',
+                      space.newint(jit_hooks.stats_compile_deferred(None)))
+    return w_result
+
+def enable_guard_stats(space):
+    """ Start counting the failures of each guard, and the entries into
+    each loop and bridge (reported by get_stats_snapshot().loop_run_times),
+    for the loops and bridges compiled from now on.
+    """
+    jit_hooks.stats_set_guard_stats(None, True)
+
+def disable_guard_stats(space):
+    """ Stop counting the failures of the guards and the entries into
+    the loops compiled from now on.  The results so far are kept.  The
+    entry counters stay on if enable_debug() was called.
+    """
+    jit_hooks.stats_set_guard_stats(None, False)
+
+def wrap_guard_stats(space, ll_stats):
+    result_w = []
+    for i in range(len(ll_stats)):
+        ll_op = ll_stats[i].debug_merge_point
+        if not ll_op:
+            w_greenkey = space.w_None
+        elif hlstr(ll_stats[i].jitdriver_name) == 'pypyjit':
+            # see wrap_greenkey()
+            next_instr = jit_hooks.box_getint(jit_hooks.resop_getarg(ll_op, 3))
+            is_being_profiled = jit_hooks.box_getint(
+                jit_hooks.resop_getarg(ll_op, 4))
+            ll_code = lltype.cast_opaque_ptr(lltype.Ptr(OBJECT),
+                jit_hooks.box_getref(jit_hooks.resop_getarg(ll_op, 5)))
+            pycode = cast_base_ptr_to_instance(PyCode, ll_code)
+            w_greenkey = space.newtuple([pycode, space.newint(next_instr),
+                                         space.newbool(bool(is_being_profiled))])
+        else:
+            w_greenkey = space.newtext(hlstr(ll_stats[i].location))
+        result_w.append(space.newtuple([
+            space.newint(ll_stats[i].number),
+            w_greenkey,
+            space.newtext(hlstr(ll_stats[i].opname)),
+            space.newint(ll_stats[i].failures)]))
+    return space.newlist(result_w)
+
+def get_stats_guards(space):
+    """ Returns a list of tuples (loop_no, greenkey, opname, failures) for
+    the guards that failed since enable_guard_stats().  'greenkey' is the
+    position in the source of the guard, as in JitLoopInfo, or None if
+    unknown.  The guards of the loops that were freed are not reported.
+
+    The failures are counted until a bridge is attached to the guard.
+    From then on, they are the entries into the bridge, reported by
+    get_stats_snapshot().loop_run_times.  For the guards that fail the
+    most, 'failures' is thus about the 'trace_eagerness' parameter.
+    """
+    return wrap_guard_stats(space, jit_hooks.stats_get_guard_stats(None))
+
+def get_stats_resume(space):
+    """Returns the size in bytes of the resume data attached to the
+    guards of all the loops and bridges compiled so far, as a pair
+    (total_size, shared_size) where 'shared_size' is the part of
+    'total_size' that was not allocated again because an earlier guard
+    of the same loop has the same resume data."""
+    m1 = jit_hooks.stats_resume_bytes(None)
+    m2 = jit_hooks.stats_resume_shared_bytes(None)
+    return space.newtuple2(space.newint(m1), space.newint(m2))
+
 def enable_debug(space):
     """ Set the jit debugging - completely necessary for some stats to work,
     most notably assembler counters.
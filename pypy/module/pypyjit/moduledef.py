@@ -2,6 +2,10 @@ from pypy.interpreter.mixedmodule import MixedModule
 
 class Module(MixedModule):
     appleveldefs = {
+        'load_warmup_profile': 'app_warmup.load_warmup_profile',
+        'record_warmup_profile': 'app_warmup.record_warmup_profile',
+        'save_warmup_profile': 'app_warmup.save_warmup_profile',
+        'merge_warmup_profiles': 'app_warmup.merge_warmup_profiles',
     }
 
     interpleveldefs = {
@@ -15,10 +19,17 @@ class Module(MixedModule):
         'trace_next_iteration_hash': 'interp_jit.trace_next_iteration_hash',
         'releaseall': 'interp_jit.releaseall',
         'set_compile_hook': 'interp_resop.set_compile_hook',
+        'get_compile_hook': 'interp_resop.get_compile_hook',
         'set_abort_hook': 'interp_resop.set_abort_hook',
         'set_trace_too_long_hook': 'interp_resop.set_trace_too_long_hook',
         'get_stats_snapshot': 'interp_resop.get_stats_snapshot',
         'get_stats_asmmemmgr': 'interp_resop.get_stats_asmmemmgr',
+        'get_stats_memmgr': 'interp_resop.get_stats_memmgr',
+        'get_stats_compile_pauses': 'interp_resop.get_stats_compile_pauses',
+        'get_stats_resume': 'interp_resop.get_stats_resume',
+        'get_stats_guards': 'interp_resop.get_stats_guards',
+        'enable_guard_stats': 'interp_resop.enable_guard_stats',
+        'disable_guard_stats': 'interp_resop.disable_guard_stats',
         # those things are disabled because they have bugs, but if
         # they're found to be useful, fix test_ztranslation_jit_stats
         # in the backend first. get_stats_snapshot still produces
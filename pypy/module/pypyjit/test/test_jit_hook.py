@@ -7,13 +7,15 @@ from rpython.jit.metainterp.history import JitCellToken, ConstInt, ConstPtr,\
 from rpython.jit.metainterp.resoperation import rop
 from rpython.jit.metainterp.logger import Logger
 from rpython.rtyper.annlowlevel import (cast_instance_to_base_ptr,
-                                      cast_base_ptr_to_instance)
+                                      cast_base_ptr_to_instance,
+                                      cast_instance_to_gcref, llstr)
 from rpython.rtyper.lltypesystem import lltype, llmemory
 from rpython.rtyper.rclass import OBJECT
 from pypy.module.pypyjit.interp_jit import pypyjitdriver
 from pypy.module.pypyjit.hooks import pypy_hooks
 from rpython.jit.tool.oparser import parse
 from rpython.rlib.jit import JitDebugInfo, AsmInfo, Counters
+from rpython.rlib import jit_hooks
 
 
 class MockJitDriverSD(object):
@@ -36,7 +38,7 @@ class MockSD(object):
 
 
 class AppTestJitHook(object):
-    spaceconfig = dict(usemodules=('pypyjit',))
+    spaceconfig = dict(usemodules=('pypyjit', 'binascii'))
 
     def setup_class(cls):
         if cls.runappdirect:
@@ -114,8 +116,23 @@ class AppTestJitHook(object):
                                     greenkey, 'blah', Logger(MockSD),
                                     cls.oplist_no_descrs)
 
+        def interp_guard_stats(space):
+            from pypy.module.pypyjit.interp_resop import wrap_guard_stats
+            ll_stats = lltype.malloc(jit_hooks.GUARD_STATS_CONTAINER, 2)
+            ll_stats[0].number = 3
+            ll_stats[0].opname = llstr('guard_true')
+            ll_stats[0].failures = 42
+            ll_stats[0].jitdriver_name = llstr('pypyjit')
+            ll_stats[0].location = llstr('function')
+            ll_stats[0].debug_merge_point = cast_instance_to_gcref(oplist[1])
+            ll_stats[1].number = 4
+            ll_stats[1].opname = llstr('guard_nonnull')
+            ll_stats[1].failures = 1
+            return wrap_guard_stats(space, ll_stats)
+
         space = cls.space
         cls.w_on_compile = space.wrap(interp2app(interp_on_compile))
+        cls.w_guard_stats = space.wrap(interp2app(interp_guard_stats))
         cls.w_on_compile_bridge = space.wrap(interp2app(interp_on_compile_bridge))
         cls.w_on_abort = space.wrap(interp2app(interp_on_abort))
         cls.w_int_add_num = space.wrap(rop.INT_ADD)
@@ -124,6 +141,7 @@ class AppTestJitHook(object):
         cls.orig_oplist = oplist
         cls.orig_oplist_no_descrs = oplist_no_descrs
         cls.w_sorted_keys = space.wrap(sorted(Counters.counter_names))
+        cls.w_tmpdir = space.wrap(str(py.test.ensuretemp('jit_hook')))
 
     def setup_method(self, meth):
         self.__class__.oplist = self.orig_oplist[:]
@@ -269,6 +287,77 @@ class AppTestJitHook(object):
         raises(AttributeError, 'op.pycode')
         assert op.call_depth == 5
 
+    def test_warmup_profile(self):
+        import pypyjit, __pypy__, os
+        tmpdir = self.tmpdir
+        filename = os.path.join(tmpdir, 'warmup')
+        pypyjit.set_compile_hook(None)     # left by other tests
+        pypyjit.record_warmup_profile()
+        try:
+            self.on_compile()
+            self.on_compile_bridge()
+        finally:
+            pypyjit.set_compile_hook(None)
+        pypyjit.save_warmup_profile(filename)
+        other = os.path.join(tmpdir, 'warmup2')
+        pypyjit.merge_warmup_profiles(other, [filename, filename,
+                                              os.path.join(tmpdir, 'none')])
+        assert pypyjit.load_warmup_profile(other, min_count=3) == 0
+        #
+        seen = []
+        def trace_next_iteration(pc, is_being_profiled, code):
+            seen.append((pc, is_being_profiled, code))
+        orig = pypyjit.trace_next_iteration
+        pypyjit.trace_next_iteration = trace_next_iteration
+        try:
+            assert pypyjit.load_warmup_profile(other, min_count=2) == 1
+            code = self.f.__code__
+            code2 = type(code)(code.co_argcount, code.co_nlocals,
+                code.co_stacksize, code.co_flags, code.co_code,
+                code.co_consts, code.co_names, code.co_varnames,
+                code.co_filename, code.co_name, code.co_firstlineno,
+                code.co_lnotab)
+            code3 = type(code)(code.co_argcount, code.co_nlocals,
+                code.co_stacksize, code.co_flags, code.co_code + 'S',
+                code.co_consts, code.co_names, code.co_varnames,
+                code.co_filename, code.co_name, code.co_firstlineno,
+                code.co_lnotab)
+        finally:
+            __pypy__.set_code_callback(None)
+            pypyjit.trace_next_iteration = orig
+        assert seen == [(0, False, code2)]
+
+    def test_warmup_profile_keeps_other_hooks(self):
+        import pypyjit, __pypy__, os, warnings
+        def hook(info):
+            pass
+        pypyjit.set_compile_hook(hook)
+        try:
+            with warnings.catch_warnings(record=True) as w:
+                warnings.simplefilter('always')
+                pypyjit.record_warmup_profile()
+            assert pypyjit.get_compile_hook() is hook
+        finally:
+            pypyjit.set_compile_hook(None)
+        assert len(w) == 1
+        assert w[0].category is RuntimeWarning
+        #
+        seen = []
+        def callback(code):
+            seen.append(code)
+        __pypy__.set_code_callback(callback)
+        try:
+            pypyjit.load_warmup_profile(os.path.join(self.tmpdir, 'none'))
+            code = compile('x = 1', 'test', 'exec')
+        finally:
+            __pypy__.set_code_callback(None)
+        assert code in seen
+
+    def test_guard_stats(self):
+        assert self.guard_stats() == [
+            (3, (self.f.__code__, 0, False), 'guard_true', 42),
+            (4, None, 'guard_nonnull', 1)]
+
     def test_get_stats_snapshot(self):
         skip("a bit no idea how to test it")
         from pypyjit import get_stats_snapshot
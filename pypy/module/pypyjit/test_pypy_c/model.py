@@ -142,9 +142,7 @@ class TraceWithIds(Function):
     def _allops(self, opcode=None, include_guard_not_invalidated=True):
         opcode_name = opcode
         for chunk in self.flatten_chunks():
-            opcode = chunk.getopcode()
-            if opcode_name is None or \
-                   (opcode and opcode.__class__.__name__ == opcode_name):
+            if opcode_name is None or chunk.executes_opcode(opcode_name):
                 for op in self._ops_for_chunk(chunk, include_guard_not_invalidated):
                     yield op
             else:
@@ -172,7 +170,7 @@ class TraceWithIds(Function):
         for chunk in self.flatten_chunks():
             opcode = chunk.getopcode()
             if opcode in target_opcodes and (opcode_name is None or
-                                             opcode.__class__.__name__ == opcode_name):
+                                             chunk.executes_opcode(opcode_name)):
                 for op in self._ops_for_chunk(chunk, include_guard_not_invalidated):
                     if op in loop_ops:
                         yield op
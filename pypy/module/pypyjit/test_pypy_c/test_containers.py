@@ -108,6 +108,26 @@ class TestDicts(BaseTestPyPyC):
         """)
 
 
+    def test_virtual_dict_values(self):
+        def main(n):
+            def make(i):
+                return {"a": i, "b": i + 1}
+            i = 0
+            res = 0
+            while i < n:
+                d = make(i)
+                for x in d.values(): # ID: values
+                    res += x
+                i += 1
+            return res
+
+        log = self.run(main, [1000])
+        assert log.result == main(1000)
+        loop, = log.loops_by_filename(self.filepath)
+        opnames = log.opnames(loop.allops())
+        assert 'new' not in opnames
+        assert 'new_array_clear' not in opnames
+
 
 class TestOtherContainers(BaseTestPyPyC):
     def test_list(self):
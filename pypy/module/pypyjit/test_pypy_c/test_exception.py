@@ -18,6 +18,9 @@ class TestException(BaseTestPyPyC):
         log = self.run(f1, [10000])
         assert log.result == 10000
         loop, = log.loops_by_id("except")
+        # the COMPARE_OP is fused with the following POP_JUMP_IF_FALSE
+        assert [chunk for chunk in loop.flatten_chunks()
+                if chunk.executes_opcode("COMPARE_OP")]
         ops = list(loop.ops_by_id("except", opcode="COMPARE_OP"))
         assert ops == []
 
@@ -198,6 +198,25 @@ class TestMisc(BaseTestPyPyC):
             jump(..., descr=...)
         """)
 
+    def test_range_iter_bounds_check_versioning(self):
+        def main(n):
+            a = [1] * n
+            b = [2] * n
+            total = 0
+            for i in range(n):
+                total += a[i] * b[i]    # ID: getitem
+            return total
+        #
+        log = self.run(main, [1000])
+        assert log.result == 2000
+        loop, = log.loops_by_filename(self.filepath)
+        # 'i < len(a)' and 'i < len(b)' follow from 'i < n', because the
+        # preamble checks 'n <= len(a)' and 'n <= len(b)' once
+        opnames = log.opnames(loop.ops_by_id('getitem'))
+        assert 'int_ge' not in opnames
+        assert 'int_lt' not in opnames
+        assert 'getfield_gc_i' not in opnames
+
     def test_range_iter_normal(self):
         def main(n):
             def g(n):
@@ -59,7 +59,7 @@ class W_ZipCache(W_Root):
                 key = key.replace(ZIPSEP, os.path.sep)
             space.setitem(w_d, space.newtext(key), space.newtuple([
                 space.newtext(info.filename), space.newint(info.compress_type), space.newint(info.compress_size),
-                space.newint(info.file_size), space.newint(info.file_offset), space.newint(info.dostime),
+                space.newint(info.file_size), space.newint(info.header_offset), space.newint(info.dostime),
                 space.newint(info.dosdate), space.newint(info.CRC)]))
         return w_d
 
@@ -325,6 +325,11 @@ class DescrOperation(object):
 
     @use_special_method_shortcut('next')
     def next(space, w_obj):
+        from pypy.interpreter.generator import GeneratorIterator
+        if isinstance(w_obj, GeneratorIterator):
+            # shortcut: generators cannot be subclassed, so their 'next'
+            # is always this one
+            return w_obj.send_ex(space.w_None)
         w_descr = space.lookup(w_obj, 'next')
         if w_descr is None:
             raise oefmt(space.w_TypeError,
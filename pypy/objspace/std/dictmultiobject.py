@@ -570,6 +570,8 @@ class DictStrategy(object):
             else:
                 return self.space.newlist(result)
 
+    @jit.look_inside_iff(lambda self, w_dict:
+                         w_dict._unrolling_heuristic())
     def values(self, w_dict):
         iterator = self.itervalues(w_dict)
         result = newlist_hint(self.length(w_dict))
@@ -580,6 +582,8 @@ class DictStrategy(object):
             else:
                 return result
 
+    @jit.look_inside_iff(lambda self, w_dict:
+                         w_dict._unrolling_heuristic())
     def items(self, w_dict):
         iterator = self.iteritems(w_dict)
         result = newlist_hint(self.length(w_dict))
@@ -1093,6 +1097,8 @@ class AbstractTypedStrategy(object):
             self.switch_to_object_strategy(w_dict)
             return w_dict.getitem(w_key)
 
+    @jit.look_inside_iff(lambda self, w_dict:
+                         w_dict._unrolling_heuristic())
     def w_keys(self, w_dict):
         l = [self.wrap(key)
              for key in self.unerase(w_dict.dstorage).iterkeys()]
@@ -1101,6 +1107,8 @@ class AbstractTypedStrategy(object):
     def values(self, w_dict):
         return self.unerase(w_dict.dstorage).values()
 
+    @jit.look_inside_iff(lambda self, w_dict:
+                         w_dict._unrolling_heuristic())
     def items(self, w_dict):
         space = self.space
         dict_w = self.unerase(w_dict.dstorage)
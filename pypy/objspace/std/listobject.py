@@ -13,6 +13,7 @@ import sys
 
 from rpython.rlib import debug, jit, rerased, rutf8
 from rpython.rlib.listsort import make_timsort_class
+from rpython.rlib.stringsort import make_string_sort, string_sort
 from rpython.rlib.objectmodel import (
     import_from_mixin, instantiate, newlist_hint, resizelist_hint, specialize)
 from rpython.rlib.rarithmetic import ovfcheck
@@ -26,7 +27,6 @@ from pypy.interpreter.gateway import (
     WrappedDefault, applevel, interp2app, unwrap_spec)
 from pypy.interpreter.signature import Signature
 from pypy.interpreter.typedef import TypeDef
-from pypy.interpreter.miscutils import StringSort
 from pypy.objspace.std.bytesobject import W_BytesObject
 from pypy.objspace.std.floatobject import W_FloatObject
 from pypy.objspace.std.intobject import W_IntObject
@@ -777,25 +777,35 @@ class W_ListObject(W_Root):
             # core-dump factory, since the storage may change).
             self.__init__(space, [])
 
-            # wrap each item in a KeyContainer if needed
+            done = False
             if has_key:
-                # XXX inefficient for unwrapped strategies:
-                # we wrap the elements twice, once for the key, and once to get
-                # KeyContainers. Then unwrap carefully in the __init__ call below.
-                # Could type-specialize this.
-                _compute_keys_for_sorting(strategy, sorter.list, w_key)
-
-            # Reverse sort stability achieved by initially reversing the list,
-            # applying a stable forward sort, then reversing the final result.
-            if reverse:
-                sorter.list.reverse()
-
-            # perform the sort
-            sorter.sort()
-
-            # reverse again
-            if reverse:
-                sorter.list.reverse()
+                keys_w = _compute_keys_for_sorting(strategy, sorter.list,
+                                                   w_key)
+                # if all the keys are ints, floats or strings, sort them
+                # unwrapped
+                if not has_cmp:
+                    done = _sort_by_unwrapped_keys(space, sorter.list, keys_w,
+                                                   reverse)
+                if not done:
+                    # wrap each item in a KeyContainer. Then unwrap
+                    # carefully in the __init__ call below.
+                    for i in range(sorter.listlength):
+                        sorter.list[i] = KeyContainer(keys_w[i],
+                                                      sorter.list[i])
+
+            if not done:
+                # Reverse sort stability achieved by initially reversing the
+                # list, applying a stable forward sort, then reversing the
+                # final result.
+                if reverse:
+                    sorter.list.reverse()
+
+                # perform the sort
+                sorter.sort()
+
+                # reverse again
+                if reverse:
+                    sorter.list.reverse()
 
         finally:
             # unwrap each item if needed
@@ -825,6 +835,7 @@ sortkey_jmp = jit.JitDriver(
 
 def _compute_keys_for_sorting(strategy, list_w, w_callable):
     space = strategy.space
+    keys_w = [None] * len(list_w)
     i = 0
     # XXX would like a new API space.greenkey_for_callable here
     # (also in min/max and map/filter)
@@ -834,9 +845,93 @@ def _compute_keys_for_sorting(strategy, list_w, w_callable):
         # the strategy to distinguish the cases better
         sortkey_jmp.jit_merge_point(tp=tp, strategy_type=type(strategy))
         w_item = list_w[i]
-        w_keyitem = space.call_function(w_callable, w_item)
-        list_w[i] = KeyContainer(w_keyitem, w_item)
+        keys_w[i] = space.call_function(w_callable, w_item)
         i += 1
+    return keys_w
+
+def _sort_by_unwrapped_keys(space, list_w, keys_w, reverse):
+    """Sort list_w in place according to keys_w, if all the keys are exactly
+    ints, or exactly floats, or exactly strs, or exactly unicodes: their
+    comparison can't be overridden, so we can compare them unwrapped.
+    Returns False, without changing list_w, in the other cases."""
+    if len(keys_w) < 2:
+        return False
+    w_firstkey = keys_w[0]
+    if type(w_firstkey) is W_IntObject:
+        keys_i = _unwrap_int_keys(space, keys_w)
+        if keys_i is not None:
+            _sort_by_keys(IntKeySort, list_w, keys_i, reverse)
+            return True
+    elif type(w_firstkey) is W_FloatObject:
+        keys_f = _unwrap_float_keys(space, keys_w)
+        if keys_f is not None:
+            _sort_by_keys(FloatKeySort, list_w, keys_f, reverse)
+            return True
+    elif type(w_firstkey) is W_BytesObject:
+        keys_b = _unwrap_bytes_keys(space, keys_w)
+        if keys_b is not None:
+            _sort_by_keys(BytesKeySort, list_w, keys_b, reverse)
+            return True
+    elif type(w_firstkey) is W_UnicodeObject:
+        # utf-8 strings compare like their code points
+        keys_u = _unwrap_unicode_keys(space, keys_w)
+        if keys_u is not None:
+            _sort_by_keys(BytesKeySort, list_w, keys_u, reverse)
+            return True
+    return False
+
+def _unwrap_int_keys(space, keys_w):
+    keys = [0] * len(keys_w)
+    for i in range(len(keys_w)):
+        w_key = keys_w[i]
+        if type(w_key) is not W_IntObject:
+            return None
+        keys[i] = space.int_w(w_key)
+    return keys
+
+def _unwrap_float_keys(space, keys_w):
+    keys = [0.0] * len(keys_w)
+    for i in range(len(keys_w)):
+        w_key = keys_w[i]
+        if type(w_key) is not W_FloatObject:
+            return None
+        keys[i] = space.float_w(w_key)
+    return keys
+
+def _unwrap_bytes_keys(space, keys_w):
+    keys = [None] * len(keys_w)
+    for i in range(len(keys_w)):
+        w_key = keys_w[i]
+        if type(w_key) is not W_BytesObject:
+            return None
+        keys[i] = space.bytes_w(w_key)
+    return keys
+
+def _unwrap_unicode_keys(space, keys_w):
+    keys = [None] * len(keys_w)
+    for i in range(len(keys_w)):
+        w_key = keys_w[i]
+        if type(w_key) is not W_UnicodeObject:
+            return None
+        keys[i] = space.utf8_w(w_key)
+    return keys
+
+@specialize.arg(0)
+def _sort_by_keys(sorterclass, list_w, keys, reverse):
+    # sort a permutation of the indices stably, then apply it to list_w
+    length = len(list_w)
+    if reverse:
+        keys.reverse()
+        list_w.reverse()
+    indices = range(length)
+    sorter = sorterclass(indices, length)
+    sorter.keys = keys
+    sorter.sort()
+    if reverse:
+        indices.reverse()
+    items_w = [list_w[index] for index in indices]
+    for i in range(length):
+        list_w[i] = items_w[i]
 
 def get_printable_location_find(count, strategy_type, tp):
     if count:
@@ -2266,8 +2361,7 @@ class BytesListStrategy(ListStrategy):
 
     def sort(self, w_list, reverse):
         l = self.unerase(w_list.lstorage)
-        sorter = StringSort(l, len(l))
-        sorter.sort()
+        string_sort(l)
         if reverse:
             l.reverse()
 
@@ -2302,8 +2396,7 @@ class AsciiListStrategy(ListStrategy):
 
     def sort(self, w_list, reverse):
         l = self.unerase(w_list.lstorage)
-        sorter = StringSort(l, len(l))
-        sorter.sort()
+        string_sort(l)
         if reverse:
             l.reverse()
 
@@ -2326,6 +2419,8 @@ TimSort = make_timsort_class()
 IntBaseTimSort = make_timsort_class()
 FloatBaseTimSort = make_timsort_class()
 IntOrFloatBaseTimSort = make_timsort_class()
+IntKeyBaseTimSort = make_timsort_class()
+FloatKeyBaseTimSort = make_timsort_class()
 
 
 class KeyContainer(W_Root):
@@ -2361,6 +2456,31 @@ class IntOrFloatSort(IntOrFloatBaseTimSort):
         return fa < fb
 
 
+# these sort a list of indices into 'keys', see _sort_by_unwrapped_keys()
+class IntKeySort(IntKeyBaseTimSort):
+    def lt(self, a, b):
+        return self.keys[a] < self.keys[b]
+
+
+class FloatKeySort(FloatKeyBaseTimSort):
+    def lt(self, a, b):
+        return self.keys[a] < self.keys[b]
+
+
+def _get_bytes_key(keys, index):
+    return keys[index]
+
+_bytes_key_sort = make_string_sort(_get_bytes_key)
+
+class BytesKeySort(object):
+    # not a TimSort: a multikey quicksort that orders equal keys by index
+    def __init__(self, list, listlength):
+        self.list = list
+
+    def sort(self):
+        _bytes_key_sort(self.list, self.keys)
+
+
 class CustomCompareSort(SimpleSort):
     def lt(self, a, b):
         space = self.space
@@ -755,6 +755,42 @@ class AppTestListObject(object):
         r.sort(key=lambda x: -x)
         assert r == range(9, -1, -1)
 
+    def test_sort_key_unwrapped(self):
+        # ints, floats and strs as keys are compared unwrapped
+        records = [(3, 'c', 1.5), (1, 'a', -2.0), (2, 'b', 0.0),
+                   (1, 'd', 0.0), (3, 'a', 7.25)]
+        for index in range(3):
+            for reverse in [False, True]:
+                expected = sorted(records, cmp=lambda a, b:
+                                  cmp(a[index], b[index]), reverse=reverse)
+                l = records[:]
+                l.sort(key=lambda r: r[index], reverse=reverse)
+                assert l == expected
+        # stability
+        l = [(1, 'x'), (0, 'y'), (1, 'z'), (0, 'w')]
+        l.sort(key=lambda r: r[0])
+        assert l == [(0, 'y'), (0, 'w'), (1, 'x'), (1, 'z')]
+        l.sort(key=lambda r: r[0], reverse=True)
+        assert l == [(1, 'x'), (1, 'z'), (0, 'y'), (0, 'w')]
+        # mixed keys, and subclasses that override the comparison
+        l = [3, 1.5, 2, -1]
+        l.sort(key=lambda x: x)
+        assert l == [-1, 1.5, 2, 3]
+        class myint(int):
+            def __lt__(self, other):
+                return int(self) > int(other)
+        l = [1, 3, 2]
+        l.sort(key=myint)
+        assert l == [3, 2, 1]
+        l = ['b', 'a', u'c']
+        l.sort(key=lambda x: x)
+        assert l == ['a', 'b', u'c']
+        l = [u'\u1234', u'b', u'\xe9', u'\U00012345', u'a\u1234', u'a']
+        expected = sorted(l, cmp=lambda a, b: cmp(a, b))
+        l.sort(key=lambda x: x)
+        assert l == expected
+        assert l[:3] == [u'a', u'a\u1234', u'b']
+
     def test_sort_reversed(self):
         l = range(10)
         l.sort(reverse=True)
@@ -777,6 +813,20 @@ class AppTestListObject(object):
         l.sort()
         assert l == ["a", "b", "c", "d"]
 
+    def test_sort_many_strings(self):
+        l = ["key%d" % (i * 7919 % 1000) for i in range(1000)] + ["", "key"]
+        expected = sorted(l, cmp=lambda a, b: cmp(a, b))
+        l.sort()
+        assert l == expected
+        l.sort(reverse=True)
+        assert l == expected[::-1]
+        l = [s.decode('ascii') for s in expected[::-1]]
+        l.sort()
+        assert l == expected
+        l = [(s, i) for i, s in enumerate(expected[::-1])]
+        l.sort(key=lambda x: x[0][:4])
+        assert l == sorted(l, cmp=lambda a, b: cmp(a[0][:4], b[0][:4]))
+
     def test_sort_range(self):
         l = range(3, 10, 3)
         l.sort()
@@ -0,0 +1,109 @@
+
+""" Compare the speed of the bytecode interpreter on code that uses the
+superinstructions with the same code where they are replaced again by
+the plain opcodes.  The JIT is turned off, as it produces the same machine
+code for both versions:
+
+    pypy bench_superinstructions.py [repetitions]
+"""
+
+import opcode, sys, time, types
+
+PAIRS = [('LOAD_FAST_LOAD_FAST', 'LOAD_FAST'),
+         ('LOAD_FAST_LOAD_ATTR', 'LOAD_FAST'),
+         ('COMPARE_OP_POP_JUMP_IF_FALSE', 'COMPARE_OP')]
+
+def unfuse(func):
+    # a superinstruction only replaces the first opcode of the pair,
+    # so putting that opcode back gives the unoptimized bytecode
+    plain = {}
+    for fused, first in PAIRS:
+        if fused in opcode.opmap:
+            plain[opcode.opmap[fused]] = opcode.opmap[first]
+    co = func.func_code
+    code = list(co.co_code)
+    count = 0
+    i = 0
+    while i < len(code):
+        op = ord(code[i])
+        if op in plain:
+            code[i] = chr(plain[op])
+            count += 1
+        i += 1
+        if op >= opcode.HAVE_ARGUMENT:
+            i += 2
+    co = types.CodeType(co.co_argcount, co.co_nlocals, co.co_stacksize,
+                        co.co_flags, ''.join(code), co.co_consts,
+                        co.co_names, co.co_varnames, co.co_filename,
+                        co.co_name, co.co_firstlineno, co.co_lnotab,
+                        co.co_freevars, co.co_cellvars)
+    return count, types.FunctionType(co, func.func_globals, func.func_name,
+                                     func.func_defaults, func.func_closure)
+
+class Point(object):
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+def count_below(n, limit):
+    total = 0
+    i = 0
+    while i < n:
+        if i % 7 < limit:
+            total += 1
+        i += 1
+    return total
+
+def manhattan(points):
+    total = 0
+    for p in points:
+        for q in points:
+            total += abs(p.x - q.x) + abs(p.y - q.y)
+    return total
+
+def bubble_sort(lst):
+    lst = list(lst)
+    n = len(lst)
+    for i in range(n):
+        for j in range(n - 1 - i):
+            a = lst[j]
+            b = lst[j + 1]
+            if a > b:
+                lst[j] = b
+                lst[j + 1] = a
+    return lst
+
+BENCHMARKS = [
+    (count_below, (300000, 4)),
+    (manhattan, ([Point(i, i * 3 % 17) for i in range(150)],)),
+    (bubble_sort, (range(400, 0, -1),)),
+]
+
+def best_time(func, args, repetitions):
+    best = None
+    for i in range(repetitions):
+        t0 = time.time()
+        func(*args)
+        t1 = time.time()
+        if best is None or t1 - t0 < best:
+            best = t1 - t0
+    return best
+
+def main(repetitions=5):
+    try:
+        import pypyjit
+    except ImportError:
+        pass
+    else:
+        pypyjit.set_param("off")
+    for func, args in BENCHMARKS:
+        count, plain_func = unfuse(func)
+        assert plain_func(*args) == func(*args)
+        t_plain = best_time(plain_func, args, repetitions)
+        t_fused = best_time(func, args, repetitions)
+        print "%-12s %2d superinstructions: %.3fs -> %.3fs (%.1f%%)" % (
+            func.func_name, count, t_plain, t_fused,
+            (t_plain - t_fused) * 100.0 / t_plain)
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -944,6 +944,13 @@ class FlowContext(object):
         self.pushvalue(op.newlist().eval(self))
         self.pushvalue(last_val)
 
+    # The superinstructions emitted by PyPy replace only the opcode of
+    # the first instruction of a pair: executing that first half and then
+    # continuing with the unchanged second instruction is equivalent.
+    LOAD_FAST_LOAD_FAST = LOAD_FAST
+    LOAD_FAST_LOAD_ATTR = LOAD_FAST
+    COMPARE_OP_POP_JUMP_IF_FALSE = COMPARE_OP
+
     def call_function(self, oparg, w_star=None, w_starstar=None):
         if w_starstar is not None:
             raise FlowingError("Dict-unpacking is not RPython")
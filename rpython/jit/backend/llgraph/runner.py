@@ -156,10 +156,15 @@ class FieldDescr(BackendDescr):
         self.FIELD = getattr(S, fieldname)
         self.index = heaptracker.get_fielddescr_index_in(S, fieldname)
         self._is_pure = S._immutable_field(fieldname) != False
+        self._is_list_length = (fieldname == 'length' and
+                                S._hints.get('list', False))
 
     def is_always_pure(self):
         return self._is_pure
 
+    def is_list_length_field(self):
+        return self._is_list_length
+
     def get_parent_descr(self):
         return self.parent_descr
 
@@ -150,17 +150,21 @@ class FieldDescr(ArrayOrFieldDescr):
     flag = '\x00'
 
     def __init__(self, name, offset, field_size, flag, index_in_parent=0,
-                 is_pure=False):
+                 is_pure=False, is_list_length=False):
         self.name = name
         self.offset = offset
         self.field_size = field_size
         self.flag = flag
         self.index = index_in_parent
         self._is_pure = is_pure
+        self._is_list_length = is_list_length
 
     def is_always_pure(self):
         return self._is_pure
 
+    def is_list_length_field(self):
+        return self._is_list_length
+
     def __repr__(self):
         return 'FieldDescr<%s>' % (self.name,)
 
@@ -227,8 +231,10 @@ def get_field_descr(gccache, STRUCT, fieldname):
         name = '%s.%s' % (STRUCT._name, fieldname)
         index_in_parent = heaptracker.get_fielddescr_index_in(STRUCT, fieldname)
         is_pure = STRUCT._immutable_field(fieldname) != False
+        is_list_length = (fieldname == 'length' and
+                          STRUCT._hints.get('list', False))
         fielddescr = FieldDescr(name, offset, size, flag, index_in_parent,
-                                is_pure)
+                                is_pure, is_list_length)
         cachedict = cache.setdefault(STRUCT, {})
         cachedict[fieldname] = fielddescr
         if STRUCT is rclass.OBJECT:
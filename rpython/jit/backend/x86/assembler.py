@@ -1169,8 +1169,12 @@ class Assembler386(BaseAssembler, VectorAssemblerMixin):
         to_xmm = isinstance(to_loc, RegLoc) and to_loc.is_xmm
         if from_xmm or to_xmm:
             if from_xmm and to_xmm:
-                # copy 128-bit from -> to
-                self.mc.MOVAPD(to_loc, from_loc)
+                if IS_X86_64 and self.ymm_in_use:
+                    # copy 256-bit from -> to
+                    self.mc.VMOVAPD(to_loc, from_loc)
+                else:
+                    # copy 128-bit from -> to
+                    self.mc.MOVAPD(to_loc, from_loc)
             else:
                 self.mc.MOVSD(to_loc, from_loc)
         else:
@@ -1999,6 +2003,10 @@ class Assembler386(BaseAssembler, VectorAssemblerMixin):
         #
         self._update_at_exit(guardtok.fail_locs, guardtok.failargs,
                              guardtok.faildescr, regalloc)
+        if IS_X86_64 and self.ymm_in_use:
+            # the upper halves of the ymm registers are not needed any
+            # more, and would slow down the SSE instructions that follow
+            self.mc.VZEROUPPER()
         #
         faildescrindex, target = self.store_info_on_descr(startpos, guardtok)
         if IS_X86_64:
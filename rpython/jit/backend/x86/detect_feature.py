@@ -20,16 +20,19 @@ def detect_sse2():
     code = cpu_id(eax=1)
     return bool(code & (1<<25)) and bool(code & (1<<26))
 
-def cpu_id(eax = 1, ret_edx = True, ret_ecx = False):
+def cpu_id(eax = 1, ret_edx = True, ret_ecx = False, ret_ebx = False):
     asm = ["\xB8",                     # MOV EAX, $eax
                 chr(eax & 0xff),
                 chr((eax >> 8) & 0xff),
                 chr((eax >> 16) & 0xff),
                 chr((eax >> 24) & 0xff),
+           "\x31\xC9",                 # XOR ECX, ECX (sub-leaf 0)
            "\x53",                     # PUSH EBX
            "\x0F\xA2",                 # CPUID
-           "\x5B",                     # POP EBX
           ]
+    if ret_ebx:
+        asm.append("\x89\xD8")         # MOV EAX, EBX
+    asm.append("\x5B")                 # POP EBX
     if ret_edx:
         asm.append("\x92")             # XCHG EAX, EDX
     elif ret_ecx:
@@ -52,6 +55,29 @@ def detect_sse4a(code=-1):
         code = cpu_id(eax=0x80000001, ret_edx=False, ret_ecx=True)
     return bool(code & (1<<20))
 
+def detect_avx(code=-1):
+    # the cpu must support AVX, and the OS must save the ymm registers
+    # (the bits 1 and 2 of XCR0, read with XGETBV)
+    if code == -1:
+        code = cpu_id(eax=1, ret_edx=False, ret_ecx=True)
+    if not (code & (1<<27)) or not (code & (1<<28)):
+        return False
+    xcr0 = cpu_info("\x31\xC9"           # XOR ECX, ECX
+                    "\x0F\x01\xD0"       # XGETBV
+                    "\xC3")              # RET
+    return (xcr0 & 6) == 6
+
+def detect_avx2():
+    if not detect_avx():
+        return False
+    code = cpu_id(eax=7, ret_edx=False, ret_ebx=True)
+    return bool(code & (1<<5))
+
+def detect_fma(code=-1):
+    if code == -1:
+        code = cpu_id(eax=1, ret_edx=False, ret_ecx=True)
+    return detect_avx(code) and bool(code & (1<<12))
+
 def detect_x32_mode():
     # 32-bit         64-bit / x32
     code = cpu_info("\x48"                # DEC EAX
@@ -71,6 +97,12 @@ if __name__ == '__main__':
         print 'Processor supports sse4.2'
     if detect_sse4a():
         print 'Processor supports sse4a'
+    if detect_avx():
+        print 'Processor supports avx'
+    if detect_avx2():
+        print 'Processor supports avx2'
+    if detect_fma():
+        print 'Processor supports fma'
 
     if detect_x32_mode():
         print 'Process is running in "x32" mode.'
@@ -195,6 +195,8 @@ class RegAlloc(BaseRegalloc, VectorRegallocMixin):
                                   assembler = self.assembler)
         self.xrm = xmm_reg_mgr_cls(self.longevity, frame_manager = self.fm,
                                    assembler = self.assembler)
+        self.assembler.ymm_in_use = self._uses_ymm_registers(inputargs,
+                                                             operations)
         return operations
 
     def prepare_loop(self, inputargs, operations, looptoken, allgcrefs):
@@ -659,6 +659,93 @@ class LocationCodeBuilder(object):
 
         return INSN
 
+    # The 256-bit AVX instructions exist only in X86_64_CodeBuilder.  In
+    # there, the location code 'y' stands for the ymm registers, which
+    # are the xmm registers (location code 'x') extended to 256 bits.
+
+    def _ymm_binaryop(name):
+        def invoke(self, codes, val1, val2):
+            methname = name + "_" + codes
+            if hasattr(rx86.X86_64_CodeBuilder, methname):
+                getattr(self, methname)(val1, val2)
+            else:
+                _missing_binary_insn(name, codes[0], codes[1])
+        invoke._annspecialcase_ = 'specialize:arg(1)'
+
+        def INSN(self, loc1, loc2):
+            assert self.WORD == 8
+            code1 = loc1.location_code()
+            code2 = loc2.location_code()
+            fits32 = rx86.fits_in_32bits
+            if code1 == 'x' and code2 == 'x':
+                invoke(self, 'yy', loc1.value_x(), loc2.value_x())
+            elif code1 == 'x':
+                val1 = loc1.value_x()
+                if code2 == 'j':
+                    val2 = loc2.value_j()
+                    if fits32(val2):
+                        invoke(self, 'yj', val1, val2)
+                    else:
+                        invoke(self, 'ym', val1, self._addr_as_reg_offset(val2))
+                elif code2 == 'm':
+                    val2 = loc2.value_m()
+                    if not fits32(val2[1]):
+                        val2 = self._fix_static_offset_64_m(val2)
+                    invoke(self, 'ym', val1, val2)
+                elif code2 == 'a':
+                    val2 = loc2.value_a()
+                    if not fits32(val2[3]):
+                        val2 = self._fix_static_offset_64_a(val2)
+                    invoke(self, 'ya', val1, val2)
+                else:
+                    _missing_binary_insn(name, code1, code2)
+            elif code2 == 'x':
+                val2 = loc2.value_x()
+                if code1 == 'j':
+                    val1 = loc1.value_j()
+                    if fits32(val1):
+                        invoke(self, 'jy', val1, val2)
+                    else:
+                        invoke(self, 'my', self._addr_as_reg_offset(val1), val2)
+                elif code1 == 'm':
+                    val1 = loc1.value_m()
+                    if not fits32(val1[1]):
+                        val1 = self._fix_static_offset_64_m(val1)
+                    invoke(self, 'my', val1, val2)
+                elif code1 == 'a':
+                    val1 = loc1.value_a()
+                    if not fits32(val1[3]):
+                        val1 = self._fix_static_offset_64_a(val1)
+                    invoke(self, 'ay', val1, val2)
+                else:
+                    _missing_binary_insn(name, code1, code2)
+            else:
+                _missing_binary_insn(name, code1, code2)
+
+        return func_with_new_name(INSN, "INSN_" + name)
+
+    def _ymm_vector_size_choose(name):
+        # 'loc1 = loc2 op loc3', with all three in xmm/ymm registers
+        def invoke(self, suffix, val1, val2, val3):
+            methname = name + suffix
+            getattr(self, methname)(val1, val2, val3)
+        invoke._annspecialcase_ = 'specialize:arg(1)'
+
+        possible_instr_unrolled = unrolling_iterable([(1,'B_yyy'),(2,'W_yyy'),
+                                                      (4,'D_yyy'),(8,'Q_yyy')])
+
+        def INSN(self, loc1, loc2, loc3, size):
+            assert self.WORD == 8
+            val1 = loc1.value_x()
+            val2 = loc2.value_x()
+            val3 = loc3.value_x()
+            for s,suffix in possible_instr_unrolled:
+                if s == size:
+                    invoke(self, suffix, val1, val2, val3)
+                    break
+
+        return INSN
+
     AND = _binaryop('AND')
     OR  = _binaryop('OR')
     OR8 = _binaryop('OR8')
@@ -785,6 +872,15 @@ class LocationCodeBuilder(object):
     HADDPD = _binaryop('HADDPD')
     HADDPS = _binaryop('HADDPS')
 
+    VMOVUPD = _ymm_binaryop('VMOVUPD')
+    VMOVUPS = _ymm_binaryop('VMOVUPS')
+    VMOVAPD = _ymm_binaryop('VMOVAPD')
+    VMOVDQU = _ymm_binaryop('VMOVDQU')
+    VBROADCASTSD = _ymm_binaryop('VBROADCASTSD')
+    VBROADCASTSS = _ymm_binaryop('VBROADCASTSS')
+    VBROADCASTF128 = _ymm_binaryop('VBROADCASTF128')
+    VPCMPEQ = _ymm_vector_size_choose('VPCMPEQ')
+
     CALL = _relative_unaryop('CALL')
     JMP = _relative_unaryop('JMP')
 
@@ -386,6 +386,81 @@ def xmminsn(*encoding):
     encode.is_xmm_insn = True
     return encode
 
+# ____________________________________________________________
+# ***X86_64 only***
+# The AVX instructions start with a VEX prefix instead of the REX prefix,
+# the mandatory prefix (66, F3 or F2) and the escape bytes (0F, 0F38 or
+# 0F3A).  It also encodes an extra source register in its 'vvvv' field.
+
+VEX_PP = {'': 0, '\x66': 1, '\xF3': 2, '\xF2': 3}
+VEX_MMMMM = {'\x0F': 1, '\x0F\x38': 2, '\x0F\x3A': 3}
+
+def encode_is4(mc, reg, _, orbyte):
+    # a register in the high 4 bits of the last byte (e.g. VPBLENDVB)
+    assert orbyte == 0
+    assert 0 <= reg < 16
+    mc.writechar(chr(reg << 4))
+    return 0
+
+def is4_register(argnum):
+    return encode_is4, argnum, None, None
+
+def vexinsn(prefix, escape, w, l, vvvv_argnum, *encoding):
+    """An AVX instruction.  'prefix' and 'escape' are the bytes that the
+    VEX prefix replaces, 'w' is VEX.W and 'l' is VEX.L (1 for the 256-bit
+    ymm registers).  'vvvv_argnum' is the number of the argument encoded
+    in the 'vvvv' field, or 0.  The rest of the encoding is as for insn(),
+    but without any REX prefix.
+    """
+    pp = VEX_PP[prefix]
+    mmmmm = VEX_MMMMM[escape]
+    assert w in (0, 1) and l in (0, 1)
+
+    def encode(mc, *args):
+        assert mc.WORD == 8
+        rexbyte = 0
+        for encode_step, arg, extra, rex_step in encoding_steps:
+            if rex_step:
+                if arg is not None:
+                    arg = args[arg-1]
+                rexbyte |= rex_step(mc, arg, extra)
+        if vvvv_argnum:
+            vvvv = args[vvvv_argnum-1]
+            assert 0 <= vvvv < 16
+        else:
+            vvvv = 0
+        lastbyte = ((~vvvv & 0xF) << 3) | (l << 2) | pp
+        if mmmmm == 1 and w == 0 and (rexbyte & (REX_X | REX_B)) == 0:
+            # the 2-bytes form
+            mc.writechar('\xC5')
+            mc.writechar(chr(((~rexbyte & REX_R) << 5) | lastbyte))
+        else:
+            mc.writechar('\xC4')
+            mc.writechar(chr(((~rexbyte & (REX_R | REX_X | REX_B)) << 5) |
+                             mmmmm))
+            mc.writechar(chr((w << 7) | lastbyte))
+        args = (0,) + args
+        # emit the bytes of the instruction
+        orbyte = 0
+        for encode_step, arg, extra, rex_step in encoding_steps:
+            if arg is not None:
+                arg = args[arg]
+            orbyte = encode_step(mc, arg, extra, orbyte)
+        assert orbyte == 0
+
+    #
+    encoding_steps = []
+    for step in encoding:
+        if isinstance(step, str):
+            for c in step:
+                encoding_steps.append((encode_char, None, ord(c), None))
+        else:
+            assert type(step) is tuple and len(step) == 4
+            encoding_steps.append(step)
+    encoding_steps = unrolling_iterable(encoding_steps)
+    encode.is_xmm_insn = True
+    return encode
+
 def common_modes(group):
     base = group * 8
     char = chr(0xC0 | base)
@@ -1047,6 +1122,114 @@ define_pxmm_insn('PCMPEQD_x*',   '\x76')
 define_pxmm_insn('PCMPEQW_x*',   '\x75')
 define_pxmm_insn('PCMPEQB_x*',   '\x74')
 
+# ____________________________________________________________
+# ***X86_64 only***
+# AVX and AVX2 instructions on the 256-bit registers ymm0-ymm15, which
+# extend the xmm registers.  The location code 'y' is used for them.
+
+def define_vex_insn(methname, *args):
+    assert not hasattr(X86_64_CodeBuilder, methname)
+    setattr(X86_64_CodeBuilder, methname, vexinsn(*args))
+
+def define_vex_modrm_modes(insnname_template, before_modrm, after_modrm=[],
+                           regcode='y'):
+    # only the register and the memory operands; the other operands
+    # are in 'y' (ymm) or 'x' (xmm) registers
+    modrm_argnum = insnname_template.split('_')[1].index('*')+1
+    def add_insn(code, *modrm):
+        methname = insnname_template.replace('*', code)
+        args = before_modrm + list(modrm)
+        if code == regcode:
+            args.append('\xC0')
+        args += after_modrm
+        if not hasattr(X86_64_CodeBuilder, methname):
+            define_vex_insn(methname, *args)
+    if regcode is not None:
+        add_insn(regcode, register(modrm_argnum))
+    add_insn('m', mem_reg_plus_const(modrm_argnum))
+    add_insn('a', mem_reg_plus_scaled_reg_plus_const(modrm_argnum))
+    add_insn('j', abs_(modrm_argnum))
+
+for _name, _prefix, _load, _store in [('VMOVUPD', '\x66', '\x10', '\x11'),
+                                      ('VMOVUPS', '',     '\x10', '\x11'),
+                                      ('VMOVAPD', '\x66', '\x28', '\x29'),
+                                      ('VMOVDQU', '\xF3', '\x6F', '\x7F')]:
+    define_vex_modrm_modes(_name + '_y*', [_prefix, '\x0F', 0, 1, 0,
+                                           _load, register(1, 8)])
+    define_vex_modrm_modes(_name + '_*y', [_prefix, '\x0F', 0, 1, 0,
+                                           _store, register(2, 8)])
+
+# broadcast from memory (AVX) or from the low element of a xmm (AVX2)
+for _name, _char, _regcode in [('VBROADCASTSD', '\x19', 'x'),
+                               ('VBROADCASTSS', '\x18', 'x'),
+                               ('VBROADCASTF128', '\x1A', None)]:
+    define_vex_modrm_modes(_name + '_y*', ['\x66', '\x0F\x38', 0, 1, 0,
+                                           _char, register(1, 8)],
+                           regcode=_regcode)
+for _name, _char in [('VPBROADCASTQ', '\x59'), ('VPBROADCASTD', '\x58'),
+                     ('VPBROADCASTW', '\x79'), ('VPBROADCASTB', '\x78')]:
+    define_vex_insn(_name + '_yx', '\x66', '\x0F\x38', 0, 1, 0,
+                    _char, register(1, 8), register(2), '\xC0')
+
+# three operands: ymm1 = ymm2 op ymm3
+for _name, _prefix, _escape, _char in [
+        ('VADDPD', '\x66', '\x0F', '\x58'), ('VADDPS', '', '\x0F', '\x58'),
+        ('VSUBPD', '\x66', '\x0F', '\x5C'), ('VSUBPS', '', '\x0F', '\x5C'),
+        ('VMULPD', '\x66', '\x0F', '\x59'), ('VMULPS', '', '\x0F', '\x59'),
+        ('VDIVPD', '\x66', '\x0F', '\x5E'), ('VDIVPS', '', '\x0F', '\x5E'),
+        ('VANDPD', '\x66', '\x0F', '\x54'), ('VANDPS', '', '\x0F', '\x54'),
+        ('VXORPD', '\x66', '\x0F', '\x57'), ('VXORPS', '', '\x0F', '\x57'),
+        ('VPADDQ', '\x66', '\x0F', '\xD4'), ('VPADDD', '\x66', '\x0F', '\xFE'),
+        ('VPADDW', '\x66', '\x0F', '\xFD'), ('VPADDB', '\x66', '\x0F', '\xFC'),
+        ('VPSUBQ', '\x66', '\x0F', '\xFB'), ('VPSUBD', '\x66', '\x0F', '\xFA'),
+        ('VPSUBW', '\x66', '\x0F', '\xF9'), ('VPSUBB', '\x66', '\x0F', '\xF8'),
+        ('VPMULLD', '\x66', '\x0F\x38', '\x40'),
+        ('VPMULLW', '\x66', '\x0F', '\xD5'),
+        ('VPAND', '\x66', '\x0F', '\xDB'), ('VPOR', '\x66', '\x0F', '\xEB'),
+        ('VPXOR', '\x66', '\x0F', '\xEF'),
+        ('VPCMPEQQ', '\x66', '\x0F\x38', '\x29'),
+        ('VPCMPEQD', '\x66', '\x0F', '\x76'),
+        ('VPCMPEQW', '\x66', '\x0F', '\x75'),
+        ('VPCMPEQB', '\x66', '\x0F', '\x74')]:
+    define_vex_insn(_name + '_yyy', _prefix, _escape, 0, 1, 2,
+                    _char, register(1, 8), register(3), '\xC0')
+
+for _name, _prefix, _escape, _char in [
+        ('VCMPPD', '\x66', '\x0F', '\xC2'), ('VCMPPS', '', '\x0F', '\xC2'),
+        ('VPBLENDD', '\x66', '\x0F\x3A', '\x02'),
+        ('VPBLENDW', '\x66', '\x0F\x3A', '\x0E'),
+        ('VPERM2F128', '\x66', '\x0F\x3A', '\x06')]:
+    define_vex_insn(_name + '_yyyi', _prefix, _escape, 0, 1, 2,
+                    _char, register(1, 8), register(3), '\xC0',
+                    immediate(4, 'b'))
+
+define_vex_insn('VPBLENDVB_yyyy', '\x66', '\x0F\x3A', 0, 1, 2,
+                '\x4C', register(1, 8), register(3), '\xC0', is4_register(4))
+define_vex_insn('VEXTRACTF128_xyi', '\x66', '\x0F\x3A', 0, 1, 0,
+                '\x19', register(2, 8), register(1), '\xC0', immediate(3, 'b'))
+define_vex_insn('VINSERTF128_yyxi', '\x66', '\x0F\x3A', 0, 1, 2,
+                '\x18', register(1, 8), register(3), '\xC0', immediate(4, 'b'))
+define_vex_insn('VPTEST_yy', '\x66', '\x0F\x38', 0, 1, 0,
+                '\x17', register(1, 8), register(2), '\xC0')
+define_vex_insn('VPMOVSXDQ_yx', '\x66', '\x0F\x38', 0, 1, 0,
+                '\x25', register(1, 8), register(2), '\xC0')
+define_vex_insn('VPSHUFD_yyi', '\x66', '\x0F', 0, 1, 0,
+                '\x70', register(1, 8), register(2), '\xC0', immediate(3, 'b'))
+define_vex_insn('VPERMQ_yyi', '\x66', '\x0F\x3A', 1, 1, 0,
+                '\x00', register(1, 8), register(2), '\xC0', immediate(3, 'b'))
+
+# conversions between 4 doubles in a ymm and 4 singles or ints in a xmm
+define_vex_insn('VCVTPD2PS_xy', '\x66', '\x0F', 0, 1, 0,
+                '\x5A', register(1, 8), register(2), '\xC0')
+define_vex_insn('VCVTPS2PD_yx', '', '\x0F', 0, 1, 0,
+                '\x5A', register(1, 8), register(2), '\xC0')
+define_vex_insn('VCVTPD2DQ_xy', '\xF2', '\x0F', 0, 1, 0,
+                '\xE6', register(1, 8), register(2), '\xC0')
+define_vex_insn('VCVTDQ2PD_yx', '\xF3', '\x0F', 0, 1, 0,
+                '\xE6', register(1, 8), register(2), '\xC0')
+
+define_vex_insn('VZEROUPPER', '', '\x0F', 0, 0, 0, '\x77')
+
 # ____________________________________________________________
 
 _classes = (AbstractX86CodeBuilder, X86_64_CodeBuilder, X86_32_CodeBuilder)
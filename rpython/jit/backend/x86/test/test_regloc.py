@@ -460,6 +460,44 @@ class Test64Bits:
         # this case would be a INC_a
         xxx
 
+    def test_ymm_64bit_address(self):
+        base_addr = 0x0123456789ABCDEF
+        cb = LocationCodeBuilder64()
+        cb.VMOVUPD(xmm3, AddressLoc(ImmedLoc(0), ImmedLoc(0), 0, base_addr))
+        # this case is a VMOVUPD_yj
+        #
+        expected_instructions = (
+                # mov r11, 0x0123456789ABCDEF
+                '\x49\xBB\xEF\xCD\xAB\x89\x67\x45\x23\x01'
+                # vmovupd ymm3, [r11]
+                '\xC4\xC1\x7D\x10\x1B'
+        )
+        assert cb.getvalue() == expected_instructions
+
+    def test_ymm_registers(self):
+        from rpython.jit.backend.x86.detect_feature import cpu_info
+        from rpython.jit.backend.x86.detect_feature import detect_avx2
+        if not detect_avx2():
+            py.test.skip("no AVX2 support")
+        buf = lltype.malloc(rffi.LONGLONGP.TO, 4, flavor='raw')
+        for i in range(4):
+            buf[i] = i + 1
+        cb = LocationCodeBuilder64()
+        cb.MOV_ri(eax.value, rffi.cast(lltype.Signed, buf))
+        cb.VMOVDQU(xmm1, AddressLoc(eax, ImmedLoc(0)))
+        cb.VPADDQ_yyy(xmm1.value, xmm1.value, xmm1.value)
+        # add the upper half to the lower half, then the two elements
+        cb.VEXTRACTF128_xyi(xmm2.value, xmm1.value, 1)
+        cb.PADDQ(xmm1, xmm2)
+        cb.PEXTRQ_rxi(eax.value, xmm1.value, 0)
+        cb.PEXTRQ_rxi(ecx.value, xmm1.value, 1)
+        cb.ADD_rr(eax.value, ecx.value)
+        cb.VZEROUPPER()
+        cb.writechar('\xC3')     # RET
+        res = cpu_info(cb.getvalue())
+        lltype.free(buf, flavor='raw')
+        assert res == 2 * (1 + 2 + 3 + 4)
+
     def test_inc_64bit_address_3(self):
         base_addr = 0x0123456789ABCDEF
         cb = LocationCodeBuilder64()
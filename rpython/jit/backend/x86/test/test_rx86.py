@@ -243,3 +243,17 @@ def test_multibyte_nops():
         assert len(cls.MULTIBYTE_NOPs) == 16
         for i in range(16):
             assert len(cls.MULTIBYTE_NOPs[i]) == i
+
+def test_vex_prefix():
+    cb = CodeBuilder64
+    # the 2-bytes form
+    assert_encodes_as(cb, 'VADDPD_yyy', (xmm0, xmm1, xmm2),
+                      '\xC5\xF5\x58\xC2')
+    assert_encodes_as(cb, 'VZEROUPPER', (), '\xC5\xF8\x77')
+    # the 3-bytes form: extended registers, VEX.W, other escape bytes
+    assert_encodes_as(cb, 'VADDPD_yyy', (xmm9, xmm1, xmm8),
+                      '\xC4\x41\x75\x58\xC8')
+    assert_encodes_as(cb, 'VPERMQ_yyi', (xmm1, xmm2, 8),
+                      '\xC4\xE3\xFD\x00\xCA\x08')
+    assert_encodes_as(cb, 'VPBLENDVB_yyyy', (xmm4, xmm3, xmm2, xmm0),
+                      '\xC4\xE3\x65\x4C\xE2\x00')
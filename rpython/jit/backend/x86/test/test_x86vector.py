@@ -3,7 +3,8 @@ from rpython.jit.backend.x86.regloc import *
 from rpython.jit.backend.llsupport.regalloc import Lifetime
 from rpython.jit.backend.x86.regalloc import (RegAlloc,
         X86FrameManager, X86XMMRegisterManager, X86RegisterManager)
-from rpython.jit.backend.x86.vector_ext import TempVector
+from rpython.jit.backend.x86.vector_ext import TempVector, X86VectorExt
+from rpython.jit.backend.x86 import detect_feature
 from rpython.jit.backend.x86.test import test_basic
 from rpython.jit.backend.x86.test.test_assembler import \
         (TestRegallocPushPop as BaseTestAssembler)
@@ -31,6 +32,17 @@ class TestBasic(test_basic.Jit386Mixin, test_zvector.VectorizeTests):
 
     enable_opts = 'intbounds:rewrite:virtualize:string:earlyforce:pure:heap:unroll'
 
+class TestBasicAVX2(TestBasic):
+    # the same, with the 256-bit registers of AVX2
+    def setup_method(self, method):
+        if not detect_feature.detect_avx2():
+            py.test.skip("needs a cpu with AVX2")
+        TestBasic.setup_method(self, method)
+        X86VectorExt.allow_avx2 = True
+
+    def teardown_method(self, method):
+        X86VectorExt.allow_avx2 = False
+
 @py.test.fixture
 def regalloc(request):
     from rpython.jit.backend.x86.regalloc import X86FrameManager
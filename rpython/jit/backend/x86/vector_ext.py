@@ -18,6 +18,7 @@ from rpython.rlib.objectmodel import we_are_translated, always_inline
 from rpython.rtyper.lltypesystem.lloperation import llop
 from rpython.rtyper.lltypesystem import lltype
 from rpython.jit.backend.x86 import rx86, detect_feature
+from rpython.jit.backend.x86.arch import IS_X86_64
 
 # duplicated for easy migration, def in assembler.py as well
 # DUP START
@@ -51,9 +52,15 @@ class TempInt(TempVar):
 class X86VectorExt(VectorExt):
 
     should_align_unroll = True
+    # use the 256-bit ymm registers if the cpu has AVX2.  Off until the
+    # vector execution tests have run on an AVX2 machine.
+    allow_avx2 = False
 
     def setup_once(self, asm):
-        if detect_feature.detect_sse4_1():
+        if self.allow_avx2 and detect_feature.detect_avx2():
+            self.enable(32, accum=True)
+            asm.setup_once_vector()
+        elif detect_feature.detect_sse4_1():
             self.enable(16, accum=True)
             asm.setup_once_vector()
         self._setup = True
@@ -61,9 +68,14 @@ class X86VectorExt(VectorExt):
 class VectorAssemblerMixin(object):
     _mixin_ = True
     element_ones = []    # overridden in assembler.py
+    vector_ymm = False   # vectors are in the 256-bit ymm registers (AVX2)
+    ymm_in_use = False   # the loop being compiled has vectors in ymm regs
 
     def setup_once_vector(self):
-        pass
+        self.vector_ymm = self.cpu.vector_ext.vec_size() == 32
+
+    def _use_ymm(self):
+        return IS_X86_64 and self.vector_ymm
 
     def genop_guard_vec_guard_true(self, guard_op, guard_token, locs, resloc):
         self.implement_guard(guard_token)
@@ -82,6 +94,13 @@ class VectorAssemblerMixin(object):
         assert ve is not None # MUST hold, optimize_vector is never entered if vector_ext is entered
         load = arg.bytesize * arg.count - ve.register_size
         assert load <= 0
+        if self._use_ymm():
+            if arg.bytesize * arg.count > 16:
+                self._guard_vector_ymm(loc, arg, true, load)
+                return
+            # only the lower half is used, and the SSE instructions
+            # below ignore the upper half of the ymm register
+            load = arg.bytesize * arg.count - 16
         if true:
             self.mc.PXOR(temp, temp)
             # if the vector is not fully packed blend 1s
@@ -116,6 +135,40 @@ class VectorAssemblerMixin(object):
             index += 1
         self.mc.PBLENDW_xxi(loc.value, temp.value, select)
 
+    def _guard_vector_ymm(self, loc, arg, true, load):
+        # same as guard_vector(), on the whole ymm registers
+        size = arg.bytesize
+        temp = X86_64_XMM_SCRATCH_REG
+        if true:
+            self.mc.VPXOR_yyy(temp.value, temp.value, temp.value)
+            if load < 0:
+                self.mc.VPCMPEQQ_yyy(temp.value, temp.value, temp.value)
+                self._blend_unused_slots_ymm(loc, arg, temp)
+                self.mc.VPXOR_yyy(temp.value, temp.value, temp.value)
+            self.mc.VPCMPEQ(loc, loc, temp, size)
+            self.mc.VPCMPEQQ_yyy(temp.value, temp.value, temp.value)
+            self.mc.VPTEST_yy(loc.value, temp.value)
+            self.guard_success_cc = rx86.Conditions['Z']
+        else:
+            if load < 0:
+                self.mc.VPXOR_yyy(temp.value, temp.value, temp.value)
+                self._blend_unused_slots_ymm(loc, arg, temp)
+            self.mc.VPTEST_yy(loc.value, loc.value)
+            self.guard_success_cc = rx86.Conditions['NZ']
+
+    def _blend_unused_slots_ymm(self, loc, arg, temp):
+        # the lower half is fully used.  VPBLENDW selects the same words
+        # in both halves, so blend into 'temp' and take its upper half
+        select = 0
+        bits_used = (arg.count * arg.bytesize * 8) - 128
+        index = bits_used // 16
+        while index < 8:
+            select |= (1 << index)
+            index += 1
+        self.mc.VPBLENDW_yyyi(temp.value, loc.value, temp.value, select)
+        # loc = (loc[0:128], temp[128:256])
+        self.mc.VPERM2F128_yyyi(loc.value, loc.value, temp.value, 0x30)
+
     def _update_at_exit(self, fail_locs, fail_args, faildescr, regalloc):
         """ If accumulation is done in this loop, at the guard exit
             some vector registers must be adjusted to yield the correct value
@@ -156,6 +209,11 @@ class VectorAssemblerMixin(object):
             accum_info = accum_info.next()
 
     def _accum_reduce_mul(self, arg, accumloc, targetloc):
+        if self._use_ymm():
+            # r = (r[0]*r[2], r[1]*r[3])
+            scratchloc = X86_64_XMM_SCRATCH_REG
+            self.mc.VEXTRACTF128_xyi(scratchloc.value, accumloc.value, 1)
+            self.mc.MULPD(accumloc, scratchloc)
         self.mov(accumloc, targetloc)
         # swap the two elements
         self.mc.SHUFPD_xxi(targetloc.value, targetloc.value, 0x01)
@@ -164,6 +222,14 @@ class VectorAssemblerMixin(object):
     def _accum_reduce_sum(self, arg, accumloc, targetloc):
         # Currently the accumulator can ONLY be the biggest
         # size for X86 -> 64 bit float/int
+        if self._use_ymm():
+            # r = (r[0]+r[2], r[1]+r[3]), then as below
+            scratchloc = X86_64_XMM_SCRATCH_REG
+            self.mc.VEXTRACTF128_xyi(scratchloc.value, accumloc.value, 1)
+            if arg.type == FLOAT:
+                self.mc.ADDPD(accumloc, scratchloc)
+            else:
+                self.mc.PADDQ(accumloc, scratchloc)
         if arg.type == FLOAT:
             # r = (r[0]+r[1],r[0]+r[1])
             self.mc.HADDPD(accumloc, accumloc)
@@ -192,6 +258,14 @@ class VectorAssemblerMixin(object):
 
     @always_inline
     def _vec_load(self, resloc, src_addr, integer, itemsize, aligned):
+        if self._use_ymm():
+            if integer:
+                self.mc.VMOVDQU(resloc, src_addr)
+            elif itemsize == 4:
+                self.mc.VMOVUPS(resloc, src_addr)
+            elif itemsize == 8:
+                self.mc.VMOVUPD(resloc, src_addr)
+            return
         if integer:
             if aligned:
                 self.mc.MOVDQA(resloc, src_addr)
@@ -212,6 +286,14 @@ class VectorAssemblerMixin(object):
 
     @always_inline
     def _vec_store(self, dest_loc, value_loc, integer, itemsize, aligned):
+        if self._use_ymm():
+            if integer:
+                self.mc.VMOVDQU(dest_loc, value_loc)
+            elif itemsize == 4:
+                self.mc.VMOVUPS(dest_loc, value_loc)
+            elif itemsize == 8:
+                self.mc.VMOVUPD(dest_loc, value_loc)
+            return
         if integer:
             if aligned:
                 self.mc.MOVDQA(dest_loc, value_loc)
@@ -226,6 +308,11 @@ class VectorAssemblerMixin(object):
     def genop_vec_int_is_true(self, op, arglocs, resloc):
         loc, sizeloc = arglocs
         temp = X86_64_XMM_SCRATCH_REG
+        if self._use_ymm():
+            self.mc.VPXOR_yyy(temp.value, temp.value, temp.value)
+            self.mc.VPCMPEQ(loc, loc, temp, sizeloc.value)
+            self.mc.VPCMPEQ(loc, loc, temp, sizeloc.value)
+            return
         self.mc.PXOR(temp, temp)
         # every entry that is non zero -> becomes zero
         # zero entries become ones
@@ -237,7 +324,11 @@ class VectorAssemblerMixin(object):
     def genop_vec_int_mul(self, op, arglocs, resloc):
         loc0, loc1, itemsize_loc = arglocs
         itemsize = itemsize_loc.value
-        if itemsize == 2:
+        if self._use_ymm() and itemsize == 2:
+            self.mc.VPMULLW_yyy(loc0.value, loc0.value, loc1.value)
+        elif self._use_ymm() and itemsize == 4:
+            self.mc.VPMULLD_yyy(loc0.value, loc0.value, loc1.value)
+        elif itemsize == 2:
             self.mc.PMULLW(loc0, loc1)
         elif itemsize == 4:
             self.mc.PMULLD(loc0, loc1)
@@ -249,6 +340,16 @@ class VectorAssemblerMixin(object):
     def genop_vec_int_add(self, op, arglocs, resloc):
         loc0, loc1, size_loc = arglocs
         size = size_loc.value
+        if self._use_ymm():
+            if size == 1:
+                self.mc.VPADDB_yyy(loc0.value, loc0.value, loc1.value)
+            elif size == 2:
+                self.mc.VPADDW_yyy(loc0.value, loc0.value, loc1.value)
+            elif size == 4:
+                self.mc.VPADDD_yyy(loc0.value, loc0.value, loc1.value)
+            elif size == 8:
+                self.mc.VPADDQ_yyy(loc0.value, loc0.value, loc1.value)
+            return
         if size == 1:
             self.mc.PADDB(loc0, loc1)
         elif size == 2:
@@ -261,6 +362,16 @@ class VectorAssemblerMixin(object):
     def genop_vec_int_sub(self, op, arglocs, resloc):
         loc0, loc1, size_loc = arglocs
         size = size_loc.value
+        if self._use_ymm():
+            if size == 1:
+                self.mc.VPSUBB_yyy(loc0.value, loc0.value, loc1.value)
+            elif size == 2:
+                self.mc.VPSUBW_yyy(loc0.value, loc0.value, loc1.value)
+            elif size == 4:
+                self.mc.VPSUBD_yyy(loc0.value, loc0.value, loc1.value)
+            elif size == 8:
+                self.mc.VPSUBQ_yyy(loc0.value, loc0.value, loc1.value)
+            return
         if size == 1:
             self.mc.PSUBB(loc0, loc1)
         elif size == 2:
@@ -271,13 +382,22 @@ class VectorAssemblerMixin(object):
             self.mc.PSUBQ(loc0, loc1)
 
     def genop_vec_int_and(self, op, arglocs, resloc):
-        self.mc.PAND(resloc, arglocs[0])
+        if self._use_ymm():
+            self.mc.VPAND_yyy(resloc.value, resloc.value, arglocs[0].value)
+        else:
+            self.mc.PAND(resloc, arglocs[0])
 
     def genop_vec_int_or(self, op, arglocs, resloc):
-        self.mc.POR(resloc, arglocs[0])
+        if self._use_ymm():
+            self.mc.VPOR_yyy(resloc.value, resloc.value, arglocs[0].value)
+        else:
+            self.mc.POR(resloc, arglocs[0])
 
     def genop_vec_int_xor(self, op, arglocs, resloc):
-        self.mc.PXOR(resloc, arglocs[0])
+        if self._use_ymm():
+            self.mc.VPXOR_yyy(resloc.value, resloc.value, arglocs[0].value)
+        else:
+            self.mc.PXOR(resloc, arglocs[0])
 
     genop_vec_float_xor = genop_vec_int_xor
 
@@ -285,6 +405,12 @@ class VectorAssemblerMixin(object):
     def genop_vec_float_{type}(self, op, arglocs, resloc):
         loc0, loc1, itemsize_loc = arglocs
         itemsize = itemsize_loc.value
+        if self._use_ymm():
+            if itemsize == 4:
+                self.mc.V{p_op_s}_yyy(loc0.value, loc0.value, loc1.value)
+            elif itemsize == 8:
+                self.mc.V{p_op_d}_yyy(loc0.value, loc0.value, loc1.value)
+            return
         if itemsize == 4:
             self.mc.{p_op_s}(loc0, loc1)
         elif itemsize == 8:
@@ -301,6 +427,12 @@ class VectorAssemblerMixin(object):
     def genop_vec_float_truediv(self, op, arglocs, resloc):
         loc0, loc1, sizeloc = arglocs
         size = sizeloc.value
+        if self._use_ymm():
+            if size == 4:
+                self.mc.VDIVPS_yyy(loc0.value, loc0.value, loc1.value)
+            elif size == 8:
+                self.mc.VDIVPD_yyy(loc0.value, loc0.value, loc1.value)
+            return
         if size == 4:
             self.mc.DIVPS(loc0, loc1)
         elif size == 8:
@@ -309,6 +441,17 @@ class VectorAssemblerMixin(object):
     def genop_vec_float_abs(self, op, arglocs, resloc):
         src, sizeloc = arglocs
         size = sizeloc.value
+        if self._use_ymm():
+            # the constants are 16 bytes long: load them in both halves
+            temp = X86_64_XMM_SCRATCH_REG
+            if size == 4:
+                self.mc.VBROADCASTF128(temp,
+                                       heap(self.single_float_const_abs_addr))
+                self.mc.VANDPS_yyy(src.value, src.value, temp.value)
+            elif size == 8:
+                self.mc.VBROADCASTF128(temp, heap(self.float_const_abs_addr))
+                self.mc.VANDPD_yyy(src.value, src.value, temp.value)
+            return
         if size == 4:
             self.mc.ANDPS(src, heap(self.single_float_const_abs_addr))
         elif size == 8:
@@ -317,6 +460,16 @@ class VectorAssemblerMixin(object):
     def genop_vec_float_neg(self, op, arglocs, resloc):
         src, sizeloc = arglocs
         size = sizeloc.value
+        if self._use_ymm():
+            temp = X86_64_XMM_SCRATCH_REG
+            if size == 4:
+                self.mc.VBROADCASTF128(temp,
+                                       heap(self.single_float_const_neg_addr))
+                self.mc.VXORPS_yyy(src.value, src.value, temp.value)
+            elif size == 8:
+                self.mc.VBROADCASTF128(temp, heap(self.float_const_neg_addr))
+                self.mc.VXORPD_yyy(src.value, src.value, temp.value)
+            return
         if size == 4:
             self.mc.XORPS(src, heap(self.single_float_const_neg_addr))
         elif size == 8:
@@ -325,12 +478,22 @@ class VectorAssemblerMixin(object):
     def genop_vec_float_eq(self, op, arglocs, resloc):
         lhsloc, rhsloc, sizeloc = arglocs
         size = sizeloc.value
-        if size == 4:
-            self.mc.CMPPS_xxi(lhsloc.value, rhsloc.value, 0) # 0 means equal
-        else:
-            self.mc.CMPPD_xxi(lhsloc.value, rhsloc.value, 0)
+        self._vec_float_cmp(lhsloc, rhsloc, size, 0) # 0 means equal
         self.flush_vec_cc(rx86.Conditions["E"], lhsloc, resloc, sizeloc.value)
 
+    def _vec_float_cmp(self, lhsloc, rhsloc, size, predicate):
+        lhs = lhsloc.value
+        rhs = rhsloc.value
+        if self._use_ymm():
+            if size == 4:
+                self.mc.VCMPPS_yyyi(lhs, lhs, rhs, predicate)
+            else:
+                self.mc.VCMPPD_yyyi(lhs, lhs, rhs, predicate)
+        elif size == 4:
+            self.mc.CMPPS_xxi(lhs, rhs, predicate)
+        else:
+            self.mc.CMPPD_xxi(lhs, rhs, predicate)
+
     def flush_vec_cc(self, rev_cond, lhsloc, resloc, size):
         # After emitting an instruction that leaves a boolean result in
         # a condition code (cc), call this.  In the common case, result_loc
@@ -345,6 +508,13 @@ class VectorAssemblerMixin(object):
             assert lhsloc is xmm0
             maskloc = X86_64_XMM_SCRATCH_REG
             assert len(self.element_ones) > 0
+            if self._use_ymm():
+                self.mc.VBROADCASTF128(maskloc,
+                                   heap(self.element_ones[get_scale(size)]))
+                self.mc.VPXOR_yyy(resloc.value, resloc.value, resloc.value)
+                self.mc.VPBLENDVB_yyyy(resloc.value, resloc.value,
+                                       maskloc.value, lhsloc.value)
+                return
             self.mc.MOVAPD(maskloc, heap(self.element_ones[get_scale(size)]))
             self.mc.PXOR(resloc, resloc)
             # note that resloc contains true false for each element by the last compare operation
@@ -354,23 +524,29 @@ class VectorAssemblerMixin(object):
         lhsloc, rhsloc, sizeloc = arglocs
         size = sizeloc.value
         # b(100) == 1 << 2 means not equal
-        if size == 4:
-            self.mc.CMPPS_xxi(lhsloc.value, rhsloc.value, 1 << 2)
-        else:
-            self.mc.CMPPD_xxi(lhsloc.value, rhsloc.value, 1 << 2)
+        self._vec_float_cmp(lhsloc, rhsloc, size, 1 << 2)
         self.flush_vec_cc(rx86.Conditions["NE"], lhsloc, resloc, sizeloc.value)
 
     def genop_vec_int_eq(self, op, arglocs, resloc):
         lhsloc, rhsloc, sizeloc = arglocs
         size = sizeloc.value
-        self.mc.PCMPEQ(lhsloc, rhsloc, size)
+        if self._use_ymm():
+            self.mc.VPCMPEQ(lhsloc, lhsloc, rhsloc, size)
+        else:
+            self.mc.PCMPEQ(lhsloc, rhsloc, size)
         self.flush_vec_cc(rx86.Conditions["E"], lhsloc, resloc, sizeloc.value)
 
     def genop_vec_int_ne(self, op, arglocs, resloc):
         lhsloc, rhsloc, sizeloc = arglocs
         size = sizeloc.value
-        self.mc.PCMPEQ(resloc, rhsloc, size)
         temp = X86_64_XMM_SCRATCH_REG
+        if self._use_ymm():
+            self.mc.VPCMPEQ(resloc, resloc, rhsloc, size)
+            self.mc.VPCMPEQQ_yyy(temp.value, temp.value, temp.value)
+            self.mc.VPXOR_yyy(resloc.value, resloc.value, temp.value)
+            self.flush_vec_cc(rx86.Conditions["NE"], lhsloc, resloc, size)
+            return
+        self.mc.PCMPEQ(resloc, rhsloc, size)
         self.mc.PCMPEQQ(temp, temp) # set all bits to one
         # need to invert the value in resloc
         self.mc.PXOR(resloc, temp)
@@ -386,7 +562,14 @@ class VectorAssemblerMixin(object):
         tosize = tosizeloc.value
         if size == tosize:
             return # already the right size
-        if size == 4 and tosize == 8:
+        if self._use_ymm() and size == 4 and tosize == 8:
+            self.mc.VPMOVSXDQ_yx(resloc.value, srcloc.value)
+        elif self._use_ymm() and size == 8 and tosize == 4:
+            # the low 32 bits of the four 64-bit integers:
+            # first in the dwords 0 and 1 of each half, then together
+            self.mc.VPSHUFD_yyi(resloc.value, srcloc.value, 0x08)
+            self.mc.VPERMQ_yyi(resloc.value, resloc.value, 0x08)
+        elif size == 4 and tosize == 8:
             scratch = X86_64_SCRATCH_REG.value
             self.mc.forget_scratch_register()
             self.mc.PEXTRD_rxi(scratch, srcloc.value, 1)
@@ -413,6 +596,17 @@ class VectorAssemblerMixin(object):
     def genop_vec_expand_f(self, op, arglocs, resloc):
         srcloc, sizeloc = arglocs
         size = sizeloc.value
+        if self._use_ymm():
+            if isinstance(srcloc, ConstFloatLoc):
+                # 16 bytes, load them in both halves
+                self.mc.VBROADCASTF128(resloc, srcloc)
+            elif size == 4:
+                self.mc.VBROADCASTSS_yx(resloc.value, srcloc.value)
+            elif size == 8:
+                self.mc.VBROADCASTSD_yx(resloc.value, srcloc.value)
+            else:
+                raise AssertionError("float of size %d not supported" % (size,))
+            return
         if isinstance(srcloc, ConstFloatLoc):
             # they are aligned!
             self.mc.MOVAPD(resloc, srcloc)
@@ -434,6 +628,22 @@ class VectorAssemblerMixin(object):
             srcloc = X86_64_SCRATCH_REG
         assert not srcloc.is_xmm
         size = sizeloc.value
+        if self._use_ymm():
+            if size == 8:
+                self.mc.MOVDQ_xr(resloc.value, srcloc.value)
+                self.mc.VPBROADCASTQ_yx(resloc.value, resloc.value)
+            elif size == 4:
+                self.mc.MOVD32_xr(resloc.value, srcloc.value)
+                self.mc.VPBROADCASTD_yx(resloc.value, resloc.value)
+            elif size == 2:
+                self.mc.MOVD32_xr(resloc.value, srcloc.value)
+                self.mc.VPBROADCASTW_yx(resloc.value, resloc.value)
+            elif size == 1:
+                self.mc.MOVD32_xr(resloc.value, srcloc.value)
+                self.mc.VPBROADCASTB_yx(resloc.value, resloc.value)
+            else:
+                raise AssertionError("cannot handle size %d (int expand)" % (size,))
+            return
         if size == 1:
             self.mc.PINSRB_xri(resloc.value, srcloc.value, 0)
             self.mc.PSHUFB(resloc, heap(self.expand_byte_mask_addr))
@@ -459,6 +669,9 @@ class VectorAssemblerMixin(object):
         srcidx = srcidxloc.value
         residx = residxloc.value
         count = countloc.value
+        if self._pack_in_upper_half(residx, srcidx, count, size):
+            self._pack_ymm(resultloc, sourceloc, residx, srcidx, count, size)
+            return
         # for small data type conversion this can be quite costy
         # NOTE there might be some combinations that can be handled
         # more efficiently! e.g.
@@ -517,6 +730,9 @@ class VectorAssemblerMixin(object):
         residx = residxloc.value
         srcidx = srcidxloc.value
         size = sizeloc.value
+        if self._pack_in_upper_half(residx, srcidx, count, size):
+            self._pack_ymm(resloc, srcloc, residx, srcidx, count, size)
+            return
         if size == 4:
             si = srcidx
             ri = residx
@@ -567,21 +783,118 @@ class VectorAssemblerMixin(object):
 
     genop_vec_unpack_f = genop_vec_pack_f
 
+    def _pack_in_upper_half(self, residx, srcidx, count, size):
+        if not self._use_ymm():
+            return False
+        return (residx + count) * size > 16 or (srcidx + count) * size > 16
+
+    def _pack_ymm(self, resloc, srcloc, residx, srcidx, count, size):
+        # Some elements are in the upper half of a ymm register, which
+        # the SSE instructions cannot reach.  Move the elements one by one
+        # through the scratch register, the upper half being extracted
+        # to and inserted from the xmm scratch register.
+        assert isinstance(resloc, RegLoc)
+        assert isinstance(srcloc, RegLoc)
+        half = 16 // size
+        scratch = X86_64_SCRATCH_REG.value
+        xmm_scratch = X86_64_XMM_SCRATCH_REG.value
+        self.mc.forget_scratch_register()
+        si = srcidx
+        ri = residx
+        k = count
+        while k > 0:
+            # the element into a general purpose register
+            if srcloc.is_xmm:
+                src = srcloc.value
+                i = si
+                if si >= half:
+                    self.mc.VEXTRACTF128_xyi(xmm_scratch, src, 1)
+                    src = xmm_scratch
+                    i = si - half
+                if resloc.is_xmm:
+                    reg = scratch
+                else:
+                    reg = resloc.value
+                self._pextr(reg, src, i, size)
+            else:
+                reg = srcloc.value
+            # and from there into the result
+            if resloc.is_xmm:
+                if ri >= half:
+                    self.mc.VEXTRACTF128_xyi(xmm_scratch, resloc.value, 1)
+                    self._pinsr(xmm_scratch, reg, ri - half, size)
+                    self.mc.VINSERTF128_yyxi(resloc.value, resloc.value,
+                                             xmm_scratch, 1)
+                else:
+                    self._pinsr(resloc.value, reg, ri, size)
+            si += 1
+            ri += 1
+            k -= 1
+
+    def _pextr(self, reg, xmm, index, size):
+        if size == 8:
+            self.mc.PEXTRQ_rxi(reg, xmm, index)
+        elif size == 4:
+            self.mc.PEXTRD_rxi(reg, xmm, index)
+        elif size == 2:
+            self.mc.PEXTRW_rxi(reg, xmm, index)
+        elif size == 1:
+            self.mc.PEXTRB_rxi(reg, xmm, index)
+        else:
+            not_implemented("pack/unpack for size %d" % size)
+
+    def _pinsr(self, xmm, reg, index, size):
+        if size == 8:
+            self.mc.PINSRQ_xri(xmm, reg, index)
+        elif size == 4:
+            self.mc.PINSRD_xri(xmm, reg, index)
+        elif size == 2:
+            self.mc.PINSRW_xri(xmm, reg, index)
+        elif size == 1:
+            self.mc.PINSRB_xri(xmm, reg, index)
+        else:
+            not_implemented("pack/unpack for size %d" % size)
+
     def genop_vec_cast_float_to_singlefloat(self, op, arglocs, resloc):
-        self.mc.CVTPD2PS(resloc, arglocs[0])
+        if self._use_ymm():
+            self.mc.VCVTPD2PS_xy(resloc.value, arglocs[0].value)
+        else:
+            self.mc.CVTPD2PS(resloc, arglocs[0])
 
     def genop_vec_cast_float_to_int(self, op, arglocs, resloc):
-        self.mc.CVTPD2DQ(resloc, arglocs[0])
+        if self._use_ymm():
+            self.mc.VCVTPD2DQ_xy(resloc.value, arglocs[0].value)
+        else:
+            self.mc.CVTPD2DQ(resloc, arglocs[0])
 
     def genop_vec_cast_int_to_float(self, op, arglocs, resloc):
-        self.mc.CVTDQ2PD(resloc, arglocs[0])
+        if self._use_ymm():
+            self.mc.VCVTDQ2PD_yx(resloc.value, arglocs[0].value)
+        else:
+            self.mc.CVTDQ2PD(resloc, arglocs[0])
 
     def genop_vec_cast_singlefloat_to_float(self, op, arglocs, resloc):
-        self.mc.CVTPS2PD(resloc, arglocs[0])
+        if self._use_ymm():
+            self.mc.VCVTPS2PD_yx(resloc.value, arglocs[0].value)
+        else:
+            self.mc.CVTPS2PD(resloc, arglocs[0])
 
 class VectorRegallocMixin(object):
     _mixin_ = True
 
+    def _uses_ymm_registers(self, inputargs, operations):
+        # if vectors are kept in the 256-bit ymm registers, moving them
+        # around must copy the whole registers
+        if not self.assembler.vector_ymm:
+            return False
+        for box in inputargs:
+            if box.is_vector():
+                return True
+        for op in operations:
+            if op.is_vector():
+                return True
+        return False
+
     def _consider_vec_load(self, op):
         descr = op.getdescr()
         assert isinstance(descr, ArrayDescr)
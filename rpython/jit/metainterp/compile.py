@@ -101,12 +101,13 @@ class BridgeCompileData(CompileData):
     """
     def __init__(self, trace, runtime_boxes, resumestorage=None,
                  call_pure_results=None, enable_opts=None,
-                 inline_short_preamble=False):
+                 inline_short_preamble=False, versioning_failed=False):
         self.trace = trace
         self.runtime_boxes = runtime_boxes
         self.call_pure_results = call_pure_results
         self.enable_opts = enable_opts
         self.inline_short_preamble = inline_short_preamble
+        self.versioning_failed = versioning_failed
         self.resumestorage = resumestorage
 
     def optimize(self, metainterp_sd, jitdriver_sd, optimizations):
@@ -117,7 +118,8 @@ class BridgeCompileData(CompileData):
                                    self.call_pure_results,
                                    self.inline_short_preamble,
                                    self.box_names_memo,
-                                   self.resumestorage)
+                                   self.resumestorage,
+                                   self.versioning_failed)
 
 class UnrolledLoopData(CompileData):
     """ This represents label() ops jump with extra info that's from the
@@ -540,6 +542,8 @@ def send_loop_to_backend(greenkey, jitdriver_sd, metainterp_sd, loop, type,
     finally:
         debug_stop("jit-backend")
     metainterp_sd.profiler.end_backend()
+    if metainterp_sd.guard_stats.enabled:
+        metainterp_sd.guard_stats.register_guards(metainterp_sd, operations, n)
     if hooks is not None:
         debug_info.asminfo = asminfo
         hooks.after_compile(debug_info)
@@ -557,7 +561,9 @@ def send_loop_to_backend(greenkey, jitdriver_sd, metainterp_sd, loop, type,
                                       name=loopname)
     #
     if metainterp_sd.warmrunnerdesc is not None:    # for tests
-        metainterp_sd.warmrunnerdesc.memory_manager.keep_loop_alive(original_jitcell_token)
+        memory_manager = metainterp_sd.warmrunnerdesc.memory_manager
+        memory_manager.update_code_size(original_jitcell_token)
+        memory_manager.keep_loop_alive(original_jitcell_token)
 
 def send_bridge_to_backend(jitdriver_sd, metainterp_sd, faildescr, inputargs,
                            operations, original_loop_token, memo):
@@ -590,6 +596,10 @@ def send_bridge_to_backend(jitdriver_sd, metainterp_sd, faildescr, inputargs,
     finally:
         debug_stop("jit-backend")
     metainterp_sd.profiler.end_backend()
+    if metainterp_sd.guard_stats.enabled:
+        metainterp_sd.guard_stats.register_guards(metainterp_sd, operations,
+                                                  original_loop_token.number,
+                                                  faildescr)
     if hooks is not None:
         debug_info.asminfo = asminfo
         hooks.after_compile_bridge(debug_info)
@@ -604,6 +614,9 @@ def send_bridge_to_backend(jitdriver_sd, metainterp_sd, faildescr, inputargs,
     metainterp_sd.logger_ops.log_bridge(inputargs, operations, None, faildescr,
                                         ops_offset, memo=memo)
     #
+    if metainterp_sd.warmrunnerdesc is not None:    # for tests
+        metainterp_sd.warmrunnerdesc.memory_manager.update_code_size(
+            original_loop_token)
     #if metainterp_sd.warmrunnerdesc is not None:    # for tests
     #    metainterp_sd.warmrunnerdesc.memory_manager.keep_loop_alive(
     #        original_loop_token)
@@ -690,8 +703,11 @@ class AbstractResumeGuardDescr(ResumeDescr):
         raise NotImplementedError("abstract base class")
 
     def handle_fail(self, deadframe, metainterp_sd, jitdriver_sd):
+        if metainterp_sd.guard_stats.enabled:
+            metainterp_sd.guard_stats.count_failure(self)
         if (self.must_compile(deadframe, metainterp_sd, jitdriver_sd)
-                and not rstack.stack_almost_full()):
+                and not rstack.stack_almost_full()
+                and metainterp_sd.compile_budget.can_compile()):
             self.start_compiling()
             try:
                 self._trace_and_compile_from_bridge(deadframe, metainterp_sd,
@@ -883,6 +899,12 @@ class ResumeGuardCopiedExcDescr(ResumeGuardCopiedDescr):
 class ResumeAtPositionDescr(ResumeGuardDescr):
     pass
 
+class ResumeGuardVersionedDescr(ResumeGuardDescr):
+    # the guard that checks the condition a loop was versioned on, see
+    # OptIntBounds._optimize_guard_true_false().  A bridge from it must
+    # not jump back into the version that relies on this condition.
+    pass
+
 class CompileLoopVersionDescr(ResumeGuardDescr):
     def handle_fail(self, deadframe, metainterp_sd, jitdriver_sd):
         assert 0, "this guard must never fail"
@@ -944,6 +966,8 @@ class ResumeGuardForcedDescr(ResumeGuardDescr):
         # the virtualrefs and virtualizable have been forced by
         # handle_async_forcing() just a moment ago.
         from rpython.jit.metainterp.blackhole import resume_in_blackhole
+        if metainterp_sd.guard_stats.enabled:
+            metainterp_sd.guard_stats.count_failure(self)
         hidden_all_virtuals = metainterp_sd.cpu.get_savedata_ref(deadframe)
         obj = AllVirtuals.show(hidden_all_virtuals)
         all_virtuals = obj.cache
@@ -1032,6 +1056,7 @@ def compile_trace(metainterp, resumekey, runtime_boxes, ends_with_jump=False):
         inline_short_preamble = False
     else:
         inline_short_preamble = True
+    versioning_failed = isinstance(resumekey, ResumeGuardVersionedDescr)
     inputargs = metainterp.history.inputargs[:]
     trace = metainterp.history.trace
     jitdriver_sd = metainterp.jitdriver_sd
@@ -1048,7 +1073,8 @@ def compile_trace(metainterp, resumekey, runtime_boxes, ends_with_jump=False):
         data = BridgeCompileData(trace, runtime_boxes, resumestorage,
                                  call_pure_results=call_pure_results,
                                  enable_opts=enable_opts,
-                                 inline_short_preamble=inline_short_preamble)
+                                 inline_short_preamble=inline_short_preamble,
+                                 versioning_failed=versioning_failed)
     else:
         data = SimpleCompileData(trace, resumestorage,
                                  call_pure_results=call_pure_results,
@@ -1137,5 +1163,6 @@ def compile_tmp_callback(cpu, jitdriver_sd, greenboxes, redargtypes,
     cpu.compile_loop(inputargs, operations, jitcell_token, log=False)
 
     if memory_manager is not None:    # for tests
+        memory_manager.update_code_size(jitcell_token)
         memory_manager.keep_loop_alive(jitcell_token)
     return jitcell_token
@@ -0,0 +1,88 @@
+""" Bounds the time spent tracing and compiling, and records the pauses
+"""
+
+import time
+from rpython.rlib.debug import debug_print, debug_start, debug_stop
+
+#
+# A "pause" is the time between the start of tracing, either a loop or a
+# bridge, and the moment we go back to running the program, with the
+# optimizer and the backend in the middle.  The pauses are recorded in a
+# histogram: the bucket 'i' counts the pauses shorter than 2**i
+# milliseconds, and the last bucket all the longer ones.
+#
+# If 'budget' is set, the sum of the pauses in each 'window' is checked
+# before starting to trace a new loop or bridge.  When the budget is used
+# up, the compilation is deferred: the interpreter goes on and retries a
+# bit later, maybe in the next window.
+#
+
+NUM_BUCKETS = 12
+
+def get_bucket(pause):
+    limit = 0.001
+    i = 0
+    while i < NUM_BUCKETS - 1 and pause >= limit:
+        limit *= 2.0
+        i += 1
+    return i
+
+
+class CompileBudget(object):
+    timer = staticmethod(time.time)
+
+    def __init__(self):
+        self.budget = 0.0          # in seconds, 0.0 = no limit
+        self.window = 1.0
+        self.window_start = 0.0
+        self.spent = 0.0
+        self.depth = 0
+        self.pause_start = 0.0
+        # statistics
+        self.histogram = [0] * NUM_BUCKETS
+        self.total_time = 0.0
+        self.deferred = 0
+
+    def set_budget(self, budget_ms):
+        if budget_ms < 0:
+            budget_ms = 0
+        self.budget = budget_ms / 1000.0
+
+    def set_window(self, window_ms):
+        if window_ms <= 0:
+            window_ms = 1
+        self.window = window_ms / 1000.0
+
+    def can_compile(self):
+        if self.budget <= 0.0 or self.depth > 0:
+            return True
+        now = self.timer()
+        # time.time() can go backwards when the system clock is set: start
+        # a new window then, instead of waiting for the old one to end
+        if now - self.window_start >= self.window or now < self.window_start:
+            self.window_start = now
+            self.spent = 0.0
+        if self.spent < self.budget:
+            return True
+        self.deferred += 1
+        debug_start("jit-compile-deferred")
+        debug_print("Spent in this window:", self.spent)
+        debug_stop("jit-compile-deferred")
+        return False
+
+    def start_pause(self):
+        # tracing can recursively start tracing something else: only the
+        # outermost one counts
+        if self.depth == 0:
+            self.pause_start = self.timer()
+        self.depth += 1
+
+    def end_pause(self):
+        self.depth -= 1
+        if self.depth == 0:
+            pause = self.timer() - self.pause_start
+            if pause < 0.0:
+                pause = 0.0
+            self.spent += pause
+            self.total_time += pause
+            self.histogram[get_bucket(pause)] += 1
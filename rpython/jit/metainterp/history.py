@@ -114,6 +114,9 @@ class AbstractDescr(AbstractValue):
     def get_vinfo(self):
         raise NotImplementedError
 
+    def is_list_length_field(self):
+        return False
+
 DONT_CHANGE = AbstractDescr()
 
 class AbstractFailDescr(AbstractDescr):
@@ -436,6 +439,7 @@ class JitCellToken(AbstractDescr):
     # and more data specified by the backend when the loop is compiled
     number = -1
     generation = r_int64(0)
+    code_size = 0     # as last counted by the memory manager
     # one purpose of LoopToken is to keep alive the CompiledLoopToken
     # returned by the backend.  When the LoopToken goes away, the
     # CompiledLoopToken has its __del__ called, which frees the assembler
@@ -492,6 +496,9 @@ class TargetToken(AbstractDescr):
 
         self.virtual_state = None
         self.short_preamble = None
+        # True if the loop at this label relies on a condition checked by
+        # a versioned guard of its preamble
+        self.versioned = False
 
     def repr_of_descr(self):
         return 'TargetToken(%d)' % compute_unique_id(self)
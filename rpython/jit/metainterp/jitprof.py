@@ -2,11 +2,16 @@
 """ A small helper module for profiling JIT
 """
 
-import time
+import time, weakref
 from rpython.rlib.debug import debug_print, debug_start, debug_stop
 from rpython.rlib.debug import have_debug_prints
 from rpython.jit.metainterp.jitexc import JitException
 from rpython.rlib.jit import Counters
+from rpython.rlib.rweakref import RWeakKeyDictionary
+from rpython.rtyper.annlowlevel import cast_instance_to_gcref, llstr
+from rpython.rtyper.lltypesystem import lltype
+from rpython.jit.metainterp.history import AbstractFailDescr
+from rpython.jit.metainterp.resoperation import rop
 
 
 JITPROF_LINES = Counters.ncounters + 1 + 1
@@ -185,3 +190,91 @@ class Profiler(BaseProfiler):
 
 class BrokenProfilerData(JitException):
     pass
+
+
+class GuardInfo(object):
+    """A compiled guard, with the last debug_merge_point before it, which
+    gives its position in the source program."""
+
+    def __init__(self, descr, number, opname, jitdriver_sd,
+                 debug_merge_point):
+        self.descr_wref = weakref.ref(descr)
+        self.number = number           # of the loop
+        self.opname = opname
+        self.jitdriver_sd = jitdriver_sd
+        self.debug_merge_point = debug_merge_point    # None if unknown
+        self.failures = 0
+
+class GuardStats(object):
+    """If enabled, counts how many times each guard compiled since then
+    fails.  The descrs are only weakly referenced, so the loops can still
+    be freed, and then the GuardInfos of their guards are dropped too."""
+
+    MIN_PRUNE_LENGTH = 1000
+
+    def __init__(self):
+        self.enabled = False
+        # True if set_debug() was on already before we needed it
+        self.keep_debug = False
+        self.guards = []
+        self.infos = RWeakKeyDictionary(AbstractFailDescr, GuardInfo)
+        self.prune_length = self.MIN_PRUNE_LENGTH
+
+    def register_guards(self, metainterp_sd, operations, number,
+                        faildescr=None):
+        jitdriver_sd = None
+        debug_merge_point = None
+        if faildescr is not None:
+            # a bridge starts at the position of its guard
+            parent = self.infos.get(faildescr)
+            if parent is not None:
+                jitdriver_sd = parent.jitdriver_sd
+                debug_merge_point = parent.debug_merge_point
+        for op in operations:
+            if op.getopnum() == rop.DEBUG_MERGE_POINT:
+                jd_index = op.getarg(0).getint()
+                jitdriver_sd = metainterp_sd.jitdrivers_sd[jd_index]
+                debug_merge_point = op
+            elif op.is_guard():
+                descr = op.getdescr()
+                if not isinstance(descr, AbstractFailDescr):
+                    continue
+                info = GuardInfo(descr, number, op.getopname(), jitdriver_sd,
+                                 debug_merge_point)
+                self.guards.append(info)
+                self.infos.set(descr, info)
+        if len(self.guards) > self.prune_length:
+            self.remove_dead_guards()
+            self.prune_length = max(2 * len(self.guards),
+                                    self.MIN_PRUNE_LENGTH)
+
+    def remove_dead_guards(self):
+        self.guards = [info for info in self.guards
+                       if info.descr_wref() is not None]
+
+    def count_failure(self, descr):
+        info = self.infos.get(descr)
+        if info is not None:
+            info.failures += 1
+
+    def get_all_guard_stats(self):
+        """Returns an instance of GUARD_STATS_CONTAINER from rlib.jit_hooks,
+        for the guards that failed at least once."""
+        from rpython.rlib.jit_hooks import GUARD_STATS_CONTAINER
+        self.remove_dead_guards()
+        failed = [info for info in self.guards if info.failures > 0]
+        l = lltype.malloc(GUARD_STATS_CONTAINER, len(failed))
+        for i in range(len(failed)):
+            info = failed[i]
+            l[i].number = info.number
+            l[i].opname = llstr(info.opname)
+            l[i].failures = info.failures
+            op = info.debug_merge_point
+            if op is not None:
+                jitdriver_sd = info.jitdriver_sd
+                greenkey = op.getarglist()[3:]
+                location = jitdriver_sd.warmstate.get_location_str(greenkey)
+                l[i].jitdriver_name = llstr(jitdriver_sd.jitdriver.name)
+                l[i].location = llstr(location)
+                l[i].debug_merge_point = cast_instance_to_gcref(op)
+        return l
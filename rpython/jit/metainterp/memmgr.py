@@ -1,6 +1,7 @@
 import math
 from rpython.rlib.rarithmetic import r_int64
 from rpython.rlib.debug import debug_start, debug_print, debug_stop
+from rpython.rlib.listsort import make_timsort_class
 from rpython.rlib.objectmodel import we_are_translated
 
 #
@@ -19,6 +20,27 @@ from rpython.rlib.objectmodel import we_are_translated
 # 'generation' field is much smaller than the current generation, and
 # removed from the set.
 #
+# Independently, if 'max_code_size' is set, the total size of the machine
+# code of the alive loops (including their bridges) is checked after each
+# new loop or bridge.  If it is above the budget, the loops that were
+# least recently entered, i.e. that have the smallest 'generation', are
+# removed from 'alive_loops' until the size is 3/4 of the budget.  The
+# total is kept up to date as loops are compiled, added and removed; the
+# size counted for each loop is in its 'code_size' field.  Entry counts
+# are not tracked: loops are also entered by jumps and calls from other
+# machine code, which do not go through the memory manager.
+#
+
+def get_code_size(looptoken):
+    "Size of the machine code of this loop and of its bridges."
+    clt = looptoken.compiled_loop_token
+    size = 0
+    if clt is not None and clt.asmmemmgr_blocks is not None:
+        for rawstart, rawstop in clt.asmmemmgr_blocks:
+            size += rawstop - rawstart
+    return size
+
+LoopAgeSort = make_timsort_class(lt=lambda a, b: a.generation < b.generation)
 
 class MemoryManager(object):
 
@@ -38,6 +60,11 @@ class MemoryManager(object):
         self.current_generation = r_int64(1)
         self.next_check = r_int64(-1)
         self.alive_loops = {}
+        self.max_code_size = 0
+        self.total_code_size = 0
+        # statistics
+        self.evicted_loops = 0
+        self.evicted_code_size = 0
 
     def set_max_age(self, max_age, check_frequency=0):
         if max_age <= 0:
@@ -49,16 +76,40 @@ class MemoryManager(object):
             self.check_frequency = check_frequency
             self.next_check = self.current_generation + 1
 
+    def set_max_code_size(self, max_code_size):
+        if max_code_size < 0:
+            max_code_size = 0
+        self.max_code_size = max_code_size
+
     def next_generation(self):
         self.current_generation += 1
         if self.current_generation == self.next_check:
             self._kill_old_loops_now()
             self.next_check = self.current_generation + self.check_frequency
+        if 0 < self.max_code_size < self.total_code_size:
+            self._evict_loops_now()
+
+    def get_total_code_size(self):
+        return self.total_code_size
+
+    def update_code_size(self, looptoken):
+        """Called after machine code was added to the loop, i.e. after
+        the loop itself or one of its bridges was compiled."""
+        size = get_code_size(looptoken)
+        if looptoken in self.alive_loops:
+            self.total_code_size += size - looptoken.code_size
+        looptoken.code_size = size
 
     def keep_loop_alive(self, looptoken):
         if looptoken.generation != self.current_generation:
             looptoken.generation = self.current_generation
-            self.alive_loops[looptoken] = None
+            if looptoken not in self.alive_loops:
+                self.alive_loops[looptoken] = None
+                self.total_code_size += looptoken.code_size
+
+    def _forget_loop(self, looptoken):
+        del self.alive_loops[looptoken]
+        self.total_code_size -= looptoken.code_size
 
     def _kill_old_loops_now(self):
         debug_start("jit-mem-collect")
@@ -70,7 +121,7 @@ class MemoryManager(object):
         for looptoken in self.alive_loops.keys():
             if (0 <= looptoken.generation < max_generation or
                 looptoken.invalidated):
-                del self.alive_loops[looptoken]
+                self._forget_loop(looptoken)
         newtotal = len(self.alive_loops)
         debug_print("Loop tokens freed: ", oldtotal - newtotal)
         debug_print("Loop tokens left:  ", newtotal)
@@ -82,8 +133,30 @@ class MemoryManager(object):
             rgc.collect(); rgc.collect(); rgc.collect()
         debug_stop("jit-mem-collect")
 
+    def _evict_loops_now(self):
+        debug_start("jit-mem-evict")
+        debug_print("Code size before:", self.total_code_size)
+        loops = self.alive_loops.keys()
+        LoopAgeSort(loops).sort()
+        target = self.max_code_size - self.max_code_size // 4
+        count = 0
+        for looptoken in loops:
+            if self.total_code_size <= target:
+                break
+            # don't evict the loop that was just compiled or entered
+            if looptoken.generation >= self.current_generation - 1:
+                break
+            self._forget_loop(looptoken)
+            count += 1
+            self.evicted_code_size += looptoken.code_size
+        self.evicted_loops += count
+        debug_print("Loop tokens evicted:", count)
+        debug_print("Code size after:", self.total_code_size)
+        debug_stop("jit-mem-evict")
+
     def release_all_loops(self):
         debug_start("jit-mem-releaseall")
         debug_print("Loop tokens cleared:", len(self.alive_loops))
         self.alive_loops.clear()
+        self.total_code_size = 0
         debug_stop("jit-mem-releaseall")
@@ -1,4 +1,5 @@
 import sys
+from rpython.jit.metainterp import compile
 from rpython.jit.metainterp.history import ConstInt
 from rpython.jit.metainterp.optimize import InvalidLoop
 from rpython.jit.metainterp.optimizeopt.intutils import IntBound
@@ -7,7 +8,7 @@ from rpython.jit.metainterp.optimizeopt.optimizer import (Optimization, CONST_1,
 from rpython.jit.metainterp.optimizeopt.util import (
     make_dispatcher_method, have_dispatcher_method, get_box_replacement)
 from .info import getptrinfo
-from rpython.jit.metainterp.resoperation import rop
+from rpython.jit.metainterp.resoperation import rop, ResOperation
 from rpython.jit.metainterp.optimizeopt import vstring
 from rpython.jit.codewriter.effectinfo import EffectInfo
 from rpython.rlib.rarithmetic import intmask
@@ -31,6 +32,16 @@ class OptIntBounds(Optimization):
     """Keeps track of the bounds placed on integers by guards and remove
        redundant guards"""
 
+    def setup(self):
+        # maps a box 'x' to the list of non-constant boxes 'a' for which
+        # 'x < a' is known, for the loop versioning done by _known_lt()
+        self.known_lt_boxes = {}
+        # the guard emitted by _optimize_guard_true_false() instead of a
+        # bounds check, and the comparison that it made redundant
+        self.versioned_guard = None
+        self.versioned_cmp = None
+        self.versioned_result = 0
+
     def propagate_forward(self, op):
         return dispatch_opt(self, op)
 
@@ -50,10 +61,130 @@ class OptIntBounds(Optimization):
         if op.getarg(0).type == 'i':
             self.propagate_bounds_backward(op.getarg(0))
 
-    postprocess_GUARD_TRUE = _postprocess_guard_true_false_value
     postprocess_GUARD_FALSE = _postprocess_guard_true_false_value
     postprocess_GUARD_VALUE = _postprocess_guard_true_false_value
 
+    def postprocess_GUARD_TRUE(self, op):
+        self._postprocess_guard_true_false_value(op)
+        if op is self.versioned_guard:
+            self._postprocess_versioned_guard(op)
+
+    def optimize_GUARD_TRUE(self, op):
+        return self._optimize_guard_true_false(op, rop.INT_LT, rop.INT_GT, 1)
+
+    def optimize_GUARD_FALSE(self, op):
+        return self._optimize_guard_true_false(op, rop.INT_GE, rop.INT_LE, 0)
+
+    def _optimize_guard_true_false(self, op, opnum_lt, opnum_gt, result):
+        # Loop versioning.  In the preamble, a bounds check 'x < b', where
+        # 'b' is the length of an array or a list, after an earlier guard
+        # already checked 'x < a' is replaced with a guard checking
+        # 'a <= b'.  This is the usual 'i < n' followed by the bounds
+        # check 'i < len(lst)'.  The guard resumes before the jump that
+        # depends on the comparison, so checking a stronger condition is
+        # fine.  The 'int_le(a, b)' ends up in the short preamble if 'a'
+        # and 'b' can be produced there, and then the peeled loop removes
+        # its own check of 'x < b', see _known_lt().  If the new guard
+        # fails, its bridge retraces the loop without the versioning and
+        # doesn't jump back to this version, see ResumeGuardVersionedDescr.
+        if not self.optimizer.in_preamble:
+            return self.emit(op)
+        cmp = get_box_replacement(op.getarg(0))
+        if cmp is not self.last_emitted_operation:
+            return self.emit(op)
+        if cmp.getopnum() == opnum_lt:
+            x = get_box_replacement(cmp.getarg(0))
+            b = get_box_replacement(cmp.getarg(1))
+        elif cmp.getopnum() == opnum_gt:
+            x = get_box_replacement(cmp.getarg(1))
+            b = get_box_replacement(cmp.getarg(0))
+        else:
+            return self.emit(op)
+        lst = self.known_lt_boxes.get(x, None)
+        if lst is None or not self._is_length(b):
+            return self.emit(op)
+        for a in lst:
+            a = get_box_replacement(a)
+            if a is b or a.is_constant():
+                continue
+            if self.getintbound(a).known_gt(self.getintbound(b)):
+                continue
+            le = ResOperation(rop.INT_LE, [a, b])
+            self.optimizer.send_extra_operation(le)
+            le = get_box_replacement(le)
+            if le.is_constant():
+                continue
+            # 'cmp' is only known once the new guard passed, see
+            # _postprocess_versioned_guard().  Before, it may be stored in
+            # the resume data of the guard, with its real value.
+            descr = compile.ResumeGuardVersionedDescr()
+            newop = op.copy_and_change(rop.GUARD_TRUE, args=[le], descr=descr)
+            self.optimizer.versioned = True
+            self.versioned_guard = newop
+            self.versioned_cmp = cmp
+            self.versioned_result = result
+            return self.emit(newop)
+        return self.emit(op)
+
+    def _postprocess_versioned_guard(self, op):
+        cmp = self.versioned_cmp
+        self.versioned_guard = None
+        self.versioned_cmp = None
+        self._remove_dead_comparison(cmp)
+        self.make_constant_int(cmp, self.versioned_result)
+        self.propagate_bounds_backward(cmp)
+
+    def _remove_dead_comparison(self, cmp):
+        # the comparison replaced by the versioned guard is emitted just
+        # before it; remove it unless the guard needs it in its resume data
+        newops = self.optimizer._newoperations
+        i = len(newops) - 1
+        while i >= 0 and newops[i] is not cmp:
+            i -= 1
+        if i < 0:
+            return
+        for j in range(i + 1, len(newops)):
+            op = newops[j]
+            if cmp in op.getarglist():
+                return
+            if rop.is_guard(op.opnum) and cmp in op.getfailargs():
+                return
+        del newops[i]
+        del self.optimizer._emittedoperations[cmp]
+
+    def _is_length(self, box):
+        # only bounds checks are versioned: the length of an array, or
+        # the length field of a resizable list
+        op = self.optimizer.as_operation(box)
+        if op is None:
+            return False
+        if op.getopnum() == rop.ARRAYLEN_GC:
+            return True
+        return (op.getopnum() == rop.GETFIELD_GC_I and
+                op.getdescr().is_list_length_field())
+
+    def _known_lt(self, box1, box2):
+        """ Check if 'box1 < box2' follows from an earlier 'box1 < a' and
+        'a <= box2'.  The latter is known either from the bounds or from
+        an 'int_le(a, box2)' that the preamble checked, see
+        _optimize_guard_true_false().  If so, the bounds are updated like
+        the removed check would have done.
+        """
+        lst = self.known_lt_boxes.get(box1, None)
+        if lst is None or box2.is_constant():
+            return False
+        b2 = self.getintbound(box2)
+        for a in lst:
+            a = get_box_replacement(a)
+            if not (a is box2 or self.getintbound(a).known_le(b2)):
+                oldop = self.get_pure_result(
+                    ResOperation(rop.INT_LE, [a, box2]))
+                if oldop is None or not self.getintbound(oldop).equal(1):
+                    continue
+            self.make_int_lt(box1, box2)
+            return True
+        return False
+
     def optimize_INT_OR_or_XOR(self, op):
         v1 = get_box_replacement(op.getarg(0))
         v2 = get_box_replacement(op.getarg(1))
@@ -302,7 +433,7 @@ class OptIntBounds(Optimization):
         arg2 = get_box_replacement(op.getarg(1))
         b1 = self.getintbound(arg1)
         b2 = self.getintbound(arg2)
-        if b1.known_lt(b2):
+        if b1.known_lt(b2) or self._known_lt(arg1, arg2):
             self.make_constant_int(op, 1)
         elif b1.known_ge(b2) or arg1 is arg2:
             self.make_constant_int(op, 0)
@@ -314,7 +445,7 @@ class OptIntBounds(Optimization):
         arg2 = get_box_replacement(op.getarg(1))
         b1 = self.getintbound(arg1)
         b2 = self.getintbound(arg2)
-        if b1.known_gt(b2):
+        if b1.known_gt(b2) or self._known_lt(arg2, arg1):
             self.make_constant_int(op, 1)
         elif b1.known_le(b2) or arg1 is arg2:
             self.make_constant_int(op, 0)
@@ -328,7 +459,7 @@ class OptIntBounds(Optimization):
         b2 = self.getintbound(arg2)
         if b1.known_le(b2) or arg1 is arg2:
             self.make_constant_int(op, 1)
-        elif b1.known_gt(b2):
+        elif b1.known_gt(b2) or self._known_lt(arg2, arg1):
             self.make_constant_int(op, 0)
         else:
             return self.emit(op)
@@ -340,7 +471,7 @@ class OptIntBounds(Optimization):
         b2 = self.getintbound(arg2)
         if b1.known_ge(b2) or arg1 is arg2:
             self.make_constant_int(op, 1)
-        elif b1.known_lt(b2):
+        elif b1.known_lt(b2) or self._known_lt(arg1, arg2):
             self.make_constant_int(op, 0)
         else:
             return self.emit(op)
@@ -545,6 +676,14 @@ class OptIntBounds(Optimization):
             self.propagate_bounds_backward(box1)
         if b2.make_gt(b1):
             self.propagate_bounds_backward(box2)
+        box1 = get_box_replacement(box1)
+        box2 = get_box_replacement(box2)
+        if not box1.is_constant() and not box2.is_constant():
+            lst = self.known_lt_boxes.get(box1, None)
+            if lst is None:
+                self.known_lt_boxes[box1] = [box2]
+            elif box2 not in lst:
+                lst.append(box2)
 
     def make_int_le(self, box1, box2):
         b1 = self.getintbound(box1)
@@ -239,6 +239,9 @@ class Optimizer(Optimization):
         self.optrewrite = None
         self.optearlyforce = None
         self.optunroll = None
+        self.in_preamble = False
+        self.versioned = False          # a guard was versioned, see intbounds
+        self.versioning_failed = False  # don't jump to versioned loops
         self._really_emitted_operation = None
 
         self._last_guard_op = None
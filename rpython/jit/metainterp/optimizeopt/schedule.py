@@ -978,7 +978,9 @@ class Pair(Pack):
                    self.right is other.right
 
 class AccumPack(Pack):
-    SUPPORTED = staticmethod(dict_to_switch({ rop.INT_ADD: '+', }))
+    SUPPORTED = staticmethod(dict_to_switch({ rop.INT_ADD: '+',
+                                              rop.FLOAT_ADD: '+',
+                                              rop.FLOAT_MUL: '*', }))
 
     def __init__(self, nodes, operator, position):
         Pack.__init__(self, nodes)
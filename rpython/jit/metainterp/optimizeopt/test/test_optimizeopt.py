@@ -4733,6 +4733,128 @@ class TestOptimizeOpt(BaseTestWithUnroll):
         """
         self.optimize_loop(ops, expected, preamble)
 
+    def test_bound_lt_versioning(self):
+        ops = """
+        [i0, i1, p0]
+        i2 = int_lt(i0, i1)
+        guard_true(i2) []
+        i3 = arraylen_gc(p0, descr=arraydescr)
+        i4 = int_lt(i0, i3)
+        guard_true(i4) []
+        i5 = int_add(i0, 1)
+        jump(i5, i1, p0)
+        """
+        preamble = """
+        [i0, i1, p0]
+        i2 = int_lt(i0, i1)
+        guard_true(i2) []
+        i3 = arraylen_gc(p0, descr=arraydescr)
+        i6 = int_le(i1, i3)
+        guard_true(i6) []
+        i5 = int_add(i0, 1)
+        jump(i5, i1, p0)
+        """
+        # the bounds check 'i0 < i3' is replaced with 'i1 <= i3' in the
+        # preamble; the loop only needs 'i0 < i1', and the short preamble
+        # checks 'i1 <= i3' again for every jump to the loop
+        expected = """
+        [i0, i1, p0]
+        i2 = int_lt(i0, i1)
+        guard_true(i2) []
+        i5 = int_add(i0, 1)
+        jump(i5, i1, p0)
+        """
+        self.optimize_loop(ops, expected, preamble)
+
+    def test_bound_ge_versioning_not_invariant(self):
+        ops = """
+        [i0, i1, p0]
+        i2 = int_ge(i0, i1)
+        guard_false(i2) []
+        i3 = arraylen_gc(p0, descr=arraydescr)
+        i4 = int_ge(i0, i3)
+        guard_false(i4) []
+        i5 = int_add(i0, 1)
+        i6 = int_sub(i1, 1)
+        jump(i5, i6, p0)
+        """
+        preamble = """
+        [i0, i1, p0]
+        i2 = int_ge(i0, i1)
+        guard_false(i2) []
+        i3 = arraylen_gc(p0, descr=arraydescr)
+        i7 = int_le(i1, i3)
+        guard_true(i7) []
+        i5 = int_add(i0, 1)
+        i6 = int_sub(i1, 1)
+        jump(i5, i6, p0, i3)
+        """
+        # 'i1' changes in the loop, so 'i1 <= i3' from the preamble is of
+        # no use there and the bounds check stays
+        expected = """
+        [i0, i1, p0, i3]
+        i2 = int_ge(i0, i1)
+        guard_false(i2) []
+        i4 = int_ge(i0, i3)
+        guard_false(i4) []
+        i5 = int_add(i0, 1)
+        i6 = int_sub(i1, 1)
+        jump(i5, i6, p0, i3)
+        """
+        self.optimize_loop(ops, expected, preamble)
+
+    def test_bound_lt_versioning_comparison_in_failargs(self):
+        ops = """
+        [i0, i1, p0]
+        i2 = int_lt(i0, i1)
+        guard_true(i2) []
+        escape_n(i0)
+        i3 = arraylen_gc(p0, descr=arraydescr)
+        i4 = int_lt(i0, i3)
+        guard_true(i4) [i0, i4]
+        i5 = int_add(i0, 1)
+        jump(i5, i1, p0)
+        """
+        # the escape_n() prevents the guard from sharing the resume data
+        # of the first guard.  When 'i1 <= i3' fails, 'i0 < i3' may be true or false, so the
+        # guard must resume with the real value of i4
+        preamble = """
+        [i0, i1, p0]
+        i2 = int_lt(i0, i1)
+        guard_true(i2) []
+        escape_n(i0)
+        i3 = arraylen_gc(p0, descr=arraydescr)
+        i4 = int_lt(i0, i3)
+        i6 = int_le(i1, i3)
+        guard_true(i6) [i0, i4]
+        i5 = int_add(i0, 1)
+        jump(i5, i1, p0)
+        """
+        expected = """
+        [i0, i1, p0]
+        i2 = int_lt(i0, i1)
+        guard_true(i2) []
+        escape_n(i0)
+        i5 = int_add(i0, 1)
+        jump(i5, i1, p0)
+        """
+        self.optimize_loop(ops, expected, preamble)
+
+    def test_bound_lt_no_versioning_if_not_a_length(self):
+        ops = """
+        [i0, i1, i3]
+        i2 = int_lt(i0, i1)
+        guard_true(i2) []
+        i4 = int_lt(i0, i3)
+        guard_true(i4) []
+        i5 = int_add(i0, 1)
+        jump(i5, i1, i3)
+        """
+        # 'i0 < i3' is not a bounds check; 'i1 <= i3' might well be false
+        # and then the preamble would fail on every entry
+        expected = ops
+        self.optimize_loop(ops, expected, ops)
+
     def test_bound_arraylen(self):
         ops = """
         [i0, p0]
@@ -16,7 +16,7 @@ from rpython.jit.codewriter.effectinfo import EffectInfo, compute_bitstrings
 from rpython.jit.tool.oparser import (
     OpParser, pure_parse, convert_loop_to_trace)
 from rpython.jit.metainterp.quasiimmut import QuasiImmutDescr
-from rpython.jit.metainterp import compile
+from rpython.jit.metainterp import compile, resume
 from rpython.jit.metainterp.jitprof import EmptyProfiler
 from rpython.jit.metainterp.counter import DeterministicJitCounter
 from rpython.config.translationoption import get_combined_translation_config
@@ -482,6 +482,7 @@ class FakeMetaInterpStaticData(object):
     def __init__(self, cpu):
         self.cpu = cpu
         self.profiler = EmptyProfiler()
+        self.resume_stats = resume.ResumeDataStats()
         self.options = Fake()
         self.globaldata = Fake()
         self.config = get_combined_translation_config(translating=True)
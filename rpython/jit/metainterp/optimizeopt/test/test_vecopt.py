@@ -28,6 +28,7 @@ class FakePackSet(PackSet):
     def __init__(self, packs):
         self.packs = packs
         self.vec_reg_size = 16
+        self.reassociate = False
 
 class FakeLoopInfo(LoopVersionInfo):
     def __init__(self, loop):
@@ -68,6 +69,7 @@ ARCH_VEC_REG_SIZE = 16
 class FakeWarmState(object):
     vec_all = False
     vec_cost = 0
+    vec_reassoc = False
 
 
 class VecTestHelper(DependencyBaseTest):
@@ -75,6 +77,7 @@ class VecTestHelper(DependencyBaseTest):
     enable_opts = "intbounds:rewrite:virtualize:string:earlyforce:pure:heap"
 
     jitdriver_sd = FakeJitDriverStaticData()
+    reassociate = False
 
     def assert_vectorize(self, loop, expected_loop, call_pure_results=None):
         jump = ResOperation(rop.JUMP, loop.jump.getarglist(), loop.jump.getdescr())
@@ -92,7 +95,8 @@ class VecTestHelper(DependencyBaseTest):
 
     def vectoroptimizer(self, loop):
         jitdriver_sd = FakeJitDriverStaticData()
-        opt = VectorizingOptimizer(self.metainterp_sd, jitdriver_sd, 0)
+        opt = VectorizingOptimizer(self.metainterp_sd, jitdriver_sd, 0,
+                                   self.reassociate)
         opt.orig_label_args = loop.label.getarglist()[:]
         return opt
 
@@ -1271,6 +1275,34 @@ class TestVectorize(VecTestHelper):
         vopt = self.vectorize(trace)
         self.assert_equal(trace, trace_opt)
 
+    @pytest.mark.parametrize('opname,init', [('float_add', 'vec_float_xor'),
+                                             ('float_mul', 'vec_expand_f')])
+    def test_float_reduction(self, opname, init):
+        trace = """
+        [p0, i0, f0]
+        f1 = raw_load_f(p0, i0, descr=floatarraydescr)
+        f2 = {opname}(f0, f1)
+        i1 = int_add(i0, 8)
+        i2 = int_lt(i1, 100)
+        guard_true(i2) [p0, i0, f2]
+        jump(p0, i1, f2)
+        """.format(opname=opname)
+        # reordering the float operations changes the result,
+        # the loop is only vectorized if the user allows it
+        with pytest.raises(NotAProfitableLoop):
+            self.vectorize(self.parse_loop(trace))
+        loop = self.parse_loop(trace)
+        self.reassociate = True
+        try:
+            self.vectorize(loop)
+        finally:
+            del self.reassociate
+        opnames = [op.getopname() for op in loop.operations]
+        assert init in opnames
+        assert 'vec_pack_f' in opnames
+        assert 'vec_' + opname in opnames
+        assert opname not in opnames
+
     def test_sum_int16_prevent(self):
         trace = self.parse_loop("""
         [i0, p1, i2, p3, i4, i5, i6]
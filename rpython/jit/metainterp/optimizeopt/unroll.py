@@ -99,12 +99,14 @@ class UnrollOptimizer(Optimizer):
             op.set_forwarded(preamble_info._const)
 
     def optimize_preamble(self, trace, runtime_boxes, call_pure_results, memo):
+        self.in_preamble = True
         info, newops = self.propagate_all_forward(
             trace.get_iter(), call_pure_results, flush=False)
         exported_state = self.optunroll.export_state(info.jump_op.getarglist(),
                                            info.inputargs,
                                            runtime_boxes, memo)
         exported_state.quasi_immutable_deps = info.quasi_immutable_deps
+        exported_state.versioned = self.versioned
         # we need to absolutely make sure that we've cleaned up all
         # the optimization info
         self._clean_optimization_info(self._newoperations)
@@ -112,6 +114,7 @@ class UnrollOptimizer(Optimizer):
 
     def optimize_peeled_loop(self, trace, celltoken, state, call_pure_results):
         trace = trace.get_iter()
+        self.versioning_failed = state.versioning_failed
         try:
             label_args = self.optunroll.import_state(trace.inputargs, state)
         except VirtualStatesCantMatch:
@@ -147,6 +150,7 @@ class UnrollOptimizer(Optimizer):
         extra_same_as = self.optunroll.short_preamble_producer.extra_same_as[:]
         target_token = self.optunroll.finalize_short_preamble(label_op,
                                                     state.virtual_state)
+        target_token.versioned = state.versioned
         label_op.setdescr(target_token)
 
         try:
@@ -182,8 +186,10 @@ class UnrollOptimizer(Optimizer):
                 self._newoperations)
 
     def optimize_bridge(self, trace, runtime_boxes, call_pure_results,
-                        inline_short_preamble, box_names_memo, resumestorage):
+                        inline_short_preamble, box_names_memo, resumestorage,
+                        versioning_failed=False):
         from rpython.jit.metainterp.optimizeopt.bridgeopt import deserialize_optimizer_knowledge
+        self.versioning_failed = versioning_failed
         frontend_inputargs = trace.inputargs
         trace = trace.get_iter()
         self.optunroll._check_no_forwarding([trace.inputargs])
@@ -214,6 +220,10 @@ class UnrollOptimizer(Optimizer):
             return info, self._newoperations[:]
         warmrunnerdescr = self.metainterp_sd.warmrunnerdesc
         limit = warmrunnerdescr.memory_manager.retrace_limit
+        if versioning_failed:
+            # the condition that the loop was versioned on doesn't hold
+            # here: one more retrace compiles the version without it
+            limit += 1
         if cell_token.retraced_count < limit:
             cell_token.retraced_count += 1
             debug_print('Retracing (%d/%d)' % (cell_token.retraced_count, limit))
@@ -233,6 +243,7 @@ class UnrollOptimizer(Optimizer):
                                            info.inputargs, runtime_boxes,
                                            box_names_memo)
         exported_state.quasi_immutable_deps = self.quasi_immutable_deps
+        exported_state.versioning_failed = versioning_failed
         self._clean_optimization_info(self._newoperations)
         return exported_state, self._newoperations
 
@@ -327,6 +338,8 @@ class OptUnroll(Optimization):
             target_virtual_state = target_token.virtual_state
             if target_virtual_state is None:
                 continue
+            if target_token.versioned and self.optimizer.versioning_failed:
+                continue
             try:
                 extra_guards = target_virtual_state.generate_guards(
                     virtual_state, args, runtime_boxes, self.optimizer,
@@ -533,7 +546,13 @@ class ExportedState(LoopInfo):
     * quasi_immutable_deps - for tracking quasi immutables
     * runtime_boxes - runtime values for boxes, necessary when generating
                       guards to jump to
+    * versioned - the preamble versioned a guard, see intbounds
+    * versioning_failed - the bridge starts at a failing versioned guard,
+                          so the retraced loop must not jump to a version
+                          relying on it
     """
+    versioned = False
+    versioning_failed = False
 
     def __init__(self, end_args, next_iteration_args, virtual_state,
                  exported_infos, short_boxes, renamed_inputargs,
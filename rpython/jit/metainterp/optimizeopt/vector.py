@@ -10,6 +10,7 @@ import time
 
 from rpython.jit.metainterp.jitexc import NotAVectorizeableLoop, NotAProfitableLoop
 from rpython.jit.metainterp.compile import (CompileLoopVersionDescr, ResumeDescr)
+from rpython.jit.codewriter import longlong
 from rpython.jit.metainterp.history import (INT, FLOAT, VECTOR, ConstInt, ConstFloat,
         TargetToken, JitCellToken, AbstractFailDescr)
 from rpython.jit.metainterp.optimizeopt.optimizer import Optimizer, Optimization
@@ -138,7 +139,8 @@ def optimize_vector(trace, metainterp_sd, jitdriver_sd, warmstate,
         metainterp_sd.profiler.count(Counters.OPT_VECTORIZE_TRY)
         #
         start = time.clock()
-        opt = VectorizingOptimizer(metainterp_sd, jitdriver_sd, warmstate.vec_cost)
+        opt = VectorizingOptimizer(metainterp_sd, jitdriver_sd,
+                                   warmstate.vec_cost, warmstate.vec_reassoc)
         oplist = opt.run_optimization(metainterp_sd, info, loop, jitcell_token, user_code)
         end = time.clock()
         #
@@ -206,11 +208,13 @@ def user_loop_bail_fast_path(loop, warmstate):
 class VectorizingOptimizer(Optimizer):
     """ Try to unroll the loop and find instructions to group """
 
-    def __init__(self, metainterp_sd, jitdriver_sd, cost_threshold):
+    def __init__(self, metainterp_sd, jitdriver_sd, cost_threshold,
+                 reassociate=False):
         Optimizer.__init__(self, metainterp_sd, jitdriver_sd)
         self.cpu = metainterp_sd.cpu
         self.vector_ext = self.cpu.vector_ext
         self.cost_threshold = cost_threshold
+        self.reassociate = reassociate
         self.packset = None
         self.unroll_count = 0
         self.smallest_type_bytes = 0
@@ -385,7 +389,7 @@ class VectorizingOptimizer(Optimizer):
         loop = graph.loop
         operations = loop.operations
 
-        self.packset = PackSet(self.vector_ext.vec_size())
+        self.packset = PackSet(self.vector_ext.vec_size(), self.reassociate)
         memory_refs = graph.memory_refs.items()
         # initialize the pack set
         for node_a,memref_a in memory_refs:
@@ -629,7 +633,9 @@ class CostModel(object):
         raise NotImplementedError
 
     def profitable(self):
-        return self.savings >= 0
+        # vec_cost is the number of instructions the vectorized loop
+        # may lose before falling back to the scalar loop
+        return self.savings + self.threshold >= 0
 
 class GenericCostModel(CostModel):
     def record_pack_savings(self, pack, times):
@@ -677,10 +683,13 @@ def isomorphic(l_op, r_op):
     return False
 
 class PackSet(object):
-    _attrs_ = ('packs', 'vec_reg_size')
-    def __init__(self, vec_reg_size):
+    _attrs_ = ('packs', 'vec_reg_size', 'reassociate')
+    def __init__(self, vec_reg_size, reassociate=False):
         self.packs = []
         self.vec_reg_size = vec_reg_size
+        # float sums and products can only be split into several
+        # partial results if the user accepts a differently rounded result
+        self.reassociate = reassociate
 
     def pack_count(self):
         return len(self.packs)
@@ -773,6 +782,8 @@ class PackSet(object):
         except KeyError:
             pass
         else:
+            if left.type == FLOAT and not self.reassociate:
+                return None
             right = rnode.getoperation()
             assert left.numargs() == 2 and not left.returns_void()
             scalar, index = self.getaccumulator_variable(left, right, origin_pack)
@@ -845,18 +856,16 @@ class PackSet(object):
                 oplist.append(vecop)
                 opnum = rop.VEC_INT_XOR
                 if datatype == FLOAT:
-                    # see PRECISION loss below
-                    raise NotImplementedError
+                    # only reached if reassociation is allowed,
+                    # see accumulates_pair
+                    opnum = rop.VEC_FLOAT_XOR
                 vecop = VecOperation(opnum, [vecop, vecop],
                                      vecop, count)
                 oplist.append(vecop)
             elif pack.reduce_init() == 1:
-                # PRECISION loss, because the numbers are accumulated (associative, commutative properties must hold)
-                # you can end up a small number and a huge number that is finally multiplied. giving an
-                # inprecision result, thus this is disabled now
-                raise NotImplementedError
                 # multiply is only supported by floats
-                vecop = OpHelpers.create_vec_expand(ConstFloat(1.0), bytesize,
+                one = ConstFloat(longlong.getfloatstorage(1.0))
+                vecop = OpHelpers.create_vec_expand(one, bytesize,
                                                     signed, count)
                 oplist.append(vecop)
             else:
@@ -7,11 +7,12 @@ from rpython.jit.codewriter.effectinfo import EffectInfo
 from rpython.jit.codewriter.jitcode import JitCode, SwitchDictDescr
 from rpython.jit.codewriter.liveness import OFFSET_SIZE
 from rpython.jit.metainterp import history, compile, resume, executor, jitexc
+from rpython.jit.metainterp.compilebudget import CompileBudget
 from rpython.jit.metainterp.heapcache import HeapCache
 from rpython.jit.metainterp.history import (Const, ConstInt, ConstPtr,
     ConstFloat, ConstPtrJitCode,
     CONST_NULL, TargetToken, MissingValue, SwitchToBlackhole)
-from rpython.jit.metainterp.jitprof import EmptyProfiler
+from rpython.jit.metainterp.jitprof import EmptyProfiler, GuardStats
 from rpython.jit.metainterp.logger import Logger
 from rpython.jit.metainterp.optimizeopt.util import args_dict
 from rpython.jit.metainterp.resoperation import rop, OpHelpers, GuardResOp
@@ -1558,9 +1559,8 @@ class MIFrame(object):
                 ConstInt(current_call_id)] + greenkey
         metainterp = self.metainterp
         metainterp.history.record(rop.DEBUG_MERGE_POINT, args, None)
-        warmrunnerstate = jitdriver_sd.warmstate
         if (metainterp.force_finish_trace and
-                (metainterp.history.length() > warmrunnerstate.trace_limit * 0.8 or
+                (metainterp.history.length() > metainterp.trace_limit * 0.8 or
                  metainterp.history.trace_tag_overflow_imminent())):
             self._create_segmented_trace_and_blackhole()
 
@@ -2150,6 +2150,9 @@ class MetaInterpStaticData(object):
 
         self.profiler = ProfilerClass()
         self.profiler.cpu = cpu
+        self.compile_budget = CompileBudget()
+        self.guard_stats = GuardStats()
+        self.resume_stats = resume.ResumeDataStats()
         self.warmrunnerdesc = warmrunnerdesc
         if warmrunnerdesc:
             self.config = warmrunnerdesc.translator.config
@@ -2345,6 +2348,9 @@ class MetaInterp(object):
 
         self.aborted_tracing_jitdriver = None
         self.aborted_tracing_greenkey = None
+        # set by bound_reached() for the loops that were too long before
+        if jitdriver_sd is not None:    # None only in tests
+            self.trace_limit = jitdriver_sd.warmstate.trace_limit
 
         # set to true if we really should finish the trace
         # with a GUARD_ALWAYS_FAILS (and an unreachable finish that raises
@@ -2716,9 +2722,12 @@ class MetaInterp(object):
                 jd_sd = self.aborted_tracing_jitdriver
                 greenkey = self.aborted_tracing_greenkey
                 if hooks.are_hooks_enabled():
-                    hooks.on_trace_too_long(
+                    doublings, trace_limit = (
+                        jd_sd.warmstate.get_trace_too_long_counters(greenkey))
+                    hooks.on_trace_too_long_counters(
                         jd_sd.jitdriver, greenkey,
-                        jd_sd.warmstate.get_location_str(greenkey))
+                        jd_sd.warmstate.get_location_str(greenkey),
+                        doublings, trace_limit)
                 # no ops for now
                 self.aborted_tracing_jitdriver = None
                 self.aborted_tracing_greenkey = None
@@ -2727,7 +2736,7 @@ class MetaInterp(object):
     def blackhole_if_trace_too_long(self):
         warmrunnerstate = self.jitdriver_sd.warmstate
         length = self.history.length()
-        if (length > warmrunnerstate.trace_limit or
+        if (length > self.trace_limit or
                 self.history.trace_tag_overflow()):
             jd_sd, greenkey_of_huge_function = self.find_biggest_function()
             self.staticdata.stats.record_aborted(greenkey_of_huge_function)
@@ -2741,10 +2750,24 @@ class MetaInterp(object):
                     jd_sd = self.jitdriver_sd
                     greenkey = self.current_merge_points[0][0][:jd_sd.num_green_args]
                     warmrunnerstate.JitCell.trace_next_iteration(greenkey)
-            else:
+            elif not self.increase_trace_limit():
                 self.prepare_trace_segmenting()
             raise SwitchToBlackhole(Counters.ABORT_TOO_LONG)
 
+    def increase_trace_limit(self):
+        # huge loop, not due to inlining.  Try again with a larger limit,
+        # before resorting to prepare_trace_segmenting()
+        if not self.current_merge_points or self.history.trace_tag_overflow():
+            return False
+        jd_sd = self.jitdriver_sd
+        greenkey = self.current_merge_points[0][0][:jd_sd.num_green_args]
+        if not jd_sd.warmstate.increase_trace_limit(greenkey):
+            return False
+        jd_sd.warmstate.JitCell.trace_next_iteration(greenkey)
+        self.aborted_tracing_jitdriver = jd_sd
+        self.aborted_tracing_greenkey = greenkey
+        return True
+
     def prepare_trace_segmenting(self):
         warmrunnerstate = self.jitdriver_sd.warmstate
         # huge function, not due to inlining. the next time we trace
@@ -2805,10 +2828,12 @@ class MetaInterp(object):
         self.staticdata.profiler.start_tracing()
         assert jitdriver_sd is self.jitdriver_sd
         self.staticdata.try_to_free_some_loops()
+        self.staticdata.compile_budget.start_pause()
         try:
             original_boxes = self.initialize_original_boxes(jitdriver_sd, *args)
             return self._compile_and_run_once(original_boxes)
         finally:
+            self.staticdata.compile_budget.end_pause()
             self.staticdata.profiler.end_tracing()
             debug_stop('jit-tracing')
 
@@ -2838,6 +2863,7 @@ class MetaInterp(object):
             raise compile.giveup() # should be rare
         self.staticdata.try_to_free_some_loops()
         self.create_history(resume.get_max_num_inputargs(key))
+        self.staticdata.compile_budget.start_pause()
         try:
             excdata = self._prepare_exception_resumption(deadframe, resumedescr)
             inputargs = self.initialize_state_from_guard_failure(key, deadframe)
@@ -2846,6 +2872,7 @@ class MetaInterp(object):
             self.run_blackhole_interp_to_cancel_tracing(stb)
         finally:
             self.resumekey_original_loop_token = None
+            self.staticdata.compile_budget.end_pause()
             self.staticdata.profiler.end_tracing()
             debug_stop('jit-tracing')
 
@@ -172,6 +172,15 @@ class NumberingState(resumecode.Writer):
         self.num_virtuals = 0
 
 
+class ResumeDataStats(object):
+    """ The size of the resume code attached to the guards of all
+    the loops and bridges compiled so far """
+
+    def __init__(self):
+        self.total_bytes = 0
+        self.shared_bytes = 0   # part of total_bytes shared with another guard
+
+
 class ResumeDataLoopMemo(object):
 
     def __init__(self, metainterp_sd):
@@ -182,10 +191,17 @@ class ResumeDataLoopMemo(object):
         self.refs = new_ref_dict()
         self.cached_boxes = {}
         self.cached_virtuals = {}
+        # the numberings of the guards of this loop, by resume code.
+        # Boxes are numbered by their position in the failargs and
+        # constants by their position in self.consts, so guards that
+        # resume at the same place often have exactly the same code
+        self.numberings = {}
 
         self.nvirtuals = 0
         self.nvholes = 0
         self.nvreused = 0
+        self.resume_bytes = 0
+        self.resume_bytes_shared = 0
 
     def getconst(self, const):
         if const.type == INT:
@@ -285,6 +301,19 @@ class ResumeDataLoopMemo(object):
         return numb_state
 
 
+    def create_numbering(self, numb_state):
+        """ Return the NUMBERING for numb_state, reusing the one of an
+        earlier guard if its resume code is the same """
+        code = numb_state.encode()
+        self.resume_bytes += len(code)
+        numb = self.numberings.get(code, resumecode.NULL_NUMBER)
+        if numb:
+            self.resume_bytes_shared += len(code)
+        else:
+            numb = resumecode.numbering_from_code(code)
+            self.numberings[code] = numb
+        return numb
+
     # caching for virtuals and boxes inside them
 
     def num_cached_boxes(self):
@@ -320,6 +349,12 @@ class ResumeDataLoopMemo(object):
         profiler.count(jitprof.Counters.NVIRTUALS, self.nvirtuals)
         profiler.count(jitprof.Counters.NVHOLES, self.nvholes)
         profiler.count(jitprof.Counters.NVREUSED, self.nvreused)
+        stats = self.metainterp_sd.resume_stats
+        stats.total_bytes += self.resume_bytes
+        stats.shared_bytes += self.resume_bytes_shared
+        # the optimizer can run several times with the same memo
+        self.resume_bytes = 0
+        self.resume_bytes_shared = 0
 
 _frame_info_placeholder = (None, 0, 0)
 
@@ -470,7 +505,7 @@ class ResumeDataVirtualAdder(VirtualVisitor):
         numb_state.patch(1, len(liveboxes))
 
         self._add_optimizer_sections(numb_state, liveboxes, liveboxes_from_env)
-        storage.rd_numb = numb_state.create_numbering()
+        storage.rd_numb = self.memo.create_numbering(numb_state)
         storage.rd_consts = self.memo.consts
         return liveboxes[:]
 
@@ -93,13 +93,15 @@ class Writer(object):
         return self.append_short(short)
 
     def create_numbering(self):
+        return numbering_from_code(self.encode())
+
+    def encode(self):
+        """ Return the resume code as a string, e.g. to look for an
+        equal numbering that can be shared """
         final = objectmodel.newlist_hint(len(self.current) * 3)
         for item in self.current:
             append_numbering(final, item)
-        numb = lltype.malloc(NUMBERING, len(final))
-        for i, elt in enumerate(final):
-            numb.code[i] = elt
-        return numb
+        return ''.join([chr(rffi.cast(lltype.Signed, elt)) for elt in final])
 
     def patch_current_size(self, index):
         self.patch(index, len(self.current))
@@ -107,6 +109,12 @@ class Writer(object):
     def patch(self, index, item):
         self.current[index] = item
 
+def numbering_from_code(code):
+    numb = lltype.malloc(NUMBERING, len(code))
+    for i in range(len(code)):
+        numb.code[i] = rffi.cast(rffi.UCHAR, ord(code[i]))
+    return numb
+
 def create_numbering(l):
     w = Writer()
     for item in l:
@@ -0,0 +1,121 @@
+from rpython.jit.metainterp.compilebudget import CompileBudget, get_bucket
+from rpython.jit.metainterp.compilebudget import NUM_BUCKETS
+from rpython.jit.metainterp.test.support import LLJitMixin
+from rpython.jit.metainterp import pyjitpl
+from rpython.rlib.jit import JitDriver, set_param
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+def make_budget():
+    budget = CompileBudget()
+    budget.timer = FakeClock()
+    return budget
+
+def pause(budget, seconds):
+    budget.start_pause()
+    budget.timer.now += seconds
+    budget.end_pause()
+
+
+def test_get_bucket():
+    assert get_bucket(0.0) == 0
+    assert get_bucket(0.0009) == 0
+    assert get_bucket(0.001) == 1
+    assert get_bucket(0.0035) == 2
+    assert get_bucket(0.5) == 9
+    assert get_bucket(1000.0) == NUM_BUCKETS - 1
+
+def test_histogram():
+    budget = make_budget()
+    pause(budget, 0.0005)
+    pause(budget, 0.003)
+    pause(budget, 0.003)
+    assert budget.histogram[0] == 1
+    assert budget.histogram[2] == 2
+    assert sum(budget.histogram) == 3
+    assert abs(budget.total_time - 0.0065) < 1e-9
+
+def test_nested_pauses():
+    budget = make_budget()
+    budget.start_pause()
+    budget.timer.now += 0.002
+    pause(budget, 0.010)
+    budget.end_pause()
+    assert sum(budget.histogram) == 1
+    assert budget.histogram[get_bucket(0.012)] == 1
+
+def test_no_budget():
+    budget = make_budget()
+    for i in range(10):
+        assert budget.can_compile()
+        pause(budget, 1.0)
+    assert budget.deferred == 0
+
+def test_budget_per_window():
+    budget = make_budget()
+    budget.set_budget(20)
+    budget.set_window(1000)
+    assert budget.can_compile()
+    pause(budget, 0.015)
+    assert budget.can_compile()
+    pause(budget, 0.015)
+    # 30ms spent in this window
+    assert not budget.can_compile()
+    budget.timer.now += 0.5
+    assert not budget.can_compile()
+    assert budget.deferred == 2
+    # the next window starts with nothing spent
+    budget.timer.now += 0.5
+    assert budget.can_compile()
+
+def test_clock_going_backwards():
+    budget = make_budget()
+    budget.set_budget(20)
+    budget.set_window(1000)
+    assert budget.can_compile()
+    pause(budget, 0.030)
+    assert not budget.can_compile()
+    # the system clock was set back by an hour
+    budget.timer.now -= 3600.0
+    assert budget.can_compile()
+    assert budget.spent == 0.0
+
+
+class CompileBudgetTests:
+
+    def test_deferred_compilation(self, monkeypatch):
+        clock = FakeClock()
+        def timer():
+            clock.now += 1.0     # every compilation takes seconds
+            return clock.now
+        monkeypatch.setattr(CompileBudget, 'timer', staticmethod(timer))
+        myjitdriver = JitDriver(greens=['k'], reds=['n', 'res'])
+        def loop(k, n):
+            res = 0
+            while n > 0:
+                myjitdriver.can_enter_jit(k=k, n=n, res=res)
+                myjitdriver.jit_merge_point(k=k, n=n, res=res)
+                res += k
+                n -= 1
+            return res
+        def f(n):
+            set_param(myjitdriver, 'compile_budget', 1)
+            set_param(myjitdriver, 'compile_budget_window', 1000000)
+            return loop(1, n) + loop(2, n)
+        res = self.meta_interp(f, [50])
+        assert res == 150
+        # the second loop is not compiled, the budget being exhausted
+        self.check_trace_count(1)
+        budget = pyjitpl._warmrunnerdesc.metainterp_sd.compile_budget
+        assert budget.deferred > 0
+        assert sum(budget.histogram) == 1
+
+
+class TestLLtype(CompileBudgetTests, LLJitMixin):
+    pass
@@ -1,7 +1,7 @@
 import py
 from rpython.jit.metainterp.test.support import LLJitMixin
 from rpython.rlib.jit import JitDriver
-from rpython.rlib import objectmodel
+from rpython.rlib import objectmodel, jit
 from collections import OrderedDict
 
 class DictTests:
@@ -422,6 +422,45 @@ class DictTests:
         self.meta_interp(f, [100], backendopt=True)
         self.check_simple_loop(call_may_force_i=0, call_n=0, new_array_clear=0, new=0)
 
+    def test_dict_virtual_keys_values_items(self):
+        myjitdriver = JitDriver(greens = [], reds = 'auto')
+        @jit.unroll_safe
+        def total(d):
+            s = len(d.keys())
+            for v in d.values():
+                s += v
+            for k, v in d.items():
+                s += v
+            return s
+        def f(n):
+            res = 0
+            while n > 0:
+                myjitdriver.jit_merge_point()
+                d = {"a": n, "b": n + 1, "c": n + 2}
+                res += total(d)
+                n -= 1
+            return res
+        res = self.meta_interp(f, [100], backendopt=True)
+        assert res == f(100)
+        self.check_simple_loop(call_may_force_i=0, call_r=0, call_n=0,
+                               new_array_clear=0, new=0)
+
+    def test_dict_virtual_popitem(self):
+        myjitdriver = JitDriver(greens = [], reds = 'auto')
+        def f(n):
+            res = 0
+            while n > 0:
+                myjitdriver.jit_merge_point()
+                d = {"a": n, "b": n}
+                k, v = d.popitem()
+                res += v + len(d)
+                n -= 1
+            return res
+        res = self.meta_interp(f, [100], backendopt=True)
+        assert res == f(100)
+        self.check_simple_loop(call_may_force_r=0, call_r=0, call_n=0,
+                               new_array_clear=0, new=0)
+
     def test_loop_over_virtual_dict_gives_constants(self):
         def fn(n):
             d = self.newdict()
@@ -349,6 +349,70 @@ class JitHookInterfaceTests(object):
                                no_stats_history=True)
         assert res == 42
 
+    def test_guard_stats(self):
+        driver = JitDriver(greens = ['k'], reds = ['i', 's'], name='driver',
+                           get_printable_location=lambda k: 'k=%d' % k)
+
+        def loop(k, i):
+            s = 0
+            while i > 0:
+                driver.jit_merge_point(k=k, i=i, s=s)
+                if i % 10 == 0:
+                    s += k
+                i -= 1
+            return s
+
+        def main():
+            loop(5, 100)      # compiled without the stats
+            jit_hooks.stats_set_guard_stats(None, True)
+            loop(7, 200)
+            jit_hooks.stats_set_guard_stats(None, False)
+            loop(7, 200)      # not counted
+            l = jit_hooks.stats_get_guard_stats(None)
+            total = 0
+            for i in range(len(l)):
+                if hlstr(l[i].location) != 'k=7':
+                    return -1
+                if hlstr(l[i].jitdriver_name) != 'driver':
+                    return -2
+                llbox = jit_hooks.resop_getarg(l[i].debug_merge_point, 3)
+                if jit_hooks.box_getint(llbox) != 7:
+                    return -3
+                total += l[i].failures
+            return total
+
+        res = self.meta_interp(main, [])
+        # the 'i % 10 == 0' guard of the loop fails until its bridge is
+        # compiled, then the loop exits with a failing guard
+        assert 0 < res <= 200 // 10 + 1
+
+    def test_resume_stats(self):
+        driver = JitDriver(greens = [], reds = ['i', 's'])
+
+        def loop(i):
+            s = 0
+            while i > 0:
+                driver.jit_merge_point(i=i, s=s)
+                if i % 3 == 0:
+                    s += 1
+                if i % 5 == 0:
+                    s += 2
+                i -= 1
+            return s
+
+        def main():
+            if jit_hooks.stats_resume_bytes(None) != 0:
+                return -1
+            loop(100)
+            total = jit_hooks.stats_resume_bytes(None)
+            shared = jit_hooks.stats_resume_shared_bytes(None)
+            if not 0 <= shared < total:
+                return -2
+            return 42
+
+        res = self.meta_interp(main, [])
+        assert res == 42
+
 
 class LLJitHookInterfaceTests(JitHookInterfaceTests):
     # use this for any backend, instead of the super class
@@ -126,3 +126,31 @@ class TestProfile(ProfilerMixin):
         profiler = pyjitpl._warmrunnerdesc.metainterp_sd.profiler
         assert profiler.counters[Counters.HEAPCACHED_OPS] == 3
 
+
+
+def test_guard_stats_drop_freed_guards():
+    import gc
+    from rpython.jit.metainterp.jitprof import GuardStats
+    from rpython.jit.metainterp.history import AbstractFailDescr, ConstInt
+    from rpython.jit.metainterp.resoperation import ResOperation, rop
+
+    class FakeDescr(AbstractFailDescr):
+        pass
+
+    stats = GuardStats()
+    descrs = [FakeDescr() for i in range(3)]
+    ops = []
+    for descr in descrs:
+        op = ResOperation(rop.GUARD_TRUE, [ConstInt(1)])
+        op.setdescr(descr)
+        ops.append(op)
+    stats.register_guards(None, ops, 5)
+    for descr in descrs:
+        stats.count_failure(descr)
+    del ops, op, descr
+    del descrs[1]
+    gc.collect()
+    l = stats.get_all_guard_stats()
+    assert len(l) == 2
+    assert len(stats.guards) == 2
+    assert l[0].number == l[1].number == 5
@@ -376,6 +376,91 @@ class ListTests:
         assert res == 0
         self.check_resops(call=0, cond_call=2)
 
+    def test_bounds_check_versioning(self):
+        jitdriver = JitDriver(greens = [], reds = ['i', 'n', 'total', 'lst'])
+        def f(n):
+            lst = []
+            for j in range(n):
+                lst.append(j)
+            total = 0
+            i = 0
+            while True:
+                jitdriver.jit_merge_point(i=i, n=n, total=total, lst=lst)
+                if i >= n:
+                    break
+                try:
+                    total += lst[i]
+                except IndexError:
+                    total -= 1
+                i += 1
+            return total
+
+        res = self.meta_interp(f, [30], listops=True)
+        assert res == f(30)
+        # 'i < len(lst)' is implied by 'i < n' and 'n <= len(lst)', which
+        # is checked once in the preamble
+        self.check_simple_loop(guard_false=1, guard_true=0, getfield_gc_i=0)
+
+    def test_bounds_check_versioning_shorter_list(self):
+        jitdriver = JitDriver(greens = [], reds = ['i', 'n', 'k', 'total',
+                                                  'lst', 'lst1', 'lst2'])
+        def f(n):
+            lst1 = []
+            lst2 = []
+            for j in range(n):
+                lst1.append(j)
+                if j < n // 2:
+                    lst2.append(j)
+            total = 0
+            k = 0
+            while k < 6:
+                if k & 1:
+                    lst = lst2
+                else:
+                    lst = lst1
+                i = 0
+                while True:
+                    jitdriver.jit_merge_point(i=i, n=n, k=k, total=total,
+                                              lst=lst, lst1=lst1, lst2=lst2)
+                    if i >= n:
+                        break
+                    try:
+                        total += lst[i]
+                    except IndexError:
+                        total -= 100
+                    i += 1
+                k += 1
+            return total
+
+        res = self.meta_interp(f, [40], listops=True)
+        assert res == f(40)
+
+    def test_bounds_check_versioning_fails(self):
+        jitdriver = JitDriver(greens = [], reds = ['i', 'n', 'total', 'lst'])
+        def f(n, m):
+            lst = []
+            for j in range(m):
+                lst.append(j)
+            total = 0
+            i = 0
+            while True:
+                jitdriver.jit_merge_point(i=i, n=n, total=total, lst=lst)
+                if i >= n:
+                    break
+                if i >= len(lst):
+                    break
+                total += lst[i]
+                i += 1
+            return total
+
+        res = self.meta_interp(f, [400, 200], listops=True)
+        assert res == f(400, 200)
+        # 'n <= len(lst)' fails in the preamble.  The bridge from there
+        # retraces the loop without the versioning, instead of jumping
+        # to the loop that relies on it or back to the preamble
+        self.check_trace_count(2)
+        self.check_target_token_count(3)
+
 class TestLLtype(ListTests, LLJitMixin):
     def test_listops_dont_invalidate_caches(self):
         class A(object):
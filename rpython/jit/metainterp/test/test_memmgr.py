@@ -21,6 +21,18 @@ from rpython.rlib import rgc
 class FakeLoopToken:
     generation = 0
     invalidated = False
+    compiled_loop_token = None
+    code_size = 0
+
+class FakeCompiledLoopToken:
+    def __init__(self, size):
+        self.asmmemmgr_blocks = [(1000, 1000 + size)]
+
+def sized_token(size):
+    token = FakeLoopToken()
+    token.compiled_loop_token = FakeCompiledLoopToken(size)
+    token.code_size = size     # as set by update_code_size()
+    return token
 
 
 class _TestMemoryManager:
@@ -78,6 +90,84 @@ class _TestMemoryManager:
             else:
                 assert tokens[i] in memmgr.alive_loops
 
+    def test_max_code_size(self):
+        memmgr = MemoryManager()
+        memmgr.set_max_age(0)
+        memmgr.set_max_code_size(1000)
+        tokens = [sized_token(100) for i in range(20)]
+        for token in tokens[:10]:
+            memmgr.keep_loop_alive(token)
+            memmgr.next_generation()
+        assert memmgr.alive_loops == dict.fromkeys(tokens[:10])
+        assert memmgr.get_total_code_size() == 1000
+        assert memmgr.evicted_loops == 0
+        # entering tokens[0] again makes it the most recently used
+        memmgr.keep_loop_alive(tokens[0])
+        memmgr.keep_loop_alive(tokens[10])
+        memmgr.next_generation()
+        # down to 3/4 of the budget, evicting the oldest loops first
+        assert memmgr.alive_loops == dict.fromkeys(
+            [tokens[0]] + tokens[5:11])
+        assert memmgr.get_total_code_size() == 700
+        assert memmgr.evicted_loops == 4
+        assert memmgr.evicted_code_size == 400
+
+    def test_max_code_size_keeps_recent_loops(self):
+        memmgr = MemoryManager()
+        memmgr.set_max_age(0)
+        memmgr.set_max_code_size(1000)
+        tokens = [sized_token(600) for i in range(3)]
+        memmgr.keep_loop_alive(tokens[0])
+        memmgr.next_generation()
+        memmgr.keep_loop_alive(tokens[1])
+        memmgr.keep_loop_alive(tokens[2])
+        memmgr.next_generation()
+        # the loops from the last generation are not evicted, even if
+        # they are still above the budget
+        assert memmgr.alive_loops == dict.fromkeys(tokens[1:])
+        assert memmgr.evicted_loops == 1
+        memmgr.keep_loop_alive(tokens[2])
+        memmgr.next_generation()
+        assert memmgr.alive_loops == {tokens[2]: None}
+        assert memmgr.evicted_loops == 2
+        assert memmgr.evicted_code_size == 1200
+
+    def test_total_code_size(self):
+        memmgr = MemoryManager()
+        memmgr.set_max_age(0)
+        token = FakeLoopToken()
+        token.compiled_loop_token = FakeCompiledLoopToken(100)
+        memmgr.update_code_size(token)
+        memmgr.keep_loop_alive(token)
+        assert memmgr.get_total_code_size() == 100
+        # a bridge is compiled
+        token.compiled_loop_token.asmmemmgr_blocks.append((2000, 2050))
+        memmgr.update_code_size(token)
+        assert memmgr.get_total_code_size() == 150
+        memmgr.next_generation()
+        memmgr.keep_loop_alive(token)
+        assert memmgr.get_total_code_size() == 150
+        memmgr.release_all_loops()
+        assert memmgr.get_total_code_size() == 0
+        # another bridge is compiled while the loop is not alive
+        token.compiled_loop_token.asmmemmgr_blocks.append((3000, 3025))
+        memmgr.update_code_size(token)
+        assert memmgr.get_total_code_size() == 0
+        memmgr.next_generation()
+        memmgr.keep_loop_alive(token)
+        assert memmgr.get_total_code_size() == 175
+
+    def test_max_code_size_disabled(self):
+        memmgr = MemoryManager()
+        memmgr.set_max_age(0)
+        memmgr.set_max_code_size(0)
+        tokens = [sized_token(1000) for i in range(10)]
+        for token in tokens:
+            memmgr.keep_loop_alive(token)
+            memmgr.next_generation()
+        assert memmgr.alive_loops == dict.fromkeys(tokens)
+        assert memmgr.evicted_loops == 0
+
 
 class _TestIntegration(LLJitMixin):
     # See comments in TestMemoryManager.  To get temporarily the normal
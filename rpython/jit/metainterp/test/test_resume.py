@@ -710,6 +710,28 @@ def test_ResumeDataLoopMemo_number():
         2, 1, tag(3, TAGINT), tag(0, TAGVIRTUAL), tag(0, TAGBOX), tag(3, TAGINT)
         ] + [0, 0]
 
+def test_ResumeDataLoopMemo_share_numbering():
+    b1, b2 = [IntFrontendOp(0, 0), IntFrontendOp(1, 0)]
+    c1 = ConstInt(1)
+    metainterp_sd = FakeMetaInterpStaticData()
+    t = Trace([b1, b2], metainterp_sd)
+    for env in [[b1, c1], [b2, c1], [c1, b2]]:
+        t.append(0)
+        t.create_top_snapshot(FakeJitCode("jitcode", 0), 2, Frame(env),
+                              [], [])
+    memo = ResumeDataLoopMemo(metainterp_sd)
+    iter = t.get_iter()
+    numb1 = memo.create_numbering(memo.number(0, iter))
+    # the same code, with another box in the failargs
+    numb2 = memo.create_numbering(memo.number(1, iter))
+    numb3 = memo.create_numbering(memo.number(2, iter))
+    assert numb2 == numb1
+    assert numb3 != numb1
+    assert unpack_numbering(numb3) != unpack_numbering(numb1)
+    size = len(numb1.code)
+    assert memo.resume_bytes == 2 * size + len(numb3.code)
+    assert memo.resume_bytes_shared == size
+
 @given(strategies.lists(
     strategies.builds(IntFrontendOp, strategies.just(0), strategies.just(1)) | intconsts,
     min_size=1))
@@ -1,9 +1,12 @@
 import py
 from rpython.rlib.jit import JitDriver, set_param, Counters, set_user_param
 from rpython.rlib.jit import unroll_safe, dont_look_inside, promote
+from rpython.rlib.jit import JitHookInterface
 from rpython.jit.metainterp.test.support import LLJitMixin
 from rpython.jit.metainterp.warmspot import get_stats
 from rpython.jit.metainterp.jitprof import Profiler
+from rpython.jit.codewriter.policy import JitPolicy
+from rpython.rlib.objectmodel import dont_inline
 
 class TraceLimitTests:
     def test_segmented_trace(self):
@@ -210,6 +213,69 @@ class TraceLimitTests:
         self.check_trace_count(10)
         self.check_jitcell_token_count(1)
 
+    def test_trace_limit_increased(self):
+        def p(pc, code):
+            return "%s %d %s" % (code, pc, code[pc])
+        myjitdriver = JitDriver(greens=['pc', 'code'], reds=['n'],
+                                get_printable_location=p)
+        seen = []
+        seen_repr = []
+
+        class Hooks(JitHookInterface):
+            def on_trace_too_long(self, jitdriver, greenkey, greenkey_repr):
+                seen_repr.append(greenkey_repr)
+
+            def on_trace_too_long_counters(self, jitdriver, greenkey,
+                                           greenkey_repr, doublings,
+                                           trace_limit):
+                seen.append((greenkey_repr, doublings, trace_limit))
+                JitHookInterface.on_trace_too_long_counters(self, jitdriver,
+                    greenkey, greenkey_repr, doublings, trace_limit)
+
+        @dont_inline
+        def dec(n):
+            return n - 1
+
+        def f(code, n):
+            pc = 0
+            while pc < len(code):
+                myjitdriver.jit_merge_point(n=n, code=code, pc=pc)
+                op = code[pc]
+                if op == "-":
+                    # the length of the trace is only checked when
+                    # entering or leaving a function
+                    n = dec(n)
+                elif op == "l":
+                    if n > 0:
+                        myjitdriver.can_enter_jit(n=n, code=code, pc=0)
+                        pc = 0
+                        continue
+                else:
+                    assert 0
+                pc += 1
+            return n
+        s = '-' * 100 + 'l'
+        def g(m):
+            set_param(None, 'trace_limit', 40)
+            set_param(None, 'trace_limit_max', 1000)
+            if m > 1000000:
+                f('', 0)
+            result = 0
+            for i in range(m):
+                result += f(s, i * 1000)
+        self.meta_interp(g, [10], backendopt=True, ProfilerClass=Profiler,
+                         policy=JitPolicy(Hooks()))
+        stats = get_stats()
+        # the loop is compiled as a whole, once its trace limit is large
+        # enough
+        self.check_resops(jump=1)
+        counters = stats.metainterp_sd.profiler.counters
+        assert counters[Counters.ABORT_TOO_LONG] == len(seen) > 0
+        assert counters[Counters.ABORT_SEGMENTED_TRACE] == 0
+        loc = '%s 0 -' % s
+        assert seen == [(loc, 1, 80), (loc, 2, 160), (loc, 3, 320)]
+        assert seen_repr == [loc] * 3
+
     def test_big_opencoder_model(self):
         def g(i):
             f(0)
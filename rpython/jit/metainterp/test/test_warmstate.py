@@ -9,6 +9,7 @@ from rpython.jit.metainterp.resoperation import InputArgInt, InputArgRef,\
 from rpython.jit.metainterp.history import ConstInt, ConstFloat, ConstPtr,\
      IntFrontendOp, FloatFrontendOp, RefFrontendOp
 from rpython.jit.metainterp.counter import DeterministicJitCounter
+from rpython.jit.metainterp.compilebudget import CompileBudget
 from rpython.jit.codewriter import longlong
 from rpython.rlib.rarithmetic import r_singlefloat
 
@@ -112,6 +113,7 @@ class FakeWarmRunnerDesc:
     class metainterp_sd:
         class opencoder_model:
             MAX_TRACE_LIMIT=2**14
+        compile_budget = CompileBudget()
 
 def test_make_jitdriver_callbacks_1():
     class FakeJitDriverSD:
@@ -198,3 +200,30 @@ def test_make_jitdriver_callbacks_5():
     state.make_jitdriver_callbacks()
     res = state.can_never_inline(5, 42.5)
     assert res is True
+
+def test_increase_trace_limit():
+    class FakeJitDriverSD:
+        jitdriver = None
+        _green_args_spec = [lltype.Signed]
+        _get_printable_location_ptr = None
+        _confirm_enter_jit_ptr = None
+        _can_never_inline_ptr = None
+        _get_unique_id_ptr = None
+        _should_unroll_one_iteration_ptr = None
+        red_args_types = []
+
+    state = WarmEnterState(FakeWarmRunnerDesc(), FakeJitDriverSD())
+    state.make_jitdriver_callbacks()
+    state.set_param_trace_limit(1000)
+    state.set_param_trace_limit_max(3000)
+    greenkey = [ConstInt(5)]
+    assert state.get_trace_too_long_counters(greenkey) == (0, 1000)
+    assert state.increase_trace_limit(greenkey)
+    assert state.get_trace_too_long_counters(greenkey) == (1, 2000)
+    assert state.increase_trace_limit(greenkey)
+    assert state.get_trace_too_long_counters(greenkey) == (2, 3000)
+    # the maximum is reached
+    assert not state.increase_trace_limit(greenkey)
+    assert state.get_trace_too_long_counters(greenkey) == (2, 3000)
+    # other greenkeys are not affected
+    assert state.get_trace_too_long_counters([ConstInt(6)]) == (0, 1000)
@@ -361,7 +361,7 @@ class VectorizeTests(object):
         res = self.meta_interp(f, [count], vec=True)
         assert res == f(count) == breaks
 
-    def vec_reduce(strat, arith_func, tp):
+    def vec_reduce(strat, arith_func, tp, vec_reassoc=0):
         @pytest.mark.parametrize('func, tp', [
             (arith_func, tp)
         ])
@@ -386,7 +386,8 @@ class VectorizeTests(object):
             l = len(la)
             rawstorage = RawStorage()
             va = rawstorage.new(la, tp)
-            res = self.meta_interp(f, [accum, l * size, va], vec=True)
+            res = self.meta_interp(f, [accum, l * size, va], vec=True,
+                                   vec_reassoc=vec_reassoc)
 
             assert isclose(rffi.cast(tp, res), f(accum, l * size, va))
 
@@ -398,8 +399,13 @@ class VectorizeTests(object):
     small_floats = st.floats(min_value=-100, max_value=100, allow_nan=False, allow_infinity=False)
     test_vec_float_sum = vec_reduce(small_floats, lambda a,b: a+b, rffi.DOUBLE)
     # PRECISION loss, because the numbers are accumulated (associative, commutative properties must hold)
-    # you can end up a small number and a huge number that is finally multiplied losing precision
-    # test_vec_float_prod = vec_reduce(small_floats, lambda a,b: a*b, rffi.DOUBLE)
+    # you can end up a small number and a huge number that is finally multiplied losing precision.
+    # the reduction is only vectorized if vec_reassoc is set
+    test_vec_float_sum_reassoc = vec_reduce(small_floats, lambda a,b: a+b,
+                                            rffi.DOUBLE, vec_reassoc=1)
+    factors = st.floats(min_value=0.5, max_value=2.0)
+    test_vec_float_prod_reassoc = vec_reduce(factors, lambda a,b: a*b,
+                                             rffi.DOUBLE, vec_reassoc=1)
 
 
     def test_constant_expand(self):
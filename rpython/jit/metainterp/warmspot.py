@@ -87,11 +87,13 @@ def ll_meta_interp(function, args, backendopt=False,
     return jittify_and_run(interp, graph, args, backendopt=backendopt, **kwds)
 
 def jittify_and_run(interp, graph, args, repeat=1, graph_and_interp_only=False,
-                    backendopt=False, trace_limit=2**14, inline=False,
+                    backendopt=False, trace_limit=2**14, trace_limit_max=0,
+                    inline=False,
                     loop_longevity=0, retrace_limit=5, function_threshold=4,
                     disable_unrolling=sys.maxint,
                     enable_opts=ALL_OPTS_NAMES, max_retrace_guards=15,
                     max_unroll_recursion=7, vec=0, vec_all=0, vec_cost=0,
+                    vec_reassoc=0,
                     **kwds):
     from rpython.config.config import ConfigError
     translator = interp.typer.annotator.translator
@@ -109,6 +111,7 @@ def jittify_and_run(interp, graph, args, repeat=1, graph_and_interp_only=False,
         jd.warmstate.set_param_function_threshold(function_threshold)
         jd.warmstate.set_param_trace_eagerness(2)    # for tests
         jd.warmstate.set_param_trace_limit(trace_limit)
+        jd.warmstate.set_param_trace_limit_max(trace_limit_max)
         jd.warmstate.set_param_inlining(inline)
         jd.warmstate.set_param_loop_longevity(loop_longevity)
         jd.warmstate.set_param_retrace_limit(retrace_limit)
@@ -119,6 +122,7 @@ def jittify_and_run(interp, graph, args, repeat=1, graph_and_interp_only=False,
         jd.warmstate.set_param_vec(vec)
         jd.warmstate.set_param_vec_all(vec_all)
         jd.warmstate.set_param_vec_cost(vec_cost)
+        jd.warmstate.set_param_vec_reassoc(vec_reassoc)
     warmrunnerdesc.finish()
     if graph_and_interp_only:
         return interp, graph
@@ -208,7 +212,7 @@ def reset_stats():
 def reset_jit():
     """Helper for some tests (see micronumpy/test/test_zjit.py)"""
     reset_stats()
-    pyjitpl._warmrunnerdesc.memory_manager.alive_loops.clear()
+    pyjitpl._warmrunnerdesc.memory_manager.release_all_loops()
     pyjitpl._warmrunnerdesc.jitcounter._clear_all()
 
 def get_translator():
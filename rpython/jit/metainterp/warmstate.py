@@ -133,6 +133,8 @@ JC_DONT_TRACE_HERE = 0x02
 JC_TEMPORARY       = 0x04
 JC_TRACING_OCCURRED= 0x08
 JC_FORCE_FINISH    = 0x10
+JC_TOO_LONG_SHIFT  = 5
+JC_TOO_LONG_MASK   = 0x0f << JC_TOO_LONG_SHIFT
 
 class BaseJitCell(object):
     """Subclasses of BaseJitCell are used in tandem with the single
@@ -183,6 +185,12 @@ class BaseJitCell(object):
         JC_FORCE_FINISH: when from a cell with that flag set, if the trace
         becomes too long, "segment" it, ie finish it with a guard_always_fails.
         this prevents re-tracing and failing this again and again.
+
+    The bits JC_TOO_LONG_MASK store how many times the trace limit was
+    doubled for loops starting at this greenkey, because their trace was
+    too long without any inlined function to blame.  Only when the
+    'trace_limit_max' parameter prevents more doublings do we set
+    JC_FORCE_FINISH.
     """
     flags = 0     # JC_xxx flags
     wref_procedure_token = None
@@ -223,6 +231,9 @@ class BaseJitCell(object):
             # don't remove, we need to remember that we should really finish a
             # trace for this
             return False
+        if self.flags & JC_TOO_LONG_MASK:
+            # don't remove, we need to remember the larger trace limit
+            return False
         return True   # Other JitCells can be removed.
 
 # ____________________________________________________________
@@ -266,6 +277,25 @@ class WarmEnterState(object):
             raise ValueError
         self.trace_limit = value
 
+    def set_param_trace_limit_max(self, value):
+        if value < 0:
+            raise ValueError
+        self.trace_limit_max = value
+
+    def get_trace_limit(self, cell):
+        # the trace limit for loops starting at 'cell', doubled each time
+        # their trace was too long, up to 'trace_limit_max'
+        limit = self.trace_limit
+        if cell is not None:
+            doublings = (cell.flags & JC_TOO_LONG_MASK) >> JC_TOO_LONG_SHIFT
+            limit_max = max(self.trace_limit_max, limit)
+            limit_max = min(limit_max, self.warmrunnerdesc.metainterp_sd.
+                                           opencoder_model.MAX_TRACE_LIMIT)
+            while doublings > 0 and limit < limit_max:
+                limit = min(limit * 2, limit_max)
+                doublings -= 1
+        return limit
+
     def set_param_decay(self, decay):
         self.warmrunnerdesc.jitcounter.set_decay(decay)
 
@@ -296,6 +326,22 @@ class WarmEnterState(object):
             self.warmrunnerdesc.memory_manager is not None):   # all for tests
             self.warmrunnerdesc.memory_manager.set_max_age(value)
 
+    def set_param_max_code_size(self, value):
+        # note: it's a global parameter, not a per-jitdriver one
+        if (self.warmrunnerdesc is not None and
+            self.warmrunnerdesc.memory_manager is not None):   # all for tests
+            self.warmrunnerdesc.memory_manager.set_max_code_size(value)
+
+    def set_param_compile_budget(self, value):
+        # note: it's a global parameter, not a per-jitdriver one
+        if self.warmrunnerdesc is not None:    # for tests
+            self.warmrunnerdesc.metainterp_sd.compile_budget.set_budget(value)
+
+    def set_param_compile_budget_window(self, value):
+        # note: it's a global parameter, not a per-jitdriver one
+        if self.warmrunnerdesc is not None:    # for tests
+            self.warmrunnerdesc.metainterp_sd.compile_budget.set_window(value)
+
     def set_param_retrace_limit(self, value):
         if self.warmrunnerdesc:
             if self.warmrunnerdesc.memory_manager:
@@ -328,6 +374,9 @@ class WarmEnterState(object):
     def set_param_vec_cost(self, ivalue):
         self.vec_cost = ivalue
 
+    def set_param_vec_reassoc(self, ivalue):
+        self.vec_reassoc = bool(ivalue)
+
     def disable_noninlinable_function(self, greenkey):
         cell = self.JitCell.ensure_jit_cell_at_key(greenkey)
         cell.flags |= JC_DONT_TRACE_HERE
@@ -426,6 +475,10 @@ class WarmEnterState(object):
             from rpython.jit.metainterp.pyjitpl import MetaInterp
             if not confirm_enter_jit(*args):
                 return
+            if not metainterp_sd.compile_budget.can_compile():
+                # out of compile time for now: try again a bit later
+                jitcounter.change_current_fraction(hash, 0.98)
+                return
             jitcounter.decay_all_counters()
             if rstack.stack_almost_full():
                 return
@@ -437,6 +490,7 @@ class WarmEnterState(object):
             metainterp = MetaInterp(
                 metainterp_sd, jitdriver_sd,
                 force_finish_trace=bool(cell.flags & JC_FORCE_FINISH))
+            metainterp.trace_limit = self.get_trace_limit(cell)
             cell.flags |= JC_TRACING | JC_TRACING_OCCURRED
             try:
                 metainterp.compile_and_run_once(jitdriver_sd, *args)
@@ -494,6 +548,12 @@ class WarmEnterState(object):
                         if tick:
                             bound_reached(hash, cell, *args)
                         return
+                if cell.flags & JC_TOO_LONG_MASK:
+                    # the trace was too long, and the trace limit of this
+                    # loop has been increased.  count normally
+                    if jitcounter.tick(hash, increment_threshold):
+                        bound_reached(hash, cell, *args)
+                    return
                 # it was an aborted compilation, or maybe a weakref that
                 # has been freed
                 jitcounter.cleanup_chain(hash)
@@ -691,6 +751,32 @@ class WarmEnterState(object):
             cell.flags |= JC_TRACING
         self.mark_as_being_traced = mark_as_being_traced
 
+        def increase_trace_limit(greenkey):
+            """ the trace of the loop at greenkey was too long: double its
+            limit if 'trace_limit_max' allows.  Returns False if not """
+            cell = JitCell.ensure_jit_cell_at_key(greenkey)
+            limit = self.get_trace_limit(cell)
+            if (cell.flags & JC_TOO_LONG_MASK) == JC_TOO_LONG_MASK:
+                return False
+            cell.flags += 1 << JC_TOO_LONG_SHIFT
+            if self.get_trace_limit(cell) == limit:
+                cell.flags -= 1 << JC_TOO_LONG_SHIFT
+                return False
+            debug_start("jit-tracelimit")
+            debug_print("trace limit increased to", self.get_trace_limit(cell),
+                        "at", self.get_location_str(greenkey))
+            debug_stop("jit-tracelimit")
+            return True
+        self.increase_trace_limit = increase_trace_limit
+
+        def get_trace_too_long_counters(greenkey):
+            """ returns (the number of times the trace limit was doubled,
+            the trace limit) for the loops starting at greenkey """
+            cell = JitCell.ensure_jit_cell_at_key(greenkey)
+            doublings = (cell.flags & JC_TOO_LONG_MASK) >> JC_TOO_LONG_SHIFT
+            return doublings, self.get_trace_limit(cell)
+        self.get_trace_too_long_counters = get_trace_too_long_counters
+
         def mark_force_finish_tracing(greenkey):
             """ mark greenkey as "please definitely finish a trace for it the
             next time" """
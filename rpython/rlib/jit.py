@@ -568,9 +568,19 @@ PARAMETER_DOCS = {
     'trace_eagerness': 'number of times a guard has to fail before we start compiling a bridge',
     'decay': 'amount to regularly decay counters by (0=none, 1000=max)',
     'trace_limit': 'number of recorded operations before we abort tracing with ABORT_TOO_LONG',
+    'trace_limit_max': 'maximum trace limit of the loops that were too long '
+                       'without an inlined function to blame, their limit is '
+                       'doubled each time up to this value',
     'inlining': 'inline python functions or not (1/0)',
     'loop_longevity': 'a parameter controlling how long loops will be kept before being freed, an estimate',
+    'max_code_size': 'maximum size in bytes of the machine code of the alive loops, '
+                     'the least recently entered ones are freed above it (0=no limit)',
     'retrace_limit': 'how many times we can try retracing before giving up',
+    'compile_budget': 'maximum milliseconds spent tracing and compiling per '
+                      'compile_budget_window, further compilations are '
+                      'delayed (0=no limit)',
+    'compile_budget_window': 'length in milliseconds of the windows of '
+                             'compile_budget',
     'pureop_historylength': 'how many pure operations the optimizer should remember for CSE (internal)',
     'max_retrace_guards': 'number of extra guards a retrace can cause',
     'max_unroll_loops': 'number of extra unrollings a loop can cause',
@@ -583,6 +593,8 @@ PARAMETER_DOCS = {
     'vec_cost': 'threshold for which traces to bail. Unpacking increases the counter,'\
                 ' vector operation decrease the cost',
     'vec_all': 'try to vectorize trace loops that occur outside of the numpypy library',
+    'vec_reassoc': 'allow vecopt to reorder float sums and products when it '\
+                   'vectorizes a reduction (results may differ in the last bits)',
 }
 
 PARAMETERS = {'threshold': 1039, # just above 1024, prime
@@ -590,9 +602,13 @@ PARAMETERS = {'threshold': 1039, # just above 1024, prime
               'trace_eagerness': 200,
               'decay': 40,
               'trace_limit': 6000,
+              'trace_limit_max': 24000,
               'inlining': 1,
               'loop_longevity': 1000,
+              'max_code_size': 0,
               'retrace_limit': 0,
+              'compile_budget': 0,
+              'compile_budget_window': 1000,
               'pureop_historylength': 16,
               'max_retrace_guards': 15,
               'max_unroll_loops': 0,
@@ -602,6 +618,7 @@ PARAMETERS = {'threshold': 1039, # just above 1024, prime
               'vec': 0,
               'vec_all': 0,
               'vec_cost': 0,
+              'vec_reassoc': 0,
               }
 unroll_parameters = unrolling_iterable(PARAMETERS.items())
 
@@ -1140,9 +1157,19 @@ class JitHookInterface(object):
     def on_trace_too_long(self, jitdriver, greenkey, greenkey_repr):
         """ A hook called each time we abort the trace because it's too
         long with the greenkey being the one responsible for the
-        disabled function
+        disabled function, or the one of the loop if its trace limit was
+        increased.
         """
 
+    def on_trace_too_long_counters(self, jitdriver, greenkey, greenkey_repr,
+                                   doublings, trace_limit):
+        """ Like on_trace_too_long(), which it calls by default, with in
+        addition 'doublings', the number of times the trace limit of the
+        loops starting at greenkey was doubled, and 'trace_limit', their
+        current limit.
+        """
+        self.on_trace_too_long(jitdriver, greenkey, greenkey_repr)
+
     #def before_optimize(self, debug_info):
     #    """ A hook called before optimizer is run, called with instance of
     #    JitDebugInfo. Overwrite for custom behavior
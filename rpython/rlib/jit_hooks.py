@@ -3,7 +3,7 @@ from rpython.rtyper.llannotation import SomePtr, lltype_to_annotation
 from rpython.rtyper.annlowlevel import (
     cast_instance_to_gcref, cast_gcref_to_instance, llstr)
 from rpython.rtyper.extregistry import ExtRegistryEntry
-from rpython.rtyper.lltypesystem import llmemory, lltype
+from rpython.rtyper.lltypesystem import llmemory, lltype, rstr
 from rpython.flowspace.model import Constant
 
 
@@ -87,6 +87,10 @@ def box_constbox(llbox):
 def box_nonconstbox(llbox):
     return _cast_to_gcref(_cast_to_box(llbox).nonconstbox())
 
+@register_helper(SomePtr(llmemory.GCREF))
+def box_getref(llbox):
+    return _cast_to_box(llbox).getref_base()
+
 @register_helper(annmodel.SomeBool())
 def box_isconst(llbox):
     from rpython.jit.metainterp.history import Const
@@ -101,6 +105,8 @@ def box_isint(llbox):
 
 @register_helper(annmodel.SomeBool())
 def stats_set_debug(warmrunnerdesc, flag):
+    # don't let stats_set_guard_stats(False) disable it again
+    warmrunnerdesc.metainterp_sd.guard_stats.keep_debug = flag
     return warmrunnerdesc.metainterp_sd.cpu.set_debug(flag)
 
 @register_helper(annmodel.SomeInteger())
@@ -128,6 +134,71 @@ def stats_asmmemmgr_allocated(warmrunnerdesc):
 def stats_asmmemmgr_used(warmrunnerdesc):
     return warmrunnerdesc.metainterp_sd.cpu.asmmemmgr.get_stats()[1]
 
+@register_helper(annmodel.SomeInteger())
+def stats_memmgr_alive_loops(warmrunnerdesc):
+    return len(warmrunnerdesc.memory_manager.alive_loops)
+
+@register_helper(annmodel.SomeInteger())
+def stats_memmgr_code_size(warmrunnerdesc):
+    return warmrunnerdesc.memory_manager.get_total_code_size()
+
+@register_helper(annmodel.SomeInteger())
+def stats_memmgr_evicted_loops(warmrunnerdesc):
+    return warmrunnerdesc.memory_manager.evicted_loops
+
+@register_helper(annmodel.SomeInteger())
+def stats_memmgr_evicted_code_size(warmrunnerdesc):
+    return warmrunnerdesc.memory_manager.evicted_code_size
+
+@register_helper(annmodel.SomeInteger())
+def stats_compile_pauses(warmrunnerdesc, bucket):
+    return warmrunnerdesc.metainterp_sd.compile_budget.histogram[bucket]
+
+@register_helper(annmodel.SomeInteger())
+def stats_compile_deferred(warmrunnerdesc):
+    return warmrunnerdesc.metainterp_sd.compile_budget.deferred
+
+@register_helper(annmodel.SomeFloat())
+def stats_compile_time(warmrunnerdesc):
+    return warmrunnerdesc.metainterp_sd.compile_budget.total_time
+
+@register_helper(annmodel.SomeInteger())
+def stats_resume_bytes(warmrunnerdesc):
+    return warmrunnerdesc.metainterp_sd.resume_stats.total_bytes
+
+@register_helper(annmodel.SomeInteger())
+def stats_resume_shared_bytes(warmrunnerdesc):
+    return warmrunnerdesc.metainterp_sd.resume_stats.shared_bytes
+
+# the guards that failed at least once since stats_set_guard_stats(True),
+# with the last debug_merge_point before them, which is NULL if unknown
+GUARD_STATS_CONTAINER = lltype.GcArray(lltype.Struct('elem',
+                                        ('number', lltype.Signed),
+                                        ('opname', lltype.Ptr(rstr.STR)),
+                                        ('failures', lltype.Signed),
+                                        ('jitdriver_name', lltype.Ptr(rstr.STR)),
+                                        ('location', lltype.Ptr(rstr.STR)),
+                                        ('debug_merge_point', llmemory.GCREF)))
+
+@register_helper(None)
+def stats_set_guard_stats(warmrunnerdesc, flag):
+    # the entry counters of the loops and bridges are the ones of
+    # set_debug(), reported by stats_get_loop_run_times().  They are
+    # left on if set_debug() was enabled for other reasons.
+    guard_stats = warmrunnerdesc.metainterp_sd.guard_stats
+    if guard_stats.enabled == flag:
+        return
+    guard_stats.enabled = flag
+    cpu = warmrunnerdesc.metainterp_sd.cpu
+    if flag:
+        guard_stats.keep_debug = cpu.set_debug(True)
+    elif not guard_stats.keep_debug:
+        cpu.set_debug(False)
+
+@register_helper(lltype.Ptr(GUARD_STATS_CONTAINER))
+def stats_get_guard_stats(warmrunnerdesc):
+    return warmrunnerdesc.metainterp_sd.guard_stats.get_all_guard_stats()
+
 @register_helper(None)
 def stats_memmgr_release_all(warmrunnerdesc):
     warmrunnerdesc.memory_manager.release_all_loops()
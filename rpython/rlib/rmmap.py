@@ -36,7 +36,7 @@ class RValueError(RMMapError):
 class RTypeError(RMMapError):
     pass
 
-includes = ["sys/types.h"]
+includes = ["sys/types.h", "string.h"]
 if _POSIX:
     includes += ['unistd.h', 'sys/mman.h']
 elif _MS_WINDOWS:
@@ -182,6 +182,7 @@ if _CYGWIN:
     _, c_free_safe = external('free', [PTR], lltype.Void, macro=True)
 
 c_memmove, _ = external('memmove', [PTR, PTR, size_t], lltype.Void)
+_, c_memchr_safe = external('memchr', [PTR, rffi.INT, size_t], PTR)
 
 if _POSIX:
     has_mremap = cConfig['has_mremap']
@@ -199,6 +200,8 @@ if _POSIX:
     if has_madvise:
         _, c_madvise_safe = external('madvise', [PTR, size_t, rffi.INT],
                                      rffi.INT, _nowrapper=True)
+        c_madvise, _ = external('madvise', [PTR, size_t, rffi.INT], rffi.INT,
+                                save_err_on_unsafe=rffi.RFFI_SAVE_ERRNO)
 
     # this one is always safe
     _pagesize = rffi_platform.getintegerfunctionresult('getpagesize',
@@ -419,11 +422,9 @@ class MMap(object):
             raise RValueError("read byte out of range")
 
     def readline(self):
-        data = self.data
-        for pos in xrange(self.pos, self.size):
-            if data[pos] == '\n':
-                eol = pos + 1 # we're interested in the position after new line
-                break
+        eol = self._memchr('\n', self.pos, self.size)
+        if eol >= 0:
+            eol += 1 # we're interested in the position after new line
         else: # no '\n' found
             eol = self.size
 
@@ -445,8 +446,27 @@ class MMap(object):
         self.pos += len(res)
         return res
 
+    def _memchr(self, c, start, end):
+        """Return the index of the first 'c' in data[start:end], or -1."""
+        if start >= end:
+            return -1
+        p = c_memchr_safe(self.getptr(start), rffi.cast(rffi.INT, ord(c)),
+                          rffi.cast(size_t, end - start))
+        if not p:
+            return -1
+        return start + (rffi.cast(lltype.Signed, p) -
+                        rffi.cast(lltype.Signed, self.getptr(start)))
+
+    def _match_at(self, p, tofind):
+        data = self.data
+        for q in range(1, len(tofind)):
+            if data[p+q] != tofind[q]:
+                return False
+        return True
+
     def find(self, tofind, start, end, reverse=False):
-        # XXX naive! how can we reuse the rstr algorithm?
+        # forward searches skip to the candidate positions with memchr();
+        # reverse searches are still naive, as there is no portable memrchr()
         if start < 0:
             start += self.size
             if start < 0:
@@ -460,10 +480,17 @@ class MMap(object):
         #
         upto = end - len(tofind)
         if not reverse:
-            step = 1
             p = start
             if p > upto:
                 return -1      # failure (empty range to search)
+            if not tofind:
+                return p
+            first = tofind[0]
+            while True:
+                p = self._memchr(first, p, upto + 1)
+                if p < 0 or self._match_at(p, tofind):
+                    return p
+                p += 1
         else:
             step = -1
             p = upto
@@ -664,10 +691,10 @@ class MMap(object):
         self.data[index] = value[0]
 
     if has_madvise:
-        def madvise(self, flags, start, end):
-            res = c_madvise_safe(rffi.cast(PTR, rffi.ptradd(self.data, + start)),
-                                 rffi.cast(size_t, end),
-                                 rffi.cast(rffi.INT, flags))
+        def madvise(self, flags, start, length):
+            res = c_madvise(rffi.cast(PTR, rffi.ptradd(self.data, + start)),
+                            rffi.cast(size_t, length),
+                            rffi.cast(rffi.INT, flags))
             if rffi.cast(lltype.Signed, res) == 0:
                 return
             errno = rposix.get_saved_errno()
@@ -221,24 +221,37 @@ class RZipFile(object):
         x = endrec.filesize - size_cd
         concat = x - offset_cd
         self.start_dir = offset_cd + concat
+        # read the central directory with a single read(), and parse it
+        # from memory.  The local file headers are only read when a member
+        # is read, see _get_file_offset().
         fp.seek(self.start_dir, 0)
+        data = fp.read(size_cd)
+        if len(data) < size_cd:
+            raise BadZipfile("Truncated central directory")
         total = 0
         while total < size_cd:
-            centdir = fp.read(46)
+            start = total
             total = total + 46
+            if total > size_cd:
+                raise BadZipfile("Truncated central directory")
+            assert start >= 0 and total >= 0
+            centdir = data[start:total]
             if centdir[0:4] != stringCentralDir:
                 raise BadZipfile("Bad magic number for central directory")
             centdir = runpack(structCentralDir, centdir)
-            filename = fp.read(centdir[_CD_FILENAME_LENGTH])
-            # Create ZipInfo instance to store file information
+            start = total
+            total = total + centdir[_CD_FILENAME_LENGTH]
+            if total > size_cd:
+                raise BadZipfile("Truncated central directory")
+            assert start >= 0 and total >= 0
+            filename = data[start:total]
+            # Create ZipInfo instance to store file information.  The extra
+            # field and the comment are skipped, nothing uses them.
             x = RZipInfo(filename)
-            x.extra = fp.read(centdir[_CD_EXTRA_FIELD_LENGTH])
-            x.comment = fp.read(centdir[_CD_COMMENT_LENGTH])
-            total = (total + centdir[_CD_FILENAME_LENGTH]
-                     + centdir[_CD_EXTRA_FIELD_LENGTH]
+            total = (total + centdir[_CD_EXTRA_FIELD_LENGTH]
                      + centdir[_CD_COMMENT_LENGTH])
             x.header_offset = centdir[_CD_LOCAL_HEADER_OFFSET] + concat
-            # file_offset must be computed below...
+            x.file_offset = -1   # computed lazily by _get_file_offset()
             (x.create_version, x.create_system, x.extract_version, x.reserved,
                 x.flag_bits, x.compress_type, t, d,
                 crc, x.compress_size, x.file_size) = centdir[1:12]
@@ -251,7 +264,9 @@ class RZipFile(object):
                                      t>>11, (t>>5)&0x3F, (t&0x1F) * 2 )
             self.filelist.append(x)
             self.NameToInfo[x.filename] = x
-        for data in self.filelist:
+
+    def _get_file_offset(self, fp, data):
+        if data.file_offset < 0:
             fp.seek(data.header_offset, 0)
             fheader = fp.read(30)
             if fheader[0:4] != stringFileHeader:
@@ -261,14 +276,14 @@ class RZipFile(object):
             # the central directory and for the local file header
             # refer to different fields, and they can have different
             # lengths
-            data.file_offset = (data.header_offset + 30
-                                + fheader[_FH_FILENAME_LENGTH]
-                                + fheader[_FH_EXTRA_FIELD_LENGTH])
             fname = fp.read(fheader[_FH_FILENAME_LENGTH])
             if fname != data.orig_filename:
                 raise BadZipfile('File name in directory "%s" and '
                     'header "%s" differ.' % (data.orig_filename, fname))
-        fp.seek(self.start_dir, 0)
+            data.file_offset = (data.header_offset + 30
+                                + fheader[_FH_FILENAME_LENGTH]
+                                + fheader[_FH_EXTRA_FIELD_LENGTH])
+        return data.file_offset
 
     def getinfo(self, filename):
         """Return the instance of ZipInfo given 'filename'."""
@@ -278,30 +293,32 @@ class RZipFile(object):
         zinfo = self.getinfo(filename)
         fp = self.get_fp()
         try:
-            filepos = fp.tell()
-            fp.seek(zinfo.file_offset, 0)
-            bytes = fp.read(intmask(zinfo.compress_size))
-            fp.seek(filepos, 0)
-            if zinfo.compress_type == ZIP_STORED:
-                pass
-            elif zinfo.compress_type == ZIP_DEFLATED and rzlib is not None:
-                stream = rzlib.inflateInit(wbits=-15)
-                try:
-                    bytes, _, _ = rzlib.decompress(stream, bytes)
-                    # need to feed in unused pad byte so that zlib won't choke
-                    ex, _, _ = rzlib.decompress(stream, 'Z')
-                    if ex:
-                        bytes = bytes + ex
-                finally:
-                    rzlib.inflateEnd(stream)
-            elif zinfo.compress_type == ZIP_DEFLATED:
-                raise BadZipfile("Cannot decompress file, zlib not installed")
-            else:
-                raise BadZipfile("Unsupported compression method %d for "
-                                 "file %s" % (zinfo.compress_type, filename))
-            crc = crc32(bytes)
-            if crc != zinfo.CRC:
-                raise BadZipfile("Bad CRC-32 for file %s" % filename)
-            return bytes
+            bytes = self._read_compressed(fp, zinfo)
         finally:
             fp.close()
+        if zinfo.compress_type == ZIP_STORED:
+            pass
+        elif zinfo.compress_type == ZIP_DEFLATED and rzlib is not None:
+            stream = rzlib.inflateInit(wbits=-15)
+            try:
+                bytes, _, _ = rzlib.decompress(stream, bytes)
+                # need to feed in unused pad byte so that zlib won't choke
+                ex, _, _ = rzlib.decompress(stream, 'Z')
+                if ex:
+                    bytes = bytes + ex
+            finally:
+                rzlib.inflateEnd(stream)
+        elif zinfo.compress_type == ZIP_DEFLATED:
+            raise BadZipfile("Cannot decompress file, zlib not installed")
+        else:
+            raise BadZipfile("Unsupported compression method %d for "
+                             "file %s" % (zinfo.compress_type, filename))
+        crc = crc32(bytes)
+        if crc != zinfo.CRC:
+            raise BadZipfile("Bad CRC-32 for file %s" % filename)
+        return bytes
+
+    def _read_compressed(self, fp, zinfo):
+        offset = self._get_file_offset(fp, zinfo)
+        fp.seek(offset, 0)
+        return fp.read(intmask(zinfo.compress_size))
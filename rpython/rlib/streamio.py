@@ -4,8 +4,8 @@ Based on sio.py from Guido van Rossum.
 
 - This module contains various stream classes which provide a subset of the
   classic Python I/O API: read(n), write(s), tell(), seek(offset, whence=0),
-  readall(), readline(), truncate(size), flush(), close(), peek(),
-  flushable(), try_to_find_file_descriptor().
+  readall(), readline(), readlines_into(list, maxbytes), truncate(size),
+  flush(), close(), peek(), flushable(), try_to_find_file_descriptor().
 
 - This is not for general usage:
   * read(n) may return less than n bytes, just like os.read().
@@ -274,6 +274,35 @@ class Stream(object):
                 break
         return ''.join(result)
 
+    def readlines_into(self, result, maxbytes):
+        # Append complete lines to the list 'result' until EOF, or until
+        # at least 'maxbytes' bytes have been read if maxbytes > 0.
+        # Returns the number of bytes read.  Only the last line of the
+        # file can lack its final newline.
+        if maxbytes <= 0:
+            data = self.readall()
+        else:
+            data = self.read(maxbytes)
+        splitfrom = 0
+        while True:
+            i = data.find("\n", splitfrom)
+            if i < 0:
+                break
+            i += 1
+            result.append(data[splitfrom:i])
+            splitfrom = i
+        if splitfrom < len(data):
+            # there is a partial line at the end.  If maxbytes > 0, it is
+            # likely to be because the 'read(maxbytes)' returned data up to
+            # the middle of a line.  In that case, use 'readline()' to read
+            # until the end of the current line.
+            data = data[splitfrom:]
+            if maxbytes > 0:
+                data += self.readline()
+            result.append(data)
+            splitfrom += len(data)
+        return splitfrom
+
     def truncate(self, size):
         raise MyNotImplementedError
 
@@ -547,6 +576,7 @@ class BufferingInputStream(Stream):
 
     bigsize = 2**19 # Half a Meg
     bufsize = 2**13 # 8 K
+    linesbufsize = 2**16 # 64 K, minimum block size used by readlines_into()
 
     def __init__(self, base, bufsize=-1):
         self.base = base
@@ -755,6 +785,46 @@ class BufferingInputStream(Stream):
             builder.append(self.buf)
         return builder.build()
 
+    def readlines_into(self, result, maxbytes):
+        # Bulk version of Stream.readlines_into(): split all the complete
+        # lines out of the current buffer with one find() each, and refill
+        # the buffer with large blocks.  Only a line that straddles two
+        # blocks goes through the slower readline().
+        total = 0
+        blocksize = max(self.bufsize, self.linesbufsize)
+        while True:
+            buf = self.buf
+            pos = self.pos
+            assert pos >= 0
+            end = len(buf)
+            while pos < end:
+                i = buf.find("\n", pos, end)
+                if i < 0:
+                    break
+                i += 1
+                result.append(buf[pos:i])
+                total += i - pos
+                pos = i
+                if 0 < maxbytes <= total:
+                    self.pos = pos
+                    return total
+            self.pos = pos
+            if pos == end:
+                self.buf = self.do_read(blocksize)
+                self.pos = 0
+                if not self.buf:
+                    break
+            else:
+                # partial line left in the buffer: let readline() join it
+                # with the following block(s), leaving self.buf positioned
+                # just after the newline
+                line = self.readline()
+                result.append(line)
+                total += len(line)
+                if not line.endswith("\n") or 0 < maxbytes <= total:
+                    break
+        return total
+
     def peek(self):
         return (self.pos, self.buf)
 
@@ -1170,6 +1240,10 @@ class CallbackReadFilter(Stream):
     try_to_find_file_descriptor = PassThrough("try_to_find_file_descriptor",
                                               flush_buffers=False)
 
+    def readlines_into(self, result, maxbytes):
+        self.flush_buffers()
+        return self.base.readlines_into(result, maxbytes)
+
 # _________________________________________________
 # The following functions are _not_ RPython!
 
@@ -0,0 +1,136 @@
+"""
+Multikey quicksort for lists of strings, from "Fast Algorithms for Sorting
+and Searching Strings" by Bentley and Sedgewick.  Ranges are partitioned
+on one character at a time, so common prefixes are only scanned a few
+times instead of once per comparison, as a comparison sort does.
+
+Small ranges are finished with an insertion sort, and ranges that keep
+being partitioned badly with a TimSort, which bounds the worst case.
+"""
+
+from rpython.rlib.listsort import make_timsort_class
+
+
+INSERTION_SORT_CUTOFF = 12
+
+
+def _partition_budget(n):
+    # about 2*log2(n) bad partitions are allowed before falling back
+    result = 2
+    while n > 1:
+        result += 2
+        n >>= 1
+    return result
+
+
+def make_string_sort(getkey=None):
+    """Returns a function sort(list, keys) that sorts 'list' in place.
+
+    Without 'getkey', the list contains the strings themselves and 'keys'
+    is ignored.  The sort is then not stable, which doesn't matter for
+    strings.
+
+    With 'getkey', the list contains integers, and the items are sorted by
+    the string getkey(keys, item).  Items with equal strings end up in
+    increasing order, so sorting range(n) gives a stable sort.
+    """
+    stable = getkey is not None
+    if not stable:
+        def getkey(keys, item):
+            return item
+
+    def lt(keys, a, b):
+        if stable:
+            key_a = getkey(keys, a)
+            key_b = getkey(keys, b)
+            if key_a == key_b:
+                return a < b
+            return key_a < key_b
+        return a < b
+
+    def char_at(keys, item, depth):
+        s = getkey(keys, item)
+        if depth < len(s):
+            return ord(s[depth])
+        return -1
+
+    BaseTimSort = make_timsort_class()
+
+    class FallbackSort(BaseTimSort):
+        def lt(self, a, b):
+            return lt(self.keys, a, b)
+
+    def fallback_sort(list, keys, lo, hi):
+        assert 0 <= lo <= hi
+        part = list[lo:hi]
+        sorter = FallbackSort(part, hi - lo)
+        sorter.keys = keys
+        sorter.sort()
+        for i in range(hi - lo):
+            list[lo + i] = part[i]
+
+    def insertion_sort(list, keys, lo, hi):
+        for i in range(lo + 1, hi):
+            item = list[i]
+            j = i
+            while j > lo and lt(keys, item, list[j - 1]):
+                list[j] = list[j - 1]
+                j -= 1
+            list[j] = item
+
+    def sort(list, keys=None):
+        n = len(list)
+        # a stack of ranges [lo, hi), already sorted on their first 'depth'
+        # characters
+        todo = [(0, n, 0, _partition_budget(n))]
+        while todo:
+            lo, hi, depth, budget = todo.pop()
+            if hi - lo <= INSERTION_SORT_CUTOFF:
+                insertion_sort(list, keys, lo, hi)
+                continue
+            if budget == 0:
+                fallback_sort(list, keys, lo, hi)
+                continue
+            # median of three
+            a = char_at(keys, list[lo], depth)
+            b = char_at(keys, list[lo + ((hi - lo) >> 1)], depth)
+            c = char_at(keys, list[hi - 1], depth)
+            if a > b:
+                a, b = b, a
+            if b > c:
+                b = c
+            if a > b:
+                b = a
+            pivot = b
+            # three-way partition:
+            # [lo, lt) < pivot, [lt, i) == pivot, (gt, hi) > pivot
+            lt_ = lo
+            i = lo
+            gt = hi - 1
+            while i <= gt:
+                item = list[i]
+                char = char_at(keys, item, depth)
+                if char < pivot:
+                    list[i] = list[lt_]
+                    list[lt_] = item
+                    lt_ += 1
+                    i += 1
+                elif char > pivot:
+                    list[i] = list[gt]
+                    list[gt] = item
+                    gt -= 1
+                else:
+                    i += 1
+            todo.append((lo, lt_, depth, budget - 1))
+            todo.append((gt + 1, hi, depth, budget - 1))
+            if pivot >= 0:
+                todo.append((lt_, gt + 1, depth + 1,
+                             _partition_budget(gt + 1 - lt_)))
+            elif stable:
+                # the strings are all equal: order the items
+                fallback_sort(list, keys, lt_, gt + 1)
+
+    return sort
+
+
+string_sort = make_string_sort()
@@ -1,5 +1,5 @@
 from rpython.tool.udir import udir
-import os, sys, py
+import os, sys, errno, py
 from rpython.rtyper.test.test_llinterp import interpret
 from rpython.rtyper.lltypesystem import rffi, lltype
 from rpython.rlib.rarithmetic import intmask
@@ -500,6 +500,8 @@ class TestMMap:
     def test_madvise(self):
         m = mmap.mmap(-1, 8096)
         m.madvise(mmap.MADV_NORMAL, 0, 8096)
+        e = py.test.raises(OSError, m.madvise, mmap.MADV_NORMAL, 1, 100)
+        assert e.value.errno == errno.EINVAL
         m.close()
 
 
@@ -43,6 +43,15 @@ class BaseTestRZipFile(BaseRtypingTest):
         assert one()
         assert self.interpret(one, [])
 
+    def test_read_file_offset_lazily(self):
+        rzip = RZipFile(self.zipname, "r", self.compression)
+        info = rzip.getinfo('dir/two')
+        assert info.file_offset == -1     # local header not read yet
+        assert rzip.read('dir/two') == 'otherstuff'
+        assert info.file_offset > info.header_offset
+        assert rzip.read('one') == 'stuff\n'
+        assert rzip.read('three') == 'hello, world'
+
 class TestRZipFile(BaseTestRZipFile):
     compression = ZIP_STORED
 
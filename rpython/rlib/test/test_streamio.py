@@ -166,6 +166,32 @@ class BaseTestBufferingInputStreamTests(BaseRtypingTest):
             res = self.interpret(f, [])
             assert res
 
+    def test_readlines_into(self):
+        for file in [self.makeStream(), self.makeStream(bufsize=1)]:
+            def f():
+                lst = []
+                n = file.readlines_into(lst, 0)
+                return lst == self.lines and n == len("".join(self.lines))
+            res = self.interpret(f, [])
+            assert res
+
+    def test_readlines_into_maxbytes(self):
+        file = self.makeStream()
+        def f():
+            lst = []
+            n = file.readlines_into(lst, 4)
+            assert lst == self.lines[:2]
+            assert n == 7
+            assert file.readline() == self.lines[2]
+            lst = []
+            n = file.readlines_into(lst, 1)
+            assert lst == self.lines[3:4]
+            lst = []
+            file.readlines_into(lst, 0)
+            return lst == self.lines[4:]
+        res = self.interpret(f, [])
+        assert res
+
     def test_readall(self):
         file = self.makeStream()
         def f():
@@ -1068,6 +1094,18 @@ class TestReadlineInputStream:
                 i += 1
             assert i == len(self.lines)
 
+    def test_readlines_into(self):
+        for maxbytes in [0, 1, 3, 5, 100]:
+            file = self.makeStream()
+            lst = []
+            n = file.readlines_into(lst, maxbytes)
+            assert n == len("".join(lst))
+            assert lst == self.lines[:len(lst)]
+            if maxbytes > 0:
+                assert n - len(lst[-1]) < maxbytes
+            file.readlines_into(lst, 0)
+            assert lst == self.lines
+
     def test_readline_and_readall(self):
         file = self.makeStream(seek=True, tell=True, bufsize=2)
         r = file.readline()
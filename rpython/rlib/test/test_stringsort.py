@@ -0,0 +1,64 @@
+from rpython.rlib import stringsort
+from rpython.rlib.stringsort import string_sort, make_string_sort
+
+from hypothesis import given, strategies as st
+
+
+def getkey(keys, index):
+    return keys[index]
+
+index_sort = make_string_sort(getkey)
+
+def check_string_sort(lst):
+    lst2 = lst[:]
+    string_sort(lst2)
+    assert lst2 == sorted(lst)
+
+def check_index_sort(keys):
+    indices = range(len(keys))
+    index_sort(indices, keys)
+    assert indices == sorted(range(len(keys)), key=lambda i: keys[i])
+
+def test_simple():
+    check_string_sort([])
+    check_string_sort(["b"])
+    check_string_sort(["b", "a", "", "ab", "aa", "a"])
+    check_string_sort(["abc%d" % i for i in range(100, 0, -1)])
+    check_string_sort(["x" * i for i in range(50)] * 3)
+
+def test_many_equal_prefixes():
+    lst = ["prefix" * 10 + chr(i % 7) + str(i) for i in range(500)]
+    check_string_sort(lst)
+    check_string_sort(sorted(lst))
+    check_string_sort(sorted(lst, reverse=True))
+
+def test_stable():
+    check_index_sort(["b", "a", "b", "a", "", "b"] * 20)
+    check_index_sort(["same"] * 100)
+
+@given(st.lists(st.binary(max_size=6)))
+def test_string_sort_hypothesis(lst):
+    check_string_sort(lst)
+
+@given(st.lists(st.sampled_from(["", "a", "ab", "abc", "b", "\xff"])))
+def test_index_sort_hypothesis(keys):
+    check_index_sort(keys)
+
+def test_fallback(monkeypatch):
+    # a range that was partitioned badly too often is sorted with TimSort
+    monkeypatch.setattr(stringsort, '_partition_budget', lambda n: 1)
+    check_string_sort(["abc%d" % (i * 7 % 100) for i in range(100)])
+    check_index_sort(["abc%d" % (i * 7 % 10) for i in range(100)])
+
+def test_rpython():
+    from rpython.rtyper.test.test_llinterp import interpret
+    def f(n):
+        lst = [str(i * 7 % n) for i in range(n)]
+        string_sort(lst)
+        for i in range(n - 1):
+            if lst[i] > lst[i + 1]:
+                return -1
+        indices = range(n)
+        index_sort(indices, lst)
+        return indices[n - 1]
+    assert interpret(f, [50]) == 49
@@ -1413,7 +1413,7 @@ def recast(P, v):
         return v
 
 def _make_ll_keys_values_items(kind):
-    def ll_kvi(LIST, dic, EXTERNAL_ELEM=None):
+    def _ll_kvi(LIST, dic, EXTERNAL_ELEM):
         res = LIST.ll_newlist(dic.num_live_items)
         entries = dic.entries
         dlen = dic.num_ever_used_items
@@ -1439,7 +1439,13 @@ def _make_ll_keys_values_items(kind):
         assert p == res.ll_length()
         return res
     if kind != "items":
-        ll_kvi.oopspec = 'odict.%s(dic)' % kind
+        _ll_kvi.oopspec = 'odict.%s(dic)' % kind
+    # a virtual dict stays virtual
+    _ll_kvi = jit.look_inside_iff(
+        lambda LIST, dic, EXTERNAL_ELEM: jit.isvirtual(dic))(_ll_kvi)
+
+    def ll_kvi(LIST, dic, EXTERNAL_ELEM=None):
+        return _ll_kvi(LIST, dic, EXTERNAL_ELEM)
     return ll_kvi
 
 ll_dict_keys   = _make_ll_keys_values_items('keys')
@@ -1453,6 +1459,7 @@ def ll_dict_contains_with_hash(d, key, hash):
     i = d.lookup_function(d, key, hash, FLAG_LOOKUP)
     return i >= 0
 
+@jit.look_inside_iff(lambda dic: jit.isvirtual(dic))
 def _ll_getnextitem(dic):
     if dic.num_live_items == 0:
         raise KeyError
@@ -1472,6 +1479,7 @@ def _ll_getnextitem(dic):
 
     return i
 
+@jit.look_inside_iff(lambda ELEM, dic: jit.isvirtual(dic))
 def ll_dict_popitem(ELEM, dic):
     i = _ll_getnextitem(dic)
     entry = dic.entries[i]
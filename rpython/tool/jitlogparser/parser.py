@@ -5,6 +5,14 @@ from rpython.jit.tool.oparser import OpParser
 from rpython.tool.logparser import parse_log_file, extract_category
 from copy import copy
 
+# the superinstructions of PyPy2, with the pair of opcodes that they
+# execute.  Only the first one gets a debug_merge_point.
+SUPERINSTRUCTIONS = {
+    'LOAD_FAST_LOAD_FAST': ('LOAD_FAST', 'LOAD_FAST'),
+    'LOAD_FAST_LOAD_ATTR': ('LOAD_FAST', 'LOAD_ATTR'),
+    'COMPARE_OP_POP_JUMP_IF_FALSE': ('COMPARE_OP', 'POP_JUMP_IF_FALSE'),
+}
+
 def parse_code_data(arg):
     name = None
     lineno = 0
@@ -229,6 +237,21 @@ class TraceForOpcode(object):
             return None
         return self.code.get_opcode_from_info(self)
 
+    def executes_opcode(self, opcode_name):
+        """ Whether the operations of this chunk come from the opcode
+        'opcode_name', either alone or as part of a superinstruction.
+        """
+        names = [self.bytecode_name]
+        opcode = self.getopcode()
+        if opcode is not None:
+            names.append(opcode.__class__.__name__)
+        for name in names:
+            if name == opcode_name:
+                return True
+            if opcode_name in SUPERINSTRUCTIONS.get(name, ()):
+                return True
+        return False
+
     def getlineno(self):
         code = self.getopcode()
         if code is None:
@@ -57,6 +57,23 @@ def test_split():
     assert res.chunks[3].bytecode_no == 11
     assert res.chunks[0].bytecode_name == '<loopname>'
 
+def test_executes_opcode_superinstruction():
+    ops = parse('''
+    [i0]
+    debug_merge_point(0, 0, "<code object stuff. file '/I/dont/exist.py'. line 200> #10 LOAD_FAST_LOAD_ATTR")
+    i1 = int_add(i0, 1)
+    debug_merge_point(0, 0, "<code object stuff. file '/I/dont/exist.py'. line 200> #16 BINARY_ADD")
+    i2 = int_add(i1, 1)
+    ''')
+    res = Function.from_operations(ops.operations, LoopStorage())
+    chunk1, chunk2 = res.chunks
+    assert chunk1.executes_opcode('LOAD_FAST_LOAD_ATTR')
+    assert chunk1.executes_opcode('LOAD_FAST')
+    assert chunk1.executes_opcode('LOAD_ATTR')
+    assert not chunk1.executes_opcode('BINARY_ADD')
+    assert chunk2.executes_opcode('BINARY_ADD')
+    assert not chunk2.executes_opcode('LOAD_ATTR')
+
 def test_inlined_call():
     ops = parse("""
     []